@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from src.benchmarks.data_generator import TITLE_NOUNS
+from src.benchmarks.suite import Library
+from src.errors.exceptions import RepoError
+from src.services.async_facade import AsyncLibraryService
+
+DEFAULT_NUMBER_OF_BOOKS = 100_000
+DEFAULT_CLIENT_COUNTS = [100, 1_000, 5_000]
+REQUESTS_PER_CLIENT = 10
+MAXIMUM_THINK_TIME = 2.0
+SLOW_REQUEST_SHARE = 0.02
+CHANGE_SHARE = 0.3
+PAGE_SIZE = 100
+
+
+async def run_client(library, number_of_books, number_of_clients, rng, latencies, maximum_think_time, slow_share):
+    """
+    Function to simulate a front-desk client: a sequence of requests, separated by random think times. Most requests
+    are short reads or rents and returns; a few are slow (statistics, searches and pages of the listings).
+    :param library: object, the started 'AsyncLibraryService'.
+    :param number_of_books: integer, the number of books of the library.
+    :param number_of_clients: integer, the number of clients of the library.
+    :param rng: object, the 'random.Random' the requests are drawn from.
+    :param latencies: dictionary, mapping each kind of request ("read", "change", "slow") to the list its latencies
+    are appended to, in seconds.
+    :param maximum_think_time: float, the maximum time between two requests, in seconds.
+    :param slow_share: float, the share of the slow requests.
+    """
+    for _ in range(REQUESTS_PER_CLIENT):
+        await asyncio.sleep(rng.random() * maximum_think_time)
+        draw = rng.random()
+        book_id = rng.randint(1, number_of_books)
+        start = time.perf_counter()
+        if draw < slow_share:
+            kind = "slow"
+            slow_request = rng.randrange(3)
+            if slow_request == 0:
+                await library.get_most_active_clients(10)
+            elif slow_request == 1:
+                await library.find_all_books_matching_title(rng.choice(TITLE_NOUNS).lower())
+            else:
+                await library.list_books(rng.randint(0, number_of_books - PAGE_SIZE), PAGE_SIZE)
+        elif draw < slow_share + CHANGE_SHARE:
+            kind = "change"
+            try:
+                if await library.is_book_available_by_book_id(book_id):
+                    await library.add_rental(book_id, rng.randint(1, number_of_clients))
+                else:
+                    await library.return_rental_by_book_id(book_id)
+            except RepoError:
+                pass
+        else:
+            kind = "read"
+            if rng.random() < 0.5:
+                await library.get_book_by_book_id(book_id)
+            else:
+                await library.get_book_rental_status(book_id)
+        latencies[kind].append(time.perf_counter() - start)
+
+
+async def run_clients(library, number_of_clients, seed, maximum_think_time, slow_share):
+    """
+    Function to run the given number of simulated clients concurrently against a single library.
+    :param library: object, the loaded 'Library' of the benchmark suite.
+    :param number_of_clients: integer, the number of concurrent clients.
+    :param seed: integer, the seed of the requests of the clients.
+    :param maximum_think_time: float, the maximum time between two requests of a client, in seconds.
+    :param slow_share: float, the share of the slow requests.
+    :return: tuple, containing the latencies by kind of request and the elapsed time, in seconds.
+    """
+    latencies = {"read": [], "change": [], "slow": []}
+    async with AsyncLibraryService(library.book_service, library.client_service, library.rental_service,
+                                   library.statistics_service) as async_library:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client(async_library, library.number_of_books, library.number_of_clients,
+                                          random.Random(seed * 1_000_003 + index), latencies, maximum_think_time,
+                                          slow_share)
+                               for index in range(number_of_clients)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def get_percentile(latencies, percentile):
+    latencies = sorted(latencies)
+    if len(latencies) == 0:
+        return 0.0
+    return latencies[min(len(latencies) * percentile // 100, len(latencies) - 1)] * 1000
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Drive many concurrent simulated clients against the asyncio façade.")
+    parser.add_argument("--books", type=int, default=DEFAULT_NUMBER_OF_BOOKS, help="the number of books of the library")
+    parser.add_argument("--clients", type=int, nargs="+", default=DEFAULT_CLIENT_COUNTS,
+                        help="the numbers of concurrent clients to be run")
+    parser.add_argument("--think-time", type=float, default=MAXIMUM_THINK_TIME,
+                        help="the maximum time between two requests of a client, in seconds")
+    parser.add_argument("--slow-share", type=float, default=SLOW_REQUEST_SHARE,
+                        help="the share of the slow requests (statistics, searches, listing pages)")
+    parser.add_argument("--seed", type=int, default=2021, help="the seed of the data and of the requests")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    print(f"{'Clients':>8} {'Requests/s':>11} {'Read p50/p99 (ms)':>19} {'Rent/return p50/p99 (ms)':>26} "
+          f"{'Slow p50/p99 (ms)':>19}")
+    for number_of_clients in arguments.clients:
+        library = Library(arguments.books, arguments.seed)
+        library.load()
+        latencies, elapsed = asyncio.run(run_clients(library, number_of_clients, arguments.seed,
+                                                      arguments.think_time, arguments.slow_share))
+        number_of_requests = sum(len(kind_latencies) for kind_latencies in latencies.values())
+        columns = [f"{get_percentile(latencies[kind], 50):.2f} / {get_percentile(latencies[kind], 99):.2f}"
+                   for kind in ("read", "change", "slow")]
+        print(f"{number_of_clients:>8} {number_of_requests / elapsed:>11.0f} {columns[0]:>19} {columns[1]:>26} "
+              f"{columns[2]:>19}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
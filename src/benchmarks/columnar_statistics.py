@@ -0,0 +1,155 @@
+import argparse
+import random
+import sys
+
+from src.benchmarks.data_generator import LibraryDataGenerator
+from src.benchmarks.suite import CLIENTS_PER_BOOK, RENTALS_PER_BOOK, STATISTICS_LIMIT, measure
+from src.domain.columnar_repository import ColumnarRentalRepository, ColumnarRentalStatistics, numpy
+from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+from src.domain.statistics import RentalStatistics
+from src.errors.exceptions import RepoError
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.service import RentalService, StatisticsService
+from src.services.undo import UndoService
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+DEFAULT_OPERATIONS = 2_000
+STATISTICS_CALLS = 20
+REMOVED_BOOKS = 10
+
+
+def build_backends(number_of_books, seed, number_of_removed_books=0):
+    """
+    Function to build the same library twice, over a shared catalog: once with the in-memory rental repository and
+    its incremental statistics, once with the NumPy columnar rental repository and its vectorized statistics.
+    :param number_of_books: integer, the number of books of the library.
+    :param seed: integer, the seed of the data.
+    :param number_of_removed_books: integer, the number of rented books removed from the catalog before the
+    statistics are rebuilt, so their rentals are counted without an author.
+    :return: tuple, containing a dictionary mapping the name of each backend to its (rental service, statistics
+    service, undo service) tuple, and the number of clients.
+    """
+    generator = LibraryDataGenerator(seed)
+    number_of_clients = max(int(number_of_books * CLIENTS_PER_BOOK), 1)
+    number_of_rentals = int(number_of_books * RENTALS_PER_BOOK)
+    book_repository = BookRepository()
+    book_repository.add_books(generator.generate_books(number_of_books))
+    client_repository = ClientRepository()
+    client_repository.add_clients(generator.generate_clients(number_of_clients))
+    rentals = list(generator.generate_rentals(number_of_rentals, number_of_books, number_of_clients))
+    for book_id in dict.fromkeys(rental.book_id for rental in rentals[:number_of_removed_books]):
+        book_repository.remove_book_by_index(book_repository.get_index_by_id(book_id))
+
+    backends = {}
+    for name, rental_repository in (("in memory", RentalRepository()), ("columnar", ColumnarRentalRepository())):
+        for rental in rentals:
+            rental_repository.get_next_rental_id()
+            rental_repository.add_rental(rental)
+        if name == "columnar":
+            rental_statistics = ColumnarRentalStatistics(rental_repository)
+        else:
+            rental_statistics = RentalStatistics()
+        undo_service = UndoService()
+        rental_service = RentalService(book_repository, client_repository, rental_repository, BookValidator(),
+                                       ClientValidator(), RentalValidator(), rental_statistics, undo_service)
+        rental_service.rebuild_statistics()
+        backends[name] = (rental_service, StatisticsService(rental_statistics), undo_service)
+    return backends, number_of_clients
+
+
+def run_changes(rental_service, undo_service, number_of_books, number_of_clients, number_of_operations, seed):
+    """
+    Function to rent, return, undo and redo at random through the given services, the same way for every backend
+    given the same seed.
+    """
+    rng = random.Random(seed)
+    for _ in range(number_of_operations):
+        draw = rng.random()
+        book_id = rng.randint(1, number_of_books)
+        try:
+            if draw < 0.4:
+                rental_service.rent_if_available(book_id, rng.randint(1, number_of_clients))
+            elif draw < 0.8:
+                rental_service.return_if_rented(book_id)
+            elif draw < 0.9:
+                undo_service.undo()
+            else:
+                undo_service.redo()
+        except RepoError:
+            pass
+
+
+def compare_backends(backends):
+    """
+    Function to check that every backend holds the same rentals and computes the same statistics. Keys having the
+    same count may be ranked in any order, so the rankings are compared as mappings, and their top entries by count.
+    :return: list, containing the descriptions of the differences found; empty if there are none.
+    """
+    differences = []
+    (reference_name, (reference_rentals, reference_statistics, _)), *others = backends.items()
+    reference_history = [(rental.id, rental.book_id, rental.client_id, rental.rented_date, rental.returned_date)
+                         for rental in reference_rentals.get_all_rentals()]
+    for name, (rental_service, statistics_service, _) in others:
+        history = [(rental.id, rental.book_id, rental.client_id, rental.rented_date, rental.returned_date)
+                   for rental in rental_service.get_all_rentals()]
+        if history != reference_history:
+            differences.append(f"The rentals of the {name} backend differ from the {reference_name} one.")
+        for statistic in ("get_most_rented_books", "get_most_active_clients", "get_most_rented_authors"):
+            expected = getattr(reference_statistics, statistic)()
+            found = getattr(statistics_service, statistic)()
+            if dict(found) != dict(expected):
+                differences.append(f"'{statistic}' of the {name} backend differs from the {reference_name} one.")
+            expected_top = [count for _, count in getattr(reference_statistics, statistic)(STATISTICS_LIMIT)]
+            found_top = [count for _, count in getattr(statistics_service, statistic)(STATISTICS_LIMIT)]
+            if found_top != expected_top:
+                differences.append(f"The top {STATISTICS_LIMIT} of '{statistic}' of the {name} backend differs from "
+                                   f"the {reference_name} one.")
+    return differences
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Check the NumPy columnar rental backend against the in-memory one "
+                                                 "and compare the latencies of their statistics.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="the numbers of books of the libraries to be compared")
+    parser.add_argument("--operations", type=int, default=DEFAULT_OPERATIONS,
+                        help="the number of rents, returns, undos and redos made before comparing the backends")
+    parser.add_argument("--seed", type=int, default=2021, help="the seed of the data and of the changes")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    if numpy is None:
+        print("The columnar backend requires NumPy, which is not installed ('pip install numpy').")
+        return 1
+    print(f"{'Books':>9} {'Backend':>10} {'Most rented books p50 (us)':>27} {'Most active clients p50 (us)':>29} "
+          f"{'Most rented authors p50 (us)':>29}")
+    differences = []
+    for number_of_books in arguments.scales:
+        backends, number_of_clients = build_backends(number_of_books, arguments.seed)
+        for rental_service, _, undo_service in backends.values():
+            run_changes(rental_service, undo_service, number_of_books, number_of_clients, arguments.operations,
+                        arguments.seed)
+        differences += [f"{number_of_books} books: {difference}" for difference in compare_backends(backends)]
+        backends_after_removal, _ = build_backends(number_of_books, arguments.seed, REMOVED_BOOKS)
+        differences += [f"{number_of_books} books, {REMOVED_BOOKS} rented books removed: {difference}"
+                        for difference in compare_backends(backends_after_removal)]
+        for name, (_, statistics_service, _) in backends.items():
+            latencies = [measure(statistic, [(STATISTICS_LIMIT,)] * STATISTICS_CALLS)["p50_us"]
+                         for statistic in (statistics_service.get_most_rented_books,
+                                           statistics_service.get_most_active_clients,
+                                           statistics_service.get_most_rented_authors)]
+            print(f"{number_of_books:>9} {name:>10} {latencies[0]:>27.0f} {latencies[1]:>29.0f} "
+                  f"{latencies[2]:>29.0f}")
+    for difference in differences:
+        print(f"   {difference}")
+    if len(differences) > 0:
+        print(f"{len(differences)} differences found.")
+        return 1
+    print("The backends hold the same rentals and compute the same statistics.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
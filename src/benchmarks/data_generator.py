@@ -0,0 +1,102 @@
+import random
+from datetime import date, timedelta
+
+from src.domain.entity import Book, Client, Rental
+
+TITLE_NOUNS = ["Opponent", "Phantom", "Wolves", "Pilots", "Companions", "Knights", "Anger", "Carnage", "Woman",
+               "Girls", "Soldiers", "Invaders", "Traitors", "Choice", "Spire", "Heir", "Tree", "Wives", "Criminals",
+               "Turtles", "Bandits", "Healing", "Raised", "Rise", "Calling", "Begging", "Escaping", "Doctors",
+               "Pirates", "Owls"]
+TITLE_ENDINGS = ["Of Dawn", "Of The Day", "Of The End", "With Honor", "And Women", "And Rebels", "Of The Forsaken",
+                 "In Eternity", "The World", "Of Next Year", "Without Faith", "With Silver", "And Doctors",
+                 "Of Desire", "Of The Curse", "The Elements", "Without Shame", "Of The Plague", "Of The Solstice",
+                 "Of Destruction", "And Pirates", "With A Goal", "The Moon", "By The Shadows"]
+FIRST_NAMES = ["Lamont", "Dudley", "Fidel", "Perry", "Raymond", "Otha", "Walton", "Ernesto", "Abe", "Curtis",
+               "Cortez", "Antione", "Nicolas", "Quinn", "Darrick", "Damion", "Bradly", "Lloyd", "Lenard", "Isaias",
+               "Telma", "Iola", "Giselle", "Oren", "Jannet", "Frances", "Domingo", "Jackelyn", "Aleisha", "Tiara",
+               "Tara", "Loura", "Carlos", "Shayna", "Pamela", "Shawn", "Annamarie", "Renay", "Lynsey", "Kayla"]
+LAST_NAMES = ["Fitting", "Labrie", "Nielson", "Eppler", "Luechtefeld", "Clayborne", "Kottke", "Nettles", "Kerber",
+              "Connon", "Tijerina", "Brakebill", "Grimshaw", "Remillard", "Estrada", "Cassel", "Moser", "Tschanz",
+              "Rolon", "Hixson", "Dildine", "Buettner", "Midgette", "Fava", "Newbold", "Cullum", "Huggard", "Plum",
+              "Yerian", "Zinn", "Vila", "Marinaro", "Luttrell", "Symes", "Lovejoy", "Lett", "Tran", "Tingler",
+              "Grahn", "Denton"]
+HISTORY_DAYS = 5 * 365
+MAXIMUM_RENTAL_DAYS = 60
+
+
+class LibraryDataGenerator(object):
+    """
+    Generator of synthetic books, clients and rental histories for the benchmarks. All the values are drawn from a
+    'random.Random' seeded once, so that a generator created with the same seed produces the same library every time,
+    on every machine. The entities are yielded one at a time, so that large libraries can be streamed straight into
+    the repositories.
+    """
+
+    def __init__(self, seed=0):
+        self.__random = random.Random(seed)
+
+    def generate_title(self):
+        """
+        Function to return a random book title of at most 30 characters.
+        :return: string, the title.
+        """
+        return f"{self.__random.choice(TITLE_NOUNS)} {self.__random.choice(TITLE_ENDINGS)}"
+
+    def generate_name(self):
+        """
+        Function to return a random person name (of an author or a client) of at most 25 characters.
+        :return: string, the name.
+        """
+        return f"{self.__random.choice(FIRST_NAMES)} {self.__random.choice(LAST_NAMES)}"
+
+    def generate_books(self, number_of_books, first_id=1):
+        """
+        Function to generate books having consecutive IDs.
+        :param number_of_books: integer, the number of books to be generated.
+        :param first_id: integer, the ID of the first book.
+        :return: generator, yielding the 'Book' objects.
+        """
+        for book_id in range(first_id, first_id + number_of_books):
+            yield Book(book_id, self.generate_title(), self.generate_name())
+
+    def generate_clients(self, number_of_clients, first_id=1):
+        """
+        Function to generate clients having consecutive IDs.
+        :param number_of_clients: integer, the number of clients to be generated.
+        :param first_id: integer, the ID of the first client.
+        :return: generator, yielding the 'Client' objects.
+        """
+        for client_id in range(first_id, first_id + number_of_clients):
+            yield Client(client_id, self.generate_name())
+
+    def generate_rentals(self, number_of_rentals, number_of_books, number_of_clients, active_fraction=0.1,
+                         last_date=None):
+        """
+        Function to generate a rental history of books 1 to 'number_of_books' by clients 1 to 'number_of_clients',
+        spread evenly over the 'HISTORY_DAYS' days before the last date, in increasing order of their rented dates.
+        The last rentals of the history are left active, each for a distinct book, so that no book is rented twice at
+        the same time.
+        :param number_of_rentals: integer, the number of rentals to be generated.
+        :param number_of_books: integer, the number of books that can be rented.
+        :param number_of_clients: integer, the number of clients that can rent.
+        :param active_fraction: float, the fraction of the rentals left active; at most one per book.
+        :param last_date: date, the date of the last rental; today if None.
+        :return: generator, yielding the 'Rental' objects, having the IDs 1 to 'number_of_rentals'.
+        """
+        if last_date is None:
+            last_date = date.today()
+        first_date = last_date - timedelta(days=HISTORY_DAYS)
+        number_of_active_rentals = min(int(number_of_rentals * active_fraction), number_of_books)
+        active_book_ids = self.__random.sample(range(1, number_of_books + 1), number_of_active_rentals)
+        first_active_rental_id = number_of_rentals - number_of_active_rentals + 1
+        for rental_id in range(1, number_of_rentals + 1):
+            rented_date = first_date + timedelta(days=HISTORY_DAYS * rental_id // number_of_rentals)
+            client_id = self.__random.randint(1, number_of_clients)
+            if rental_id >= first_active_rental_id:
+                yield Rental(rental_id, active_book_ids[rental_id - first_active_rental_id], client_id, rented_date,
+                             None)
+            else:
+                returned_date = min(rented_date + timedelta(days=self.__random.randint(0, MAXIMUM_RENTAL_DAYS)),
+                                    last_date)
+                yield Rental(rental_id, self.__random.randint(1, number_of_books), client_id, rented_date,
+                             returned_date)
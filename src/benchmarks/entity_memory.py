@@ -0,0 +1,72 @@
+import time
+import tracemalloc
+
+from src.domain.entity import Book
+
+NUMBER_OF_ENTITIES = 1_000_000
+
+
+class PropertyBook:
+    """
+    Former representation of a book, with name-mangled attributes in an instance dictionary behind properties, kept
+    only as the baseline of this benchmark.
+    """
+
+    def __init__(self, book_id, title, author):
+        self.__book_id = book_id
+        self.__title = title
+        self.__author = author
+
+    @property
+    def id(self):
+        return self.__book_id
+
+    @property
+    def title(self):
+        return self.__title
+
+    @property
+    def author(self):
+        return self.__author
+
+
+def measure_memory(book_class):
+    """
+    Function to measure the memory taken by the books of a catalog built with the given class. The titles and authors
+    are shared between the books, so that only the book objects themselves are measured.
+    :param book_class: class, the representation of the books.
+    :return: tuple, containing the list of books and the number of bytes allocated per book.
+    """
+    tracemalloc.start()
+    books = [book_class(book_id, "Opponent Of Dawn", "Lamont Fitting") for book_id in range(NUMBER_OF_ENTITIES)]
+    allocated_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return books, allocated_bytes / NUMBER_OF_ENTITIES
+
+
+def measure_attribute_access(books):
+    """
+    Function to measure the time needed to read the ID, title and author of every book of a catalog.
+    :param books: list, the books of the catalog.
+    :return: float, the average time of reading the three attributes of a book, in nanoseconds.
+    """
+    start = time.perf_counter()
+    for book in books:
+        book.id
+        book.title
+        book.author
+    elapsed = time.perf_counter() - start
+    return elapsed / len(books) * 1_000_000_000
+
+
+def run_benchmark():
+    print(f"{'Representation':>16} {'Bytes per book':>16} {'Access (ns)':>12}")
+    for name, book_class in (("properties", PropertyBook), ("slots", Book)):
+        books, bytes_per_book = measure_memory(book_class)
+        access_time = measure_attribute_access(books)
+        print(f"{name:>16} {bytes_per_book:>16.1f} {access_time:>12.1f}")
+        del books
+
+
+if __name__ == "__main__":
+    run_benchmark()
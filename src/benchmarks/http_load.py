@@ -0,0 +1,221 @@
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+
+from src.benchmarks.data_generator import TITLE_NOUNS
+from src.benchmarks.suite import Library
+from src.services.locking import ReadWriteLock
+from src.ui.http_api import LibraryHttpApi, LibraryHttpServer
+
+DEFAULT_NUMBER_OF_BOOKS = 100_000
+DEFAULT_THREADS = 8
+DEFAULT_REQUESTS_PER_THREAD = 1_000
+DEFAULT_BATCH_SIZE = 50
+PAGE_SIZE = 100
+REVALIDATED_PAGE = f"/books?offset=0&limit={PAGE_SIZE}"
+
+
+def serve_library(number_of_books, seed, address_queue):
+    """
+    Function to load a synthetic library and to serve it on a free local port, until the process is terminated. It
+    runs in a process of its own, so the server and the load generator do not share an interpreter lock.
+    :param number_of_books: integer, the number of books of the library.
+    :param seed: integer, the seed of the data.
+    :param address_queue: object, the 'multiprocessing.Queue' the address of the server is put in once it listens.
+    """
+    lock = ReadWriteLock()
+    library = Library(number_of_books, seed, lock)
+    library.load()
+    api = LibraryHttpApi(library.book_service, library.client_service, library.rental_service,
+                         library.statistics_service, lock, library.undo_service)
+    server = LibraryHttpServer(("127.0.0.1", 0), api)
+    address_queue.put(server.server_address)
+    server.serve_forever()
+
+
+def get_workloads(number_of_books, number_of_clients, batch_size):
+    """
+    Function to build the named workloads: each one draws the method, the path and the body of its next request.
+    :return: dictionary, mapping the name of each workload to a tuple of its draw function and the number of library
+    operations a request of it makes.
+    """
+    def get_book(rng, etag):
+        return "GET", f"/books/{rng.randint(1, number_of_books)}", None, {}
+
+    def get_page(rng, etag):
+        return "GET", f"/books?offset={rng.randint(0, number_of_books - PAGE_SIZE)}&limit={PAGE_SIZE}", None, {}
+
+    def revalidate_page(rng, etag):
+        return "GET", REVALIDATED_PAGE, None, {"If-None-Match": etag}
+
+    def search_titles(rng, etag):
+        return "GET", f"/search/books?title={rng.choice(TITLE_NOUNS).lower()}&limit={PAGE_SIZE}", None, {}
+
+    def rent_or_return(rng, etag):
+        book_id = rng.randint(1, number_of_books)
+        if rng.random() < 0.5:
+            return "POST", "/rentals/rent", {"rentals": [{"book_id": book_id,
+                                                         "client_id": rng.randint(1, number_of_clients)}]}, {}
+        return "POST", "/rentals/return", {"book_ids": [book_id]}, {}
+
+    def rent_or_return_batch(rng, etag):
+        book_ids = [rng.randint(1, number_of_books) for _ in range(batch_size)]
+        if rng.random() < 0.5:
+            return "POST", "/rentals/rent", {"rentals": [{"book_id": book_id,
+                                                         "client_id": rng.randint(1, number_of_clients)}
+                                                        for book_id in book_ids]}, {}
+        return "POST", "/rentals/return", {"book_ids": book_ids}, {}
+
+    return {
+        "get book": (get_book, 1),
+        "page of books": (get_page, PAGE_SIZE),
+        "revalidate page (304)": (revalidate_page, PAGE_SIZE),
+        "search titles": (search_titles, PAGE_SIZE),
+        "rent/return": (rent_or_return, 1),
+        f"rent/return x{batch_size}": (rent_or_return_batch, batch_size)
+    }
+
+
+def run_thread(address, draw_request, number_of_requests, keep_alive, seed, etag, latencies, statuses,
+               start_barrier):
+    """
+    Function to send the given number of requests of a workload one after the other, recording their latencies.
+    :param address: tuple, the host and the port of the server.
+    :param draw_request: function, drawing the method, the path, the body and the headers of the next request.
+    :param number_of_requests: integer, the number of requests to be sent.
+    :param keep_alive: True/False, whether the requests reuse a single connection, or each opens a new one.
+    :param seed: integer, the seed of the requests of the thread.
+    :param etag: string, the ETag of the revalidated page.
+    :param latencies: list, the latencies of the requests are appended to, in seconds.
+    :param statuses: dictionary, counting the responses by their HTTP status, updated in place.
+    :param start_barrier: object, the 'threading.Barrier' all the threads start together on.
+    """
+    rng = random.Random(seed)
+    connection = HTTPConnection(*address)
+    start_barrier.wait()
+    for _ in range(number_of_requests):
+        method, path, body, headers = draw_request(rng, etag)
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if not keep_alive:
+            headers["Connection"] = "close"
+        start = time.perf_counter()
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if not keep_alive:
+            connection.close()
+    connection.close()
+
+
+def run_workload(address, draw_request, number_of_threads, number_of_requests, keep_alive, seed):
+    """
+    Function to run a workload from the given number of threads at once.
+    :return: tuple, containing the latencies of all the requests (in seconds), the count of the responses by their HTTP
+    status and the elapsed time (in seconds).
+    """
+    connection = HTTPConnection(*address)
+    connection.request("GET", REVALIDATED_PAGE)
+    response = connection.getresponse()
+    response.read()
+    etag = response.getheader("ETag")
+    connection.close()
+
+    latencies = [[] for _ in range(number_of_threads)]
+    statuses = [{} for _ in range(number_of_threads)]
+    start_barrier = threading.Barrier(number_of_threads + 1)
+    threads = [threading.Thread(target=run_thread,
+                                args=(address, draw_request, number_of_requests, keep_alive,
+                                      seed * 1_000_003 + index, etag, latencies[index], statuses[index],
+                                      start_barrier))
+               for index in range(number_of_threads)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_statuses = {}
+    for thread_statuses in statuses:
+        for status, count in thread_statuses.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+    return [latency for thread_latencies in latencies for latency in thread_latencies], all_statuses, elapsed
+
+
+def get_percentile(latencies, percentile):
+    latencies = sorted(latencies)
+    if len(latencies) == 0:
+        return 0.0
+    return latencies[min(len(latencies) * percentile // 100, len(latencies) - 1)] * 1000
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Measure the requests per second of the library HTTP API.")
+    parser.add_argument("--books", type=int, default=DEFAULT_NUMBER_OF_BOOKS,
+                        help="the number of books of the served library")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="the number of concurrent connections")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS_PER_THREAD,
+                        help="the number of requests per connection and workload")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="the number of books rented or returned per batch request")
+    parser.add_argument("--only", nargs="+", default=None, help="the names of the workloads to be run")
+    parser.add_argument("--no-keep-alive", action="store_true",
+                        help="only open a new connection per request, instead of comparing it with keep-alive")
+    parser.add_argument("--server", default=None,
+                        help="the 'host:port' of a running server to be loaded instead of a local one; it must serve "
+                             "at least '--books' books and their clients")
+    parser.add_argument("--seed", type=int, default=2021, help="the seed of the data and of the requests")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    server_process = None
+    if arguments.server is None:
+        address_queue = multiprocessing.Queue()
+        server_process = multiprocessing.Process(target=serve_library,
+                                                 args=(arguments.books, arguments.seed, address_queue), daemon=True)
+        server_process.start()
+        address = address_queue.get()
+    else:
+        host, port = arguments.server.rsplit(":", 1)
+        address = (host, int(port))
+    number_of_clients = Library(arguments.books, arguments.seed).number_of_clients
+    workloads = get_workloads(arguments.books, number_of_clients, arguments.batch_size)
+    modes = [False] if arguments.no_keep_alive else [True, False]
+
+    print(f"{arguments.threads} connections, {arguments.requests} requests each, {arguments.books} books")
+    print(f"{'Workload':<24} {'Connection':<12} {'Requests/s':>11} {'Operations/s':>13} {'p50 (ms)':>9} "
+          f"{'p99 (ms)':>9}  Statuses")
+    try:
+        for name, (draw_request, operations_per_request) in workloads.items():
+            if arguments.only is not None and name not in arguments.only:
+                continue
+            for keep_alive in modes:
+                latencies, statuses, elapsed = run_workload(address, draw_request, arguments.threads,
+                                                            arguments.requests, keep_alive, arguments.seed)
+                requests_per_second = len(latencies) / elapsed
+                connection = "keep-alive" if keep_alive else "new"
+                statuses = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+                print(f"{name:<24} {connection:<12} {requests_per_second:>11.0f} "
+                      f"{requests_per_second * operations_per_request:>13.0f} {get_percentile(latencies, 50):>9.2f} "
+                      f"{get_percentile(latencies, 99):>9.2f}  {statuses}")
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
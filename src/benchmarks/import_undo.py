@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from src.domain.entity import Book, Client
+from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+from src.domain.statistics import RentalStatistics
+from src.errors.exceptions import RepoError
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.async_facade import AsyncLibraryService
+from src.services.bulk_import import BulkImportService
+from src.services.service import RentalService
+from src.services.undo import UndoService
+
+
+IMPORTED_RENTAL = {"book_id": 2, "client_id": 1, "rented_date": "2021-01-04"}
+
+
+def build_library(share_undo_service=True):
+    """
+    Function to build a library of two books and a client, with a rental service and a bulk import service sharing
+    the same repositories and statistics.
+    :param share_undo_service: True/False, whether the bulk import service is given the undo service too.
+    :return: tuple, containing the rental service, the bulk import service and the undo service.
+    """
+    book_repository = BookRepository()
+    book_repository.add_books([Book(book_repository.get_next_book_id(), "Opponent Of Dawn", "Lamont Fitting"),
+                               Book(book_repository.get_next_book_id(), "Wings Of Glass", "Mara Quill")])
+    client_repository = ClientRepository()
+    client_repository.add_clients([Client(client_repository.get_next_client_id(), "Dana Cole")])
+    rental_repository = RentalRepository()
+    rental_statistics = RentalStatistics()
+    undo_service = UndoService()
+    rental_service = RentalService(book_repository, client_repository, rental_repository, BookValidator(),
+                                   ClientValidator(), RentalValidator(), rental_statistics, undo_service)
+    import_service = BulkImportService(book_repository, client_repository, rental_repository, BookValidator(),
+                                       ClientValidator(), RentalValidator(), rental_statistics,
+                                       undo_service if share_undo_service else None)
+    return rental_service, import_service, undo_service
+
+
+def check_undo_after_import():
+    """
+    Function to rent a book, to import the rental of another one and to undo: the import forgets the recorded steps,
+    so the undo must neither remove the imported rental nor the one made before the import.
+    :return: list, containing the descriptions of the problems found; empty if there are none.
+    """
+    rental_service, import_service, undo_service = build_library()
+    rental_service.add_rental(1, 1)
+    report = import_service.import_rentals([(1, IMPORTED_RENTAL)])
+    try:
+        undo_service.undo()
+        return get_problems(rental_service, report, None)
+    except RepoError as error:
+        return get_problems(rental_service, report, error)
+
+
+def check_async_undo_after_import():
+    """
+    Function to make the same check through the asyncio façade, whose bulk import service is not given the undo
+    service, so the façade itself must forget the recorded steps.
+    :return: list, containing the descriptions of the problems found; empty if there are none.
+    """
+    rental_service, import_service, undo_service = build_library(share_undo_service=False)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rentals.jsonl")
+        with open(path, "w", encoding="utf-8") as records_file:
+            records_file.write(json.dumps(IMPORTED_RENTAL) + "\n")
+
+        async def rent_import_and_undo():
+            async with AsyncLibraryService(None, None, rental_service, None, import_service,
+                                           undo_service) as async_library:
+                await async_library.add_rental(1, 1)
+                imported = await async_library.import_rentals(path)
+                try:
+                    await async_library.undo()
+                    return imported, None
+                except RepoError as error:
+                    return imported, error
+
+        report, error = asyncio.run(rent_import_and_undo())
+    return [f"Asyncio façade: {problem}" for problem in get_problems(rental_service, report, error)]
+
+
+def get_problems(rental_service, report, undo_error):
+    """
+    Function to describe what went wrong when book 1 was rented, then a rental of book 2 imported, then undone.
+    :param rental_service: object, the 'RentalService' of the library.
+    :param report: object, the 'ImportReport' of the import.
+    :param undo_error: object, the 'RepoError' raised by the undo; None if it did not fail.
+    :return: list, containing the descriptions of the problems found; empty if there are none.
+    """
+    problems = []
+    if report.rows_imported != 1:
+        problems.append(f"The rental was not imported: {report.bad_rows}.")
+    if undo_error is None:
+        problems.append("The undo after the import did not fail, although the import forgets the recorded steps.")
+    if rental_service.is_book_available_by_book_id(1):
+        problems.append("The rental made before the import was removed.")
+    if rental_service.is_book_available_by_book_id(2):
+        problems.append("The imported rental was removed.")
+    return problems
+
+
+def main():
+    problems = check_undo_after_import() + check_async_undo_after_import()
+    for problem in problems:
+        print(f"   {problem}")
+    if len(problems) > 0:
+        print(f"{len(problems)} problems found.")
+        return 1
+    print("Undo after an import keeps both the imported rentals and the ones made before it.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from src.domain.entity import Book
+from src.domain.record_file import MappedBookRepository, compact_record_file, BOOK_FILE_MAGIC, BOOK_FIELDS
+from src.domain.repository import BookRepository
+
+NUMBER_OF_BOOKS = 1_000_000
+NUMBER_OF_LOOKUPS = 100_000
+DELETED_FRACTION = 0.1
+
+
+def build_record_file(path):
+    """
+    Function to write the benchmark catalog to a record file, deleting a fraction of the books.
+    :param path: string, the path of the record file.
+    :return: float, the time taken to write the catalog, in seconds.
+    """
+    start = time.perf_counter()
+    book_repository = MappedBookRepository(path)
+    for index in range(NUMBER_OF_BOOKS):
+        book_id = book_repository.get_next_book_id()
+        book_repository.add_book(Book(book_id, f"Title {book_id}", f"Author {book_id % 1000}"))
+    for book_id in random.Random(1).sample(range(1, NUMBER_OF_BOOKS + 1), int(NUMBER_OF_BOOKS * DELETED_FRACTION)):
+        book_repository.remove_book_by_index(book_repository.get_index_by_id(book_id))
+    book_repository.close()
+    return time.perf_counter() - start
+
+
+def measure_lookups(book_repository):
+    """
+    Function to measure the average latency of looking up books by random IDs.
+    :param book_repository: object, the repository to be measured.
+    :return: float, the average latency of a lookup, in microseconds.
+    """
+    book_ids = [random.randint(1, NUMBER_OF_BOOKS) for _ in range(NUMBER_OF_LOOKUPS)]
+    start = time.perf_counter()
+    for book_id in book_ids:
+        book_repository.get_by_id(book_id)
+    return (time.perf_counter() - start) / NUMBER_OF_LOOKUPS * 1_000_000
+
+
+def measure_memory(open_repository):
+    """
+    Function to measure the memory allocated by Python objects when a repository is opened.
+    :param open_repository: function, opening the repository to be measured.
+    :return: tuple, containing the repository and the allocated memory, in megabytes.
+    """
+    tracemalloc.start()
+    book_repository = open_repository()
+    allocated_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return book_repository, allocated_memory / 1024 / 1024
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "books.rec")
+        print(f"Write {NUMBER_OF_BOOKS} books: {build_record_file(path):.2f} s, "
+              f"file size {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+        def open_in_memory():
+            book_repository = BookRepository()
+            for book in MappedBookRepository(path, read_only=True).get_all_books():
+                book_repository.add_book(book)
+            return book_repository
+
+        print(f"{'Repository':>24} {'Python memory (MB)':>20} {'Lookup by ID (us)':>18}")
+        for name, open_repository in [("in memory", open_in_memory),
+                                      ("mapped", lambda: MappedBookRepository(path, read_only=True))]:
+            book_repository, allocated_memory = measure_memory(open_repository)
+            print(f"{name:>24} {allocated_memory:>20.1f} {measure_lookups(book_repository):>18.2f}")
+
+        dropped = compact_record_file(path, BOOK_FILE_MAGIC, BOOK_FIELDS)
+        book_repository, allocated_memory = measure_memory(lambda: MappedBookRepository(path, read_only=True))
+        print(f"{'mapped, compacted':>24} {allocated_memory:>20.1f} {measure_lookups(book_repository):>18.2f} "
+              f"({dropped} deleted records dropped)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
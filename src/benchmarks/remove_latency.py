@@ -0,0 +1,39 @@
+import time
+
+from src.domain.entity import Book
+from src.domain.repository import BookRepository
+
+CATALOG_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+NUMBER_OF_REMOVALS = 1_000
+
+
+def measure_front_removals(number_of_books, number_of_removals):
+    """
+    Function to measure the latency of removing the books from the front of a catalog of the given size, one at a
+    time, including the compactions they trigger.
+    :param number_of_books: integer, the number of books in the catalog.
+    :param number_of_removals: integer, the number of books to be removed.
+    :return: tuple, containing the average, median and maximum latency of a removal, in microseconds.
+    """
+    book_repository = BookRepository()
+    book_repository.add_books(Book(book_id, "Opponent Of Dawn", "Lamont Fitting")
+                              for book_id in range(1, number_of_books + 1))
+    latencies = []
+    for book_id in range(1, number_of_removals + 1):
+        start = time.perf_counter()
+        book_repository.remove_book_by_index(book_repository.get_index_by_id(book_id))
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[len(latencies) // 2], latencies[-1]
+
+
+def run_benchmark():
+    print(f"{'Books':>10} {'Removals':>10} {'Average (us)':>14} {'Median (us)':>13} {'Maximum (us)':>14}")
+    for number_of_books in CATALOG_SIZES:
+        for number_of_removals in [NUMBER_OF_REMOVALS, number_of_books]:
+            average, median, maximum = measure_front_removals(number_of_books, number_of_removals)
+            print(f"{number_of_books:>10} {number_of_removals:>10} {average:>14.2f} {median:>13.2f} {maximum:>14.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,55 @@
+import time
+
+from src.domain.entity import Book, Client
+from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.service import RentalService
+
+CATALOG_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+NUMBER_OF_CLIENTS = 1_000
+NUMBER_OF_RENTALS = 1_000
+
+
+def build_rental_service(number_of_books):
+    """
+    Function to build a rental service over a catalog of the given size. The books and clients are added straight
+    to the repositories, so that only the renting itself is measured.
+    :param number_of_books: integer, the number of books in the catalog.
+    :return: the 'RentalService' object pointing towards the populated repositories.
+    """
+    book_repository = BookRepository()
+    client_repository = ClientRepository()
+    rental_repository = RentalRepository()
+    for index in range(number_of_books):
+        book_repository.add_book(Book(book_repository.get_next_book_id(), "Opponent Of Dawn", "Lamont Fitting"))
+    for index in range(NUMBER_OF_CLIENTS):
+        client_repository.add_client(Client(client_repository.get_next_client_id(), "Telma Dildine"))
+    return RentalService(book_repository, client_repository, rental_repository,
+                         BookValidator(), ClientValidator(), RentalValidator())
+
+
+def measure_rent_latency(number_of_books):
+    """
+    Function to measure the average latency of renting a book from a catalog of the given size. The rented books are
+    spread evenly over the catalog, so that the last books are rented as well as the first ones.
+    :param number_of_books: integer, the number of books in the catalog.
+    :return: float, the average latency of a rent, in microseconds.
+    """
+    rental_service = build_rental_service(number_of_books)
+    step = max(number_of_books // NUMBER_OF_RENTALS, 1)
+    book_ids = [book_id for book_id in range(number_of_books, 0, -step)][:NUMBER_OF_RENTALS]
+    start = time.perf_counter()
+    for index, book_id in enumerate(book_ids):
+        rental_service.add_rental(book_id, index % NUMBER_OF_CLIENTS + 1)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(book_ids) * 1_000_000
+
+
+def run_benchmark():
+    print(f"{'Books':>10} {'Rent latency (us)':>20}")
+    for number_of_books in CATALOG_SIZES:
+        print(f"{number_of_books:>10} {measure_rent_latency(number_of_books):>20.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
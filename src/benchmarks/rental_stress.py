@@ -0,0 +1,161 @@
+import argparse
+import random
+import sys
+import threading
+import time
+
+from src.benchmarks.suite import Library
+from src.domain.statistics import RentalStatistics
+from src.services.locking import ReadWriteLock
+
+DEFAULT_NUMBER_OF_BOOKS = 10_000
+DEFAULT_HOT_BOOKS = 20
+DEFAULT_RENTING_THREADS = 16
+DEFAULT_READING_THREADS = 4
+DEFAULT_OPERATIONS_PER_THREAD = 5_000
+SWITCH_INTERVAL = 0.000001
+
+
+def run_renting_thread(library, hot_book_ids, number_of_operations, seed, counts, start_barrier):
+    """
+    Function to rent and return the hot books at random, counting the successful rents and returns.
+    :param library: object, the loaded 'Library' of the benchmark suite.
+    :param hot_book_ids: list, containing the IDs of the books all the threads fight over.
+    :param number_of_operations: integer, the number of rent or return attempts.
+    :param seed: integer, the seed of the attempts of the thread.
+    :param counts: list, holding the number of successful rents and returns of the thread, updated in place.
+    :param start_barrier: object, the 'threading.Barrier' all the threads start together on.
+    """
+    rng = random.Random(seed)
+    rental_service = library.rental_service
+    start_barrier.wait()
+    for _ in range(number_of_operations):
+        book_id = rng.choice(hot_book_ids)
+        if rng.random() < 0.5:
+            if rental_service.rent_if_available(book_id, rng.randint(1, library.number_of_clients)):
+                counts[0] += 1
+        elif rental_service.return_if_rented(book_id):
+            counts[1] += 1
+
+
+def run_reading_thread(library, hot_book_ids, stop_event, counts, start_barrier):
+    """
+    Function to read the catalog and the statistics until it is stopped, counting the reads.
+    :param library: object, the loaded 'Library' of the benchmark suite.
+    :param hot_book_ids: list, containing the IDs of the books the renting threads fight over.
+    :param stop_event: object, the 'threading.Event' set once the renting threads are done.
+    :param counts: list, holding the number of reads of the thread, updated in place.
+    :param start_barrier: object, the 'threading.Barrier' all the threads start together on.
+    """
+    start_barrier.wait()
+    while not stop_event.is_set():
+        for book_id in hot_book_ids:
+            library.rental_service.get_book_rental_status(book_id)
+            library.book_service.get_book_by_book_id(book_id)
+        library.statistics_service.get_most_rented_books(10)
+        counts[0] += len(hot_book_ids) * 2 + 1
+
+
+def check_rentals(library, hot_book_ids, rentals_before, rents, returns):
+    """
+    Function to check that no book was rented twice at the same time and that the rentals, the active rentals and the
+    statistics agree with the rents and returns the threads counted.
+    :return: list, containing the descriptions of the problems found; empty if there are none.
+    """
+    problems = []
+    new_rentals = list(library.rental_service.get_all_rentals())[rentals_before:]
+    if len(new_rentals) != rents:
+        problems.append(f"{rents} successful rents, but {len(new_rentals)} new rentals.")
+    returned_rentals = sum(1 for rental in new_rentals if rental.returned_date is not None)
+    if returned_rentals > returns:
+        problems.append(f"{returns} successful returns, but {returned_rentals} new rentals are returned.")
+    for book_id in hot_book_ids:
+        open_rentals = [rental for rental in library.rental_service.get_all_rentals()
+                        if rental.book_id == book_id and rental.returned_date is None]
+        if len(open_rentals) > 1:
+            problems.append(f"Book {book_id} is rented {len(open_rentals)} times at once.")
+        active_client_id = library.rental_service.get_book_rental_status(book_id)
+        expected_client_id = open_rentals[0].client_id if len(open_rentals) == 1 else None
+        if active_client_id != expected_client_id:
+            problems.append(f"Book {book_id} is rented by client {active_client_id} in the active rentals index, but "
+                            f"by client {expected_client_id} in the rental history.")
+    rebuilt_statistics = RentalStatistics()
+    for rental in library.rental_service.get_all_rentals():
+        rebuilt_statistics.record_rental(rental.book_id, library.book_repository.get_by_id(rental.book_id).author,
+                                         rental.client_id, rental.rented_date)
+        if rental.returned_date is not None:
+            rebuilt_statistics.record_return(rental.client_id, rental.rented_date, rental.returned_date)
+    live_counts = dict(library.statistics_service.get_most_rented_books())
+    if live_counts != dict(rebuilt_statistics.get_most_rented_books()):
+        problems.append("The live rental statistics differ from the ones rebuilt from the rental history.")
+    return problems
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Hammer rent/return from many threads and check for double rentals.")
+    parser.add_argument("--books", type=int, default=DEFAULT_NUMBER_OF_BOOKS, help="the number of books of the library")
+    parser.add_argument("--hot-books", type=int, default=DEFAULT_HOT_BOOKS,
+                        help="the number of books all the threads fight over")
+    parser.add_argument("--threads", type=int, default=DEFAULT_RENTING_THREADS, help="the number of renting threads")
+    parser.add_argument("--readers", type=int, default=DEFAULT_READING_THREADS, help="the number of reading threads")
+    parser.add_argument("--operations", type=int, default=DEFAULT_OPERATIONS_PER_THREAD,
+                        help="the number of rent or return attempts per renting thread")
+    parser.add_argument("--no-lock", action="store_true",
+                        help="run the services without their lock, to show the double rentals it prevents")
+    parser.add_argument("--seed", type=int, default=2021, help="the seed of the data and of the attempts")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    library = Library(arguments.books, arguments.seed, None if arguments.no_lock else ReadWriteLock())
+    library.load()
+    hot_book_ids = random.Random(arguments.seed).sample(range(1, arguments.books + 1), arguments.hot_books)
+    rentals_before = len(library.rental_service.get_all_rentals())
+
+    renting_counts = [[0, 0] for _ in range(arguments.threads)]
+    reading_counts = [[0] for _ in range(arguments.readers)]
+    stop_event = threading.Event()
+    start_barrier = threading.Barrier(arguments.threads + arguments.readers + 1)
+    renting_threads = [threading.Thread(target=run_renting_thread,
+                                        args=(library, hot_book_ids, arguments.operations,
+                                              arguments.seed * 1_000_003 + index, renting_counts[index],
+                                              start_barrier))
+                       for index in range(arguments.threads)]
+    reading_threads = [threading.Thread(target=run_reading_thread,
+                                        args=(library, hot_book_ids, stop_event, reading_counts[index], start_barrier))
+                       for index in range(arguments.readers)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(SWITCH_INTERVAL)
+    try:
+        for thread in renting_threads + reading_threads:
+            thread.start()
+        start_barrier.wait()
+        start = time.perf_counter()
+        for thread in renting_threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stop_event.set()
+        for thread in reading_threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    rents = sum(counts[0] for counts in renting_counts)
+    returns = sum(counts[1] for counts in renting_counts)
+    reads = sum(counts[0] for counts in reading_counts)
+    print(f"{arguments.threads} renting and {arguments.readers} reading threads, {arguments.hot_books} hot books: "
+          f"{rents} rents and {returns} returns ({(arguments.threads * arguments.operations) / elapsed:.0f} "
+          f"attempts/s), {reads} reads ({reads / elapsed:.0f} reads/s) in {elapsed:.2f} s.")
+    problems = check_rentals(library, hot_book_ids, rentals_before, rents, returns)
+    for problem in problems:
+        print(f"   {problem}")
+    if len(problems) > 0:
+        print(f"{len(problems)} problems found.")
+        return 1
+    print("No double rentals found.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+
+from src.domain.entity import Book, Client
+from src.domain.sqlite_repository import open_database, transaction, SqliteBookRepository, SqliteClientRepository, \
+    SqliteRentalRepository
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.service import BookService, RentalService
+
+CATALOG_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+NUMBER_OF_CLIENTS = 1_000
+NUMBER_OF_OPERATIONS = 1_000
+BATCH_SIZE = 10_000
+
+
+def build_services(path, number_of_books):
+    """
+    Function to build the book and rental services over SQLite repositories kept in the given database file, loading
+    the catalog in batches of 'BATCH_SIZE' books per transaction.
+    :param path: string, the path of the database file.
+    :param number_of_books: integer, the number of books in the catalog.
+    :return: tuple, containing the 'BookService' object, the 'RentalService' object and the load time in seconds.
+    """
+    connection = open_database(path)
+    book_repository = SqliteBookRepository(connection)
+    client_repository = SqliteClientRepository(connection)
+    rental_repository = SqliteRentalRepository(connection)
+    start = time.perf_counter()
+    for first_id in range(1, number_of_books + 1, BATCH_SIZE):
+        last_id = min(first_id + BATCH_SIZE, number_of_books + 1)
+        book_repository.add_books(Book(book_id, f"Title {book_id}", f"Author {book_id % 1000}")
+                                  for book_id in range(first_id, last_id))
+    with transaction(connection):
+        client_repository.add_clients(Client(client_id, f"Client {client_id}")
+                                      for client_id in range(1, NUMBER_OF_CLIENTS + 1))
+    load_time = time.perf_counter() - start
+    book_service = BookService(book_repository, BookValidator())
+    rental_service = RentalService(book_repository, client_repository, rental_repository,
+                                   BookValidator(), ClientValidator(), RentalValidator())
+    return book_service, rental_service, load_time
+
+
+def measure_latencies(operation, arguments):
+    """
+    Function to measure the latency of each call of the given operation.
+    :param operation: function, the operation to be measured.
+    :param arguments: list, containing the argument tuples of the calls.
+    :return: tuple, containing the median and the 99th percentile latencies, in microseconds.
+    """
+    latencies = []
+    for call_arguments in arguments:
+        start = time.perf_counter()
+        operation(*call_arguments)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[len(latencies) * 99 // 100]
+
+
+def run_benchmark():
+    print(f"{'Books':>10} {'Load (s)':>9} {'Find by title/author p50/p99 (us)':>36} {'Rent p50/p99 (us)':>20}")
+    for number_of_books in CATALOG_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "library.db")
+            book_service, rental_service, load_time = build_services(path, number_of_books)
+            step = max(number_of_books // NUMBER_OF_OPERATIONS, 1)
+            book_ids = list(range(number_of_books, 0, -step))[:NUMBER_OF_OPERATIONS]
+            find_median, find_tail = measure_latencies(
+                book_service.find_book_by_title_and_author,
+                [(f"Title {book_id}", f"Author {book_id % 1000}") for book_id in book_ids])
+            rent_median, rent_tail = measure_latencies(
+                rental_service.add_rental,
+                [(book_id, index % NUMBER_OF_CLIENTS + 1) for index, book_id in enumerate(book_ids)])
+            print(f"{number_of_books:>10} {load_time:>9.2f} {f'{find_median:.1f} / {find_tail:.1f}':>36} "
+                  f"{f'{rent_median:.1f} / {rent_tail:.1f}':>20}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,321 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from src.benchmarks.data_generator import LibraryDataGenerator, TITLE_NOUNS, LAST_NAMES
+from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+from src.domain.statistics import RentalStatistics
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.bulk_import import split_in_batches
+from src.services.service import BookService, ClientService, RentalService, StatisticsService
+from src.services.undo import UndoService
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+CLIENTS_PER_BOOK = 0.1
+RENTALS_PER_BOOK = 1
+NUMBER_OF_OPERATIONS = 1_000
+STATISTICS_LIMIT = 10
+BATCH_SIZE = 100_000
+DEFAULT_SEED = 2021
+DEFAULT_TOLERANCE = 0.2
+
+
+class Library(object):
+    """
+    In-memory library wired the same way as 'main.py' (with statistics and undo), filled with synthetic data. The
+    services share the given 'ReadWriteLock', if any.
+    """
+
+    def __init__(self, number_of_books, seed, lock=None):
+        self.generator = LibraryDataGenerator(seed)
+        self.number_of_books = number_of_books
+        self.number_of_clients = max(int(number_of_books * CLIENTS_PER_BOOK), 1)
+        self.number_of_rentals = int(number_of_books * RENTALS_PER_BOOK)
+
+        self.book_repository = BookRepository()
+        self.client_repository = ClientRepository()
+        self.rental_repository = RentalRepository()
+        book_validator = BookValidator()
+        rental_statistics = RentalStatistics()
+        self.undo_service = UndoService(lock=lock)
+        self.rental_service = RentalService(self.book_repository, self.client_repository, self.rental_repository,
+                                            book_validator, ClientValidator(), RentalValidator(), rental_statistics,
+                                            self.undo_service, lock)
+        self.book_service = BookService(self.book_repository, book_validator, rental_statistics, self.undo_service,
+                                        self.rental_service, lock)
+        self.client_service = ClientService(self.client_repository, ClientValidator(), self.undo_service,
+                                            self.rental_service, lock)
+        self.statistics_service = StatisticsService(rental_statistics, lock)
+
+    def load(self):
+        """
+        Function to fill the repositories with the synthetic books, clients and rentals, in batches of 'BATCH_SIZE',
+        and to count the rentals into the statistics.
+        :return: float, the load time, in seconds.
+        """
+        start = time.perf_counter()
+        for books in split_in_batches(self.generator.generate_books(self.number_of_books), BATCH_SIZE):
+            for book in books:
+                book.id = self.book_repository.get_next_book_id()
+            self.book_repository.add_books(books)
+        for clients in split_in_batches(self.generator.generate_clients(self.number_of_clients), BATCH_SIZE):
+            for client in clients:
+                client.id = self.client_repository.get_next_client_id()
+            self.client_repository.add_clients(clients)
+        for rental in self.generator.generate_rentals(self.number_of_rentals, self.number_of_books,
+                                                      self.number_of_clients):
+            rental.id = self.rental_repository.get_next_rental_id()
+            self.rental_repository.add_rental(rental)
+        self.rental_service.rebuild_statistics()
+        return time.perf_counter() - start
+
+
+def get_workloads(library, number_of_operations, seed):
+    """
+    Function to return the workloads of the suite, one per service operation, in the order they must be run. The
+    arguments of each call are drawn from a random generator seeded with the given seed, and computed right before the
+    call (outside of its measured time), so that the changing operations (updates, removals, rents, returns) always get
+    arguments that are valid at that moment. The read-only workloads come first, so that every scale is measured on the
+    same data.
+    :param library: object, the loaded 'Library'.
+    :param number_of_operations: integer, the maximum number of calls of each operation.
+    :param seed: integer, the seed of the random generator.
+    :return: list, containing (name, function, iterable of argument tuples) tuples.
+    """
+    rng = random.Random(seed)
+    book_repository = library.book_repository
+    client_repository = library.client_repository
+    book_service = library.book_service
+    client_service = library.client_service
+    rental_service = library.rental_service
+    statistics_service = library.statistics_service
+
+    def sample_book_ids():
+        return rng.sample(range(1, library.number_of_books + 1), min(number_of_operations, library.number_of_books))
+
+    def sample_client_ids():
+        return rng.sample(range(1, library.number_of_clients + 1),
+                          min(number_of_operations, library.number_of_clients))
+
+    def random_book_ids():
+        return [rng.randint(1, library.number_of_books) for _ in range(number_of_operations)]
+
+    def random_client_ids():
+        return [rng.randint(1, library.number_of_clients) for _ in range(number_of_operations)]
+
+    def existing_books(book_ids):
+        for book_id in book_ids:
+            book = book_repository.get_by_id(book_id)
+            if book is not None:
+                yield book
+
+    def existing_clients(client_ids):
+        for client_id in client_ids:
+            client = client_repository.get_by_id(client_id)
+            if client is not None:
+                yield client
+
+    def rent_arguments(book_ids, rented_book_ids):
+        for book_id in book_ids:
+            if rental_service.is_book_available_by_book_id(book_id):
+                rented_book_ids.append(book_id)
+                yield book_id, rng.randint(1, library.number_of_clients)
+
+    def return_by_id_arguments(rented_book_ids):
+        for book_id in rented_book_ids:
+            rental_id = rental_service.find_rental_id_by_book_id(book_id)
+            if rental_id is not None:
+                yield rental_id,
+
+    def return_by_book_id_arguments(book_ids):
+        for book_id in book_ids:
+            if not rental_service.is_book_available_by_book_id(book_id):
+                yield book_id,
+
+    def changed_books(book_ids):
+        for book in existing_books(book_ids):
+            yield book.title, book.author, library.generator.generate_title(), book.author
+
+    rented_book_ids = []
+    return [
+        ("book.find_by_title_and_author", book_service.find_book_by_title_and_author,
+         [(book.title, book.author) for book in existing_books(random_book_ids())]),
+        ("book.get_by_id", book_service.get_book_by_book_id, [(book_id,) for book_id in random_book_ids()]),
+        ("book.search_by_id", book_service.find_all_books_matching_id, [(book_id,) for book_id in random_book_ids()]),
+        ("book.search_by_title", book_service.find_all_books_matching_title,
+         [(rng.choice(TITLE_NOUNS).lower(),) for _ in range(number_of_operations)]),
+        ("book.search_by_author", book_service.find_all_books_matching_author,
+         [(rng.choice(LAST_NAMES).lower(),) for _ in range(number_of_operations)]),
+        ("client.find_by_name", client_service.find_client_by_name,
+         [(client.name,) for client in existing_clients(random_client_ids())]),
+        ("client.search_by_id", client_service.find_all_clients_matching_id,
+         [(client_id,) for client_id in random_client_ids()]),
+        ("client.search_by_name", client_service.find_all_clients_matching_name,
+         [(rng.choice(LAST_NAMES).lower(),) for _ in range(number_of_operations)]),
+        ("rental.is_book_available", rental_service.is_book_available_by_book_id,
+         [(book_id,) for book_id in random_book_ids()]),
+        ("rental.get_book_rental_status", rental_service.get_book_rental_status,
+         [(book_id,) for book_id in random_book_ids()]),
+        ("rental.get_client_active_rentals", rental_service.get_client_active_rentals,
+         [(client_id,) for client_id in random_client_ids()]),
+        ("statistics.most_rented_books", statistics_service.get_most_rented_books,
+         [(STATISTICS_LIMIT,)] * number_of_operations),
+        ("statistics.most_active_clients", statistics_service.get_most_active_clients,
+         [(STATISTICS_LIMIT,)] * number_of_operations),
+        ("statistics.most_rented_authors", statistics_service.get_most_rented_authors,
+         [(STATISTICS_LIMIT,)] * number_of_operations),
+        ("rental.rent", rental_service.add_rental, rent_arguments(sample_book_ids(), rented_book_ids)),
+        ("rental.return_by_id", rental_service.return_rental_by_id, return_by_id_arguments(rented_book_ids)),
+        ("rental.return_by_book_id", rental_service.return_rental_by_book_id,
+         return_by_book_id_arguments(sample_book_ids())),
+        ("book.add", book_service.add_book,
+         [(library.generator.generate_title(), library.generator.generate_name())
+          for _ in range(number_of_operations)]),
+        ("book.update", book_service.update_book, changed_books(sample_book_ids())),
+        ("book.remove", book_service.remove_book_by_title_and_author,
+         ((book.title, book.author) for book in existing_books(sample_book_ids()))),
+        ("client.add", client_service.add_client,
+         [(library.generator.generate_name(),) for _ in range(number_of_operations)]),
+        ("client.update", client_service.update_client_by_name,
+         ((client.name, library.generator.generate_name()) for client in existing_clients(sample_client_ids()))),
+        ("client.remove", client_service.remove_client_by_name,
+         ((client.name,) for client in existing_clients(sample_client_ids()))),
+    ]
+
+
+def measure(function, arguments):
+    """
+    Function to call a function once per argument tuple and to summarize the latencies of the calls. Only the calls
+    themselves are timed, not the computing of their arguments.
+    :param function: function, the operation to be measured.
+    :param arguments: iterable, containing the argument tuples of the calls.
+    :return: dictionary, holding the number of calls, the operations per second and the median, 99th percentile and
+    maximum latencies in microseconds; None if there were no calls.
+    """
+    perf_counter = time.perf_counter
+    latencies = []
+    for call_arguments in arguments:
+        start = perf_counter()
+        function(*call_arguments)
+        latencies.append(perf_counter() - start)
+    if len(latencies) == 0:
+        return None
+    total_time = sum(latencies)
+    latencies.sort()
+    return {"operations": len(latencies),
+            "ops_per_second": len(latencies) / total_time if total_time > 0 else float("inf"),
+            "p50_us": latencies[len(latencies) // 2] * 1_000_000,
+            "p99_us": latencies[min(len(latencies) * 99 // 100, len(latencies) - 1)] * 1_000_000,
+            "max_us": latencies[-1] * 1_000_000}
+
+
+def run_suite(scales, number_of_operations, seed, only=None, on_result=None):
+    """
+    Function to run the suite at each of the given scales.
+    :param scales: list, containing the numbers of books of the libraries; each library also gets 'CLIENTS_PER_BOOK'
+    clients and 'RENTALS_PER_BOOK' rentals per book.
+    :param number_of_operations: integer, the maximum number of calls of each operation.
+    :param seed: integer, the seed of the data and of the arguments; equal seeds give equal workloads.
+    :param only: list, containing the prefixes of the names of the workloads to be run (e.g. "book.search"); None to
+    run all of them.
+    :param on_result: function, called with (scale, name, result) after each workload; None to ignore.
+    :return: dictionary, the report, holding the parameters of the run and, for each scale, the load time and the
+    results of the workloads.
+    """
+    report = {"seed": seed, "operations": number_of_operations, "python": platform.python_version(),
+              "machine": platform.machine(), "scales": {}}
+    for scale in scales:
+        library = Library(scale, seed)
+        load_time = library.load()
+        results = {}
+        for name, function, arguments in get_workloads(library, number_of_operations, seed + scale):
+            if only is not None and not name.startswith(tuple(only)):
+                continue
+            result = measure(function, arguments)
+            if result is None:
+                continue
+            results[name] = result
+            if on_result is not None:
+                on_result(scale, name, result)
+        report["scales"][str(scale)] = {"load_seconds": load_time, "results": results}
+    return report
+
+
+def compare_reports(baseline, current, tolerance):
+    """
+    Function to compare the results of two reports, workload by workload, at the scales found in both.
+    :param baseline: dictionary, the report of the reference run.
+    :param current: dictionary, the report of the new run.
+    :param tolerance: float, the relative slowdown (of the operations per second or of the 99th percentile latency)
+    above which a workload counts as a regression, e.g. 0.2 for 20%.
+    :return: list, containing (scale, name, baseline result, current result, is regression) tuples.
+    """
+    comparisons = []
+    for scale, scale_report in current["scales"].items():
+        baseline_scale = baseline["scales"].get(scale)
+        if baseline_scale is None:
+            continue
+        for name, result in scale_report["results"].items():
+            baseline_result = baseline_scale["results"].get(name)
+            if baseline_result is None:
+                continue
+            is_regression = result["ops_per_second"] < baseline_result["ops_per_second"] * (1 - tolerance) or \
+                result["p99_us"] > baseline_result["p99_us"] * (1 + tolerance)
+            comparisons.append((scale, name, baseline_result, result, is_regression))
+    return comparisons
+
+
+def print_result(scale, name, result):
+    print(f"{scale:>10} {name:<34} {result['operations']:>6} {result['ops_per_second']:>14.0f} "
+          f"{result['p50_us']:>10.1f} {result['p99_us']:>10.1f} {result['max_us']:>10.0f}", flush=True)
+
+
+def print_comparisons(comparisons):
+    print(f"{'Scale':>10} {'Operation':<34} {'Ops/s before':>14} {'Ops/s now':>14} {'p99 before':>11} "
+          f"{'p99 now':>11}")
+    for scale, name, baseline_result, result, is_regression in comparisons:
+        print(f"{scale:>10} {name:<34} {baseline_result['ops_per_second']:>14.0f} {result['ops_per_second']:>14.0f} "
+              f"{baseline_result['p99_us']:>11.1f} {result['p99_us']:>11.1f}{'  REGRESSION' if is_regression else ''}")
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Benchmark every service operation on synthetic libraries.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="the numbers of books of the libraries, e.g. 1000 10000 100000 1000000 10000000")
+    parser.add_argument("--operations", type=int, default=NUMBER_OF_OPERATIONS,
+                        help="the maximum number of calls of each operation")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="the seed of the data and of the workloads")
+    parser.add_argument("--only", nargs="+", default=None,
+                        help="only run the workloads whose names start with one of these prefixes, e.g. book.search")
+    parser.add_argument("--output", default=None, help="the JSON file the report is saved to")
+    parser.add_argument("--compare", default=None, help="the JSON report of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="the relative slowdown counted as a regression when comparing, e.g. 0.2 for 20%%")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    print(f"{'Scale':>10} {'Operation':<34} {'Calls':>6} {'Ops/s':>14} {'p50 (us)':>10} {'p99 (us)':>10} "
+          f"{'Max (us)':>10}")
+    report = run_suite(arguments.scales, arguments.operations, arguments.seed, arguments.only, print_result)
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+    if arguments.compare is None:
+        return 0
+    with open(arguments.compare, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["seed"] != report["seed"] or baseline["operations"] != report["operations"]:
+        print("Warning: the reports were made with different seeds or numbers of operations.", file=sys.stderr)
+    comparisons = compare_reports(baseline, report, arguments.tolerance)
+    print()
+    print_comparisons(comparisons)
+    return 1 if any(is_regression for *_, is_regression in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,229 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.domain.entity import Book, Client
+from src.domain.persistence import WriteAheadLog, DurableBookRepository, DurableClientRepository, \
+    DurableRentalRepository, LOG_FILE_NAME
+from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.service import RentalService
+
+NUMBER_OF_BOOKS = 1_000
+NUMBER_OF_CLIENTS = 100
+NUMBER_OF_RENTALS = 20_000
+SYNC_SETTINGS = [1, 100, 10_000]
+CRASH_AFTER_SECONDS = 1.0
+
+
+def open_durable_rental_service(directory, sync_every=100, snapshot_every=100_000):
+    """
+    Function to build a rental service over durable repositories kept in the given directory, restoring whatever the
+    directory already holds. An empty directory is populated with the benchmark catalog.
+    :param directory: string, the directory of the write-ahead log.
+    :param sync_every: integer, the number of changes after which the log is forced to the disk.
+    :param snapshot_every: integer, the number of changes after which a snapshot is written.
+    :return: tuple, containing the 'RentalService' object and the 'WriteAheadLog' object.
+    """
+    write_ahead_log = WriteAheadLog(directory, sync_every=sync_every, sync_interval=float("inf"),
+                                    snapshot_every=snapshot_every)
+    book_repository = DurableBookRepository(write_ahead_log)
+    client_repository = DurableClientRepository(write_ahead_log)
+    rental_repository = DurableRentalRepository(write_ahead_log)
+    write_ahead_log.open()
+    if len(book_repository.get_all_books()) == 0:
+        populate_catalog(book_repository, client_repository)
+    rental_service = RentalService(book_repository, client_repository, rental_repository,
+                                   BookValidator(), ClientValidator(), RentalValidator())
+    rental_service.rebuild_statistics()
+    return rental_service, write_ahead_log
+
+
+def populate_catalog(book_repository, client_repository):
+    """
+    Function to add the benchmark books and clients straight to the given repositories.
+    :param book_repository: object, the book repository.
+    :param client_repository: object, the client repository.
+    """
+    for index in range(NUMBER_OF_BOOKS):
+        book_repository.add_book(Book(book_repository.get_next_book_id(), "Opponent Of Dawn", "Lamont Fitting"))
+    for index in range(NUMBER_OF_CLIENTS):
+        client_repository.add_client(Client(client_repository.get_next_client_id(), "Telma Dildine"))
+
+
+def rent_and_return(rental_service, number_of_rentals, on_rental=None):
+    """
+    Function to make the given number of rentals, cycling over the catalog and returning each book before it is rented
+    again.
+    :param rental_service: object, the rental service.
+    :param number_of_rentals: integer, the number of rentals to be made.
+    :param on_rental: function, called with the ID of each rental once it is made; None to call nothing.
+    """
+    for index in range(number_of_rentals):
+        book_id = index % NUMBER_OF_BOOKS + 1
+        active_rental_id = rental_service.find_rental_id_by_book_id(book_id)
+        if active_rental_id is not None:
+            rental_service.return_rental_by_id(active_rental_id)
+        rental_service.add_rental(book_id, index % NUMBER_OF_CLIENTS + 1)
+        if on_rental is not None:
+            on_rental(rental_service.get_all_rentals()[-1].id)
+
+
+def measure_in_memory_throughput():
+    """
+    Function to measure the sustained rentals per second of the in-memory repositories, as a baseline.
+    :return: float, the number of rentals per second.
+    """
+    book_repository = BookRepository()
+    client_repository = ClientRepository()
+    populate_catalog(book_repository, client_repository)
+    rental_service = RentalService(book_repository, client_repository, RentalRepository(),
+                                   BookValidator(), ClientValidator(), RentalValidator())
+    start = time.perf_counter()
+    rent_and_return(rental_service, NUMBER_OF_RENTALS)
+    return NUMBER_OF_RENTALS / (time.perf_counter() - start)
+
+
+def measure_durable_throughput(sync_every):
+    """
+    Function to measure the sustained rentals per second of the durable repositories, forcing the log to the disk
+    once every given number of changes. Each rental after the first pass over the catalog also logs a return.
+    :param sync_every: integer, the number of changes after which the log is forced to the disk.
+    :return: float, the number of rentals per second.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        rental_service, write_ahead_log = open_durable_rental_service(directory, sync_every)
+        start = time.perf_counter()
+        rent_and_return(rental_service, NUMBER_OF_RENTALS)
+        write_ahead_log.sync()
+        elapsed = time.perf_counter() - start
+        write_ahead_log.close()
+    return NUMBER_OF_RENTALS / elapsed
+
+
+def measure_recovery_time(number_of_rentals):
+    """
+    Function to measure the time taken to restore the repositories from a log holding the given number of rentals,
+    with and without a snapshot.
+    :param number_of_rentals: integer, the number of rentals in the log.
+    :return: tuple, containing the restore times from the log only and from a snapshot, in seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        rental_service, write_ahead_log = open_durable_rental_service(directory, 10_000, snapshot_every=10 ** 9)
+        rent_and_return(rental_service, number_of_rentals)
+        write_ahead_log.close()
+        start = time.perf_counter()
+        rental_service, write_ahead_log = open_durable_rental_service(directory, 10_000, snapshot_every=10 ** 9)
+        log_restore_time = time.perf_counter() - start
+        write_ahead_log.snapshot()
+        write_ahead_log.close()
+        start = time.perf_counter()
+        rental_service, write_ahead_log = open_durable_rental_service(directory, 10_000, snapshot_every=10 ** 9)
+        snapshot_restore_time = time.perf_counter() - start
+        write_ahead_log.close()
+    return log_restore_time, snapshot_restore_time
+
+
+def run_crashing_writer(directory):
+    """
+    Function run in a child process, renting books forever with the log forced to the disk on every change and
+    printing the ID of each rental once it is durable, until the process is killed.
+    :param directory: string, the directory of the write-ahead log.
+    """
+    rental_service, write_ahead_log = open_durable_rental_service(directory, sync_every=1, snapshot_every=5_000)
+
+    def acknowledge(rental_id):
+        print(rental_id, flush=True)
+
+    rent_and_return(rental_service, 10 ** 9, acknowledge)
+
+
+def check_crash_recovery():
+    """
+    Function to kill a writer process in the middle of its rentals, tear the last line of its log and check that the
+    restored repositories hold every acknowledged rental and are consistent.
+    :return: tuple, containing the number of acknowledged rentals and the number of restored rentals.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        writer = subprocess.Popen([sys.executable, "-m", "src.benchmarks.wal_throughput", "--crash-writer", directory],
+                                  stdout=subprocess.PIPE, text=True)
+        time.sleep(CRASH_AFTER_SECONDS)
+        writer.send_signal(signal.SIGKILL)
+        acknowledged = [int(line) for line in writer.communicate()[0].split()]
+        with open(os.path.join(directory, LOG_FILE_NAME), "ab") as log_file:
+            log_file.write(b'{"operation":"add","rental":[')
+
+        rental_service, write_ahead_log = open_durable_rental_service(directory)
+        rentals = rental_service.get_all_rentals()
+        assert len(rentals) >= len(acknowledged), "acknowledged rentals were lost"
+        assert [rental.id for rental in rentals] == list(range(1, len(rentals) + 1)), "rental IDs are not contiguous"
+        active_book_ids = [rental.book_id for rental in rentals if rental.returned_date is None]
+        assert len(active_book_ids) == len(set(active_book_ids)), "a book is rented twice"
+        for book_id in active_book_ids:
+            assert not rental_service.is_book_available_by_book_id(book_id), "active rentals index is inconsistent"
+        rent_and_return(rental_service, 10)
+        write_ahead_log.close()
+    return len(acknowledged), len(rentals)
+
+
+def check_batch_snapshot_recovery(batch_size=8, snapshot_every=5):
+    """
+    Function to add batches of books and clients crossing the snapshot threshold in their middle, restart the log and
+    check that every book and client is restored exactly once.
+    :return: integer, the number of restored books.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_ahead_log = WriteAheadLog(directory, snapshot_every=snapshot_every)
+        book_repository = DurableBookRepository(write_ahead_log)
+        client_repository = DurableClientRepository(write_ahead_log)
+        DurableRentalRepository(write_ahead_log)
+        write_ahead_log.open()
+        for _ in range(2):
+            book_repository.add_books([Book(book_repository.get_next_book_id(), "Opponent Of Dawn", "Lamont Fitting")
+                                       for _ in range(batch_size)])
+            client_repository.add_clients([Client(client_repository.get_next_client_id(), "Telma Dildine")
+                                           for _ in range(batch_size)])
+        write_ahead_log.close()
+
+        write_ahead_log = WriteAheadLog(directory, snapshot_every=snapshot_every)
+        book_repository = DurableBookRepository(write_ahead_log)
+        client_repository = DurableClientRepository(write_ahead_log)
+        DurableRentalRepository(write_ahead_log)
+        write_ahead_log.open()
+        book_ids = [book.id for book in book_repository.get_all_books()]
+        client_ids = [client.id for client in client_repository.get_all_clients()]
+        next_book_id = book_repository.get_next_book_id()
+        write_ahead_log.close()
+    expected_ids = list(range(1, 2 * batch_size + 1))
+    if book_ids != expected_ids or client_ids != expected_ids:
+        raise AssertionError(f"batches were restored as books {book_ids} and clients {client_ids}")
+    if next_book_id != 2 * batch_size + 1:
+        raise AssertionError(f"the next book ID after the restart is {next_book_id}")
+    return len(book_ids)
+
+
+def run_benchmark():
+    print(f"{'Repositories':>28} {'Rentals per second':>20}")
+    print(f"{'in memory':>28} {measure_in_memory_throughput():>20.0f}")
+    for sync_every in SYNC_SETTINGS:
+        print(f"{f'durable, fsync every {sync_every}':>28} {measure_durable_throughput(sync_every):>20.0f}")
+
+    log_restore_time, snapshot_restore_time = measure_recovery_time(NUMBER_OF_RENTALS)
+    print(f"Restore of {NUMBER_OF_RENTALS} rentals: {log_restore_time:.3f} s from the log, "
+          f"{snapshot_restore_time:.3f} s from a snapshot")
+
+    acknowledged, restored = check_crash_recovery()
+    print(f"Crash recovery: {acknowledged} rentals acknowledged, {restored} restored, repositories consistent")
+
+    restored = check_batch_snapshot_recovery()
+    print(f"Snapshot in the middle of a batch: {restored} books restored, none twice")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--crash-writer":
+        run_crashing_writer(sys.argv[2])
+    else:
+        run_benchmark()
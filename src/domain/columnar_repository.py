@@ -0,0 +1,379 @@
+from collections.abc import Sequence
+from datetime import date
+
+from src.domain.entity import Rental
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NOT_RETURNED = 0
+
+
+class ColumnarRentalRepository(object):
+    """
+    Rental repository storing the rental history column by column, in growable NumPy arrays: rental ID, book ID,
+    client ID, rented date ordinal and returned date ordinal (0 while the book is not returned). It exposes the same
+    functions as 'RentalRepository', building 'Rental' objects only when they are asked for, and lets
+    'ColumnarRentalStatistics' compute the statistics with vectorized operations over whole columns.
+    Rentals must be added in increasing order of their IDs, as handed out by 'get_next_rental_id'.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        if numpy is None:
+            raise ImportError("The columnar rental repository requires NumPy. ")
+        self.__size = 0
+        self.__rental_ids = numpy.zeros(initial_capacity, dtype=numpy.int64)
+        self.__book_ids = numpy.zeros(initial_capacity, dtype=numpy.int64)
+        self.__client_ids = numpy.zeros(initial_capacity, dtype=numpy.int64)
+        self.__rented_ordinals = numpy.zeros(initial_capacity, dtype=numpy.int64)
+        self.__returned_ordinals = numpy.zeros(initial_capacity, dtype=numpy.int64)
+        self.__active_rental_index_by_book_id = {}
+        self.__active_rental_indexes_by_client_id = {}
+        self.__last_rental_id = 0
+
+    def add_rental(self, rental):
+        """
+        Function to add a rental to the rental repository.
+        :param rental: object, contains the rental object to be appended to the repository.
+        """
+        if self.__size > 0 and rental.id <= self.__rental_ids[self.__size - 1]:
+            raise ValueError("Rentals must be added in increasing order of their IDs.")
+        if self.__size == len(self.__rental_ids):
+            self.__grow()
+        index = self.__size
+        self.__rental_ids[index] = rental.id
+        self.__book_ids[index] = rental.book_id
+        self.__client_ids[index] = rental.client_id
+        self.__rented_ordinals[index] = rental.rented_date.toordinal()
+        if rental.returned_date is None:
+            self.__returned_ordinals[index] = NOT_RETURNED
+            self.__active_rental_index_by_book_id[rental.book_id] = index
+            self.__active_rental_indexes_by_client_id.setdefault(rental.client_id, {})[index] = None
+        else:
+            self.__returned_ordinals[index] = rental.returned_date.toordinal()
+        self.__size += 1
+
+    def add_rentals(self, rentals):
+        """
+        Function to add many rentals to the rental repository at once.
+        :param rentals: iterable, contains the rental objects to be appended to the repository.
+        """
+        for rental in rentals:
+            self.add_rental(rental)
+
+    def remove_last_rental(self):
+        """
+        Function to remove the most recently added rental from the rental repository, e.g. when undoing it.
+        :return: the removed 'rental' object.
+        """
+        index = self.__size - 1
+        rental = self.__build_rental(index)
+        if rental.returned_date is None:
+            self.__remove_active_rental(index)
+        self.__size -= 1
+        return rental
+
+    def return_rental_by_index(self, index, returned_date=None):
+        """
+        Function to mark the rental found at the given positional index as returned.
+        :param index: integer, holds the value of the positional index of the rental to be returned.
+        :param returned_date: date, the date of the return; if None, the current date is used.
+        """
+        if returned_date is None:
+            returned_date = date.today()
+        self.__returned_ordinals[index] = returned_date.toordinal()
+        self.__remove_active_rental(index)
+
+    def reopen_rental_by_index(self, index):
+        """
+        Function to mark the returned rental found at the given positional index as active again, e.g. when undoing
+        its return.
+        :param index: integer, holds the value of the positional index of the rental to be reopened.
+        """
+        self.__returned_ordinals[index] = NOT_RETURNED
+        self.__active_rental_index_by_book_id[int(self.__book_ids[index])] = index
+        client_id = int(self.__client_ids[index])
+        client_active_rentals = self.__active_rental_indexes_by_client_id.get(client_id, {})
+        client_active_rentals[index] = None
+        self.__active_rental_indexes_by_client_id[client_id] = dict.fromkeys(sorted(client_active_rentals))
+
+    def get_by_id(self, rental_id):
+        """
+        Function to return the rental having the given ID.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: the 'rental' object if found, otherwise None.
+        """
+        index = self.get_index_by_id(rental_id)
+        if index is None:
+            return None
+        return self.__build_rental(index)
+
+    def contains_id(self, rental_id):
+        """
+        Function to return whether or not a rental having the given ID is found in the repository.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: True/False, whether or not the rental is found.
+        """
+        return self.get_index_by_id(rental_id) is not None
+
+    def get_index_by_id(self, rental_id):
+        """
+        Function to return the positional index of the rental having the given ID, with a binary search over the
+        rental ID column.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: integer, the positional index of the rental if found, otherwise None.
+        """
+        rental_ids = self.__rental_ids[:self.__size]
+        index = int(numpy.searchsorted(rental_ids, rental_id))
+        if index < self.__size and rental_ids[index] == rental_id:
+            return index
+        return None
+
+    def get_active_rental_by_book_id(self, book_id):
+        """
+        Function to return the active (not yet returned) rental of the book having the given ID.
+        :param book_id: integer, ID of the book whose active rental is looked for.
+        :return: the 'rental' object if the book is currently rented, otherwise None.
+        """
+        index = self.__active_rental_index_by_book_id.get(book_id)
+        if index is None:
+            return None
+        return self.__build_rental(index)
+
+    def get_active_rentals_by_client_id(self, client_id):
+        """
+        Function to return the active (not yet returned) rentals of the client having the given ID, in the order they
+        were made.
+        :param client_id: integer, ID of the client whose active rentals are looked for.
+        :return: list, containing the active rentals of the client.
+        """
+        client_active_rentals = self.__active_rental_indexes_by_client_id.get(client_id, {})
+        return [self.__build_rental(index) for index in client_active_rentals]
+
+    def get_rentals_by_client_id(self, client_id):
+        """
+        Function to return the full rental history of the client having the given ID, in the order the rentals were
+        made. The client ID column is scanned with a single vectorized comparison.
+        :param client_id: integer, ID of the client whose rentals are looked for.
+        :return: list, containing all the rentals of the client.
+        """
+        indexes = numpy.flatnonzero(self.__client_ids[:self.__size] == client_id)
+        return [self.__build_rental(int(index)) for index in indexes]
+
+    def get_next_rental_id(self):
+        """
+        Function to return the next valid ID for a rental in the repository.
+        :return: integer, next valid ID for a rental.
+        """
+        self.increment_last_rental_id()
+        return self.__last_rental_id
+
+    def increment_last_rental_id(self):
+        """
+        Function to increment the last used rental ID in the repository.
+        """
+        self.__last_rental_id += 1
+
+    def get_all_rentals(self):
+        """
+        Function to return the full list of rentals found in the repository, as a read-only sequence building each
+        'rental' object when it is accessed.
+        :return: sequence, containing the full list of rentals.
+        """
+        return ColumnarRentalsView(self)
+
+    def get_columns(self):
+        """
+        Function to return read-only views over the filled part of the columns of the repository.
+        :return: tuple, containing the book ID, client ID, rented date ordinal and returned date ordinal columns, the
+        returned date ordinal being 0 for the rentals that are not returned.
+        """
+        columns = (self.__book_ids, self.__client_ids, self.__rented_ordinals, self.__returned_ordinals)
+        views = []
+        for column in columns:
+            view = column[:self.__size]
+            view.flags.writeable = False
+            views.append(view)
+        return tuple(views)
+
+    def __len__(self):
+        return self.__size
+
+    def _get_rental_at(self, index):
+        return self.__build_rental(index)
+
+    def __remove_active_rental(self, index):
+        book_id = int(self.__book_ids[index])
+        if self.__active_rental_index_by_book_id.get(book_id) == index:
+            del self.__active_rental_index_by_book_id[book_id]
+        client_id = int(self.__client_ids[index])
+        client_active_rentals = self.__active_rental_indexes_by_client_id.get(client_id)
+        if client_active_rentals is not None:
+            client_active_rentals.pop(index, None)
+            if len(client_active_rentals) == 0:
+                del self.__active_rental_indexes_by_client_id[client_id]
+
+    def __build_rental(self, index):
+        returned_ordinal = int(self.__returned_ordinals[index])
+        returned_date = None if returned_ordinal == NOT_RETURNED else date.fromordinal(returned_ordinal)
+        return Rental(int(self.__rental_ids[index]), int(self.__book_ids[index]), int(self.__client_ids[index]),
+                      date.fromordinal(int(self.__rented_ordinals[index])), returned_date)
+
+    def __grow(self):
+        capacity = 2 * len(self.__rental_ids)
+        self.__rental_ids = numpy.resize(self.__rental_ids, capacity)
+        self.__book_ids = numpy.resize(self.__book_ids, capacity)
+        self.__client_ids = numpy.resize(self.__client_ids, capacity)
+        self.__rented_ordinals = numpy.resize(self.__rented_ordinals, capacity)
+        self.__returned_ordinals = numpy.resize(self.__returned_ordinals, capacity)
+
+
+class ColumnarRentalsView(Sequence):
+    """
+    Read-only sequence over the rentals of a 'ColumnarRentalRepository', building 'Rental' objects on access.
+    """
+
+    def __init__(self, columnar_rental_repository):
+        self.__repository = columnar_rental_repository
+
+    def __len__(self):
+        return len(self.__repository)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("Rental index out of range.")
+        return self.__repository._get_rental_at(index)
+
+    def snapshot(self):
+        """
+        Function to return a list of all the rentals of the view, unaffected by the later changes of the repository.
+        :return: list, containing the current rentals of the view.
+        """
+        return list(self)
+
+
+class ColumnarRentalStatistics(object):
+    """
+    Drop-in replacement of 'RentalStatistics' for a 'ColumnarRentalRepository': nothing is aggregated as rentals are
+    made, instead every statistic is computed over the whole rental history with vectorized NumPy operations
+    (bincount for the aggregates, argpartition/argsort for the ranking).
+    """
+
+    def __init__(self, columnar_rental_repository):
+        self.__rental_repository = columnar_rental_repository
+        self.__author_by_book_id = {}
+
+    def record_rental(self, book_id, author, client_id, rented_date):
+        """
+        Function to remember the author of a rented book, the rental itself being already stored in the columns.
+        :param book_id: integer, ID of the rented book.
+        :param author: string, name of the author of the rented book; None if the book is no longer known, e.g. when
+        the statistics are rebuilt from a rental history whose book was removed, in which case no author is counted.
+        :param client_id: integer, ID of the client renting the book.
+        :param rented_date: date, date of the rental.
+        """
+        if author is not None:
+            self.__author_by_book_id[book_id] = author
+
+    def record_return(self, client_id, rented_date, returned_date):
+        """
+        Function kept for compatibility with 'RentalStatistics'; returns are already stored in the columns.
+        """
+        pass
+
+    def cancel_rental(self, book_id, client_id, rented_date):
+        """
+        Function kept for compatibility with 'RentalStatistics'; removed rentals are already gone from the columns.
+        """
+        pass
+
+    def cancel_return(self, client_id, rented_date, returned_date):
+        """
+        Function kept for compatibility with 'RentalStatistics'; reopened rentals are already stored in the columns.
+        """
+        pass
+
+    def update_book_author(self, book_id, author):
+        """
+        Function to change the author the rentals of a book are counted for. Books that were never rented are ignored.
+        :param book_id: integer, ID of the book whose author changed.
+        :param author: string, the new name of the author of the book.
+        """
+        if book_id in self.__author_by_book_id:
+            self.__author_by_book_id[book_id] = author
+
+    def get_most_rented_books(self, k=None):
+        """
+        Function to return the most rented books, in descending order of their number of rentals.
+        :param k: integer, the number of books to be returned; if None, all the rented books are returned.
+        :return: list, containing (book ID, number of rentals) tuples.
+        """
+        book_ids, _, _, _ = self.__rental_repository.get_columns()
+        return self.__rank(numpy.bincount(book_ids), k)
+
+    def get_most_rented_authors(self, k=None):
+        """
+        Function to return the most rented authors, in descending order of the number of rentals of their books.
+        :param k: integer, the number of authors to be returned; if None, all the rented authors are returned.
+        :return: list, containing (author name, number of rentals) tuples.
+        """
+        book_ids, _, _, _ = self.__rental_repository.get_columns()
+        if len(book_ids) == 0:
+            return []
+        authors = list(dict.fromkeys(self.__author_by_book_id.values()))
+        code_by_author = {author: code for code, author in enumerate(authors)}
+        author_code_by_book_id = numpy.full(int(book_ids.max()) + 1, -1, dtype=numpy.int64)
+        for book_id, author in self.__author_by_book_id.items():
+            if book_id < len(author_code_by_book_id):
+                author_code_by_book_id[book_id] = code_by_author[author]
+        author_codes = author_code_by_book_id[book_ids]
+        rentals_by_author_code = numpy.bincount(author_codes[author_codes >= 0], minlength=len(authors))
+        return [(authors[code], rental_amount) for code, rental_amount in self.__rank(rentals_by_author_code, k)]
+
+    def get_client_rental_days(self, client_id, today=None):
+        """
+        Function to return the number of rental days of a client, counting its open rentals up to the given day.
+        :param client_id: integer, ID of the client.
+        :param today: date, the day up to which open rentals are counted; if None, the current date is used.
+        :return: integer, the number of rental days of the client.
+        """
+        rental_days_by_client_id = self.__get_rental_days_by_client_id(today)
+        if client_id < 0 or client_id >= len(rental_days_by_client_id):
+            return 0
+        return int(rental_days_by_client_id[client_id])
+
+    def get_most_active_clients(self, k=None, today=None):
+        """
+        Function to return the most active clients, in descending order of their number of rental days.
+        :param k: integer, the number of clients to be returned; if None, all the clients that rented are returned.
+        :param today: date, the day up to which open rentals are counted; if None, the current date is used.
+        :return: list, containing (client ID, number of rental days) tuples.
+        """
+        return self.__rank(self.__get_rental_days_by_client_id(today), k)
+
+    def __get_rental_days_by_client_id(self, today):
+        if today is None:
+            today = date.today()
+        _, client_ids, rented_ordinals, returned_ordinals = self.__rental_repository.get_columns()
+        returned_ordinals = numpy.where(returned_ordinals == NOT_RETURNED, today.toordinal(), returned_ordinals)
+        rental_days = returned_ordinals - rented_ordinals + 1
+        return numpy.bincount(client_ids, weights=rental_days).astype(numpy.int64)
+
+    @staticmethod
+    def __rank(values, k):
+        keys = numpy.flatnonzero(values > 0)
+        key_values = values[keys]
+        if k is not None and k < len(keys):
+            if k <= 0:
+                return []
+            selected = numpy.argpartition(-key_values, k - 1)[:k]
+            keys = keys[selected]
+            key_values = key_values[selected]
+        order = numpy.argsort(-key_values, kind="stable")
+        return [(int(key), int(value)) for key, value in zip(keys[order], key_values[order])]
@@ -0,0 +1,297 @@
+from array import array
+from bisect import insort
+from heapq import heapify, heappop, heappush
+
+
+class NGramIndex(object):
+    """
+    Inverted index answering case-insensitive substring queries over the texts of a repository's entities. Each
+    distinct case-folded text is split into its n-grams, and each n-gram points to the distinct texts containing it,
+    so entities sharing a text (e.g. several copies of the same title) cost a single posting.
+    """
+
+    def __init__(self, n=3):
+        self.__n = n
+        self.__postings = {}
+        self.__keys_by_text = {}
+        self.__text_by_key = {}
+
+    def add(self, key, text):
+        """
+        Function to add the text of an entity to the index.
+        :param key: the key the entity is identified by (e.g. its ID).
+        :param text: string, the text of the entity to be indexed.
+        """
+        folded_text = text.casefold()
+        self.__text_by_key[key] = folded_text
+        keys = self.__keys_by_text.get(folded_text)
+        if keys is None:
+            keys = self.__keys_by_text[folded_text] = set()
+            for gram in self.__get_grams(folded_text):
+                self.__postings.setdefault(gram, set()).add(folded_text)
+        keys.add(key)
+
+    def add_many(self, items):
+        """
+        Function to add the texts of many entities to the index at once, splitting each new distinct text into its
+        n-grams only once for the whole batch.
+        :param items: iterable, containing (key, text) pairs.
+        """
+        keys_by_text = self.__keys_by_text
+        text_by_key = self.__text_by_key
+        new_texts = []
+        for key, text in items:
+            folded_text = text.casefold()
+            text_by_key[key] = folded_text
+            keys = keys_by_text.get(folded_text)
+            if keys is None:
+                keys = keys_by_text[folded_text] = set()
+                new_texts.append(folded_text)
+            keys.add(key)
+        postings = self.__postings
+        for folded_text in new_texts:
+            for gram in self.__get_grams(folded_text):
+                texts = postings.get(gram)
+                if texts is None:
+                    postings[gram] = {folded_text}
+                else:
+                    texts.add(folded_text)
+
+    def remove(self, key):
+        """
+        Function to remove the text of an entity from the index. Unknown keys are ignored.
+        :param key: the key the entity is identified by (e.g. its ID).
+        """
+        folded_text = self.__text_by_key.pop(key, None)
+        if folded_text is None:
+            return
+        keys = self.__keys_by_text[folded_text]
+        keys.discard(key)
+        if len(keys) == 0:
+            del self.__keys_by_text[folded_text]
+            for gram in self.__get_grams(folded_text):
+                texts = self.__postings[gram]
+                texts.discard(folded_text)
+                if len(texts) == 0:
+                    del self.__postings[gram]
+
+    def search(self, query):
+        """
+        Function to return the keys of all the entities whose text contains the given query, ignoring case. The
+        posting lists of the query's n-grams are intersected and only the remaining candidates are verified; queries
+        shorter than an n-gram fall back to a scan over the distinct texts.
+        :param query: string, the text to be looked for.
+        :return: list, containing the keys of the matching entities, in no particular order.
+        """
+        folded_query = query.casefold()
+        if len(folded_query) < self.__n:
+            candidate_texts = self.__keys_by_text
+        else:
+            posting_lists = []
+            for gram in self.__get_grams(folded_query):
+                texts = self.__postings.get(gram)
+                if texts is None:
+                    return []
+                posting_lists.append(texts)
+            posting_lists.sort(key=len)
+            candidate_texts = posting_lists[0].intersection(*posting_lists[1:])
+
+        matching_keys = []
+        for text in candidate_texts:
+            if folded_query in text:
+                matching_keys.extend(self.__keys_by_text[text])
+        return matching_keys
+
+    def __get_grams(self, text):
+        n = self.__n
+        return {text[index:index + n] for index in range(len(text) - n + 1)}
+
+
+class IdSubstringIndex(object):
+    """
+    Index answering partial ID queries (e.g. "12" matches 12, 112 and 1203) over the decimal forms of the IDs of a
+    repository's entities. Every distinct substring of up to n digits of an ID points to a sorted array of the IDs
+    containing it. Since repositories hand out increasing IDs, adding an ID is usually a plain append.
+    Removed IDs are only put in a set of removed IDs that the searches skip, so that a removal never shifts the
+    (possibly huge) posting arrays; the arrays are rebuilt without them once they exceed the compaction threshold, a
+    fraction of the indexed IDs.
+    """
+
+    def __init__(self, n=3, compaction_threshold=0.25):
+        self.__n = n
+        self.__postings = {}
+        self.__removed_ids = set()
+        self.__number_of_ids = 0
+        self.__compaction_threshold = compaction_threshold
+
+    def add(self, entity_id):
+        """
+        Function to add an ID to the index. An ID removed since the last compaction is only taken out of the removed
+        IDs.
+        :param entity_id: integer, the ID to be indexed.
+        """
+        if entity_id in self.__removed_ids:
+            self.__removed_ids.discard(entity_id)
+            return
+        self.__number_of_ids += 1
+        for digits in self.__get_substrings(str(entity_id)):
+            ids = self.__postings.get(digits)
+            if ids is None:
+                ids = self.__postings[digits] = array("q")
+            if len(ids) == 0 or ids[-1] < entity_id:
+                ids.append(entity_id)
+            else:
+                insort(ids, entity_id)
+
+    def add_many(self, entity_ids):
+        """
+        Function to add many IDs to the index at once. The IDs are grouped by substring, so each posting array is
+        extended once per batch, and only merged again when the batch holds IDs lower than the ones already indexed.
+        :param entity_ids: iterable, containing the IDs to be indexed.
+        """
+        new_ids_by_digits = {}
+        get_substrings = self.__get_substrings
+        for entity_id in sorted(entity_ids):
+            if entity_id in self.__removed_ids:
+                self.__removed_ids.discard(entity_id)
+                continue
+            self.__number_of_ids += 1
+            for digits in get_substrings(str(entity_id)):
+                new_ids_by_digits.setdefault(digits, []).append(entity_id)
+        for digits, new_ids in new_ids_by_digits.items():
+            ids = self.__postings.get(digits)
+            if ids is None:
+                self.__postings[digits] = array("q", new_ids)
+            elif len(ids) == 0 or ids[-1] < new_ids[0]:
+                ids.extend(new_ids)
+            else:
+                self.__postings[digits] = array("q", sorted(ids.tolist() + new_ids))
+
+    def remove(self, entity_id):
+        """
+        Function to remove an indexed ID from the index, compacting the index if the removed IDs exceed the compaction
+        threshold.
+        :param entity_id: integer, the ID to be removed.
+        """
+        self.__removed_ids.add(entity_id)
+        if len(self.__removed_ids) > self.__compaction_threshold * self.__number_of_ids:
+            self.compact()
+
+    def compact(self):
+        """
+        Function to rebuild the posting arrays without the removed IDs.
+        """
+        removed_ids = self.__removed_ids
+        if len(removed_ids) == 0:
+            return
+        for digits in list(self.__postings):
+            ids = array("q", [entity_id for entity_id in self.__postings[digits] if entity_id not in removed_ids])
+            if len(ids) == 0:
+                del self.__postings[digits]
+            else:
+                self.__postings[digits] = ids
+        self.__number_of_ids -= len(removed_ids)
+        removed_ids.clear()
+
+    def search(self, entity_id):
+        """
+        Function to return all the indexed IDs whose decimal form contains the decimal form of the given ID. Queries
+        of at most n digits are answered straight from their posting array; longer ones only verify the IDs of the
+        shortest posting array among their n-digit substrings.
+        :param entity_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching IDs, in increasing order.
+        """
+        query = str(entity_id)
+        n = self.__n
+        removed_ids = self.__removed_ids
+        if len(query) <= n:
+            ids = self.__postings.get(query, ())
+            if len(removed_ids) == 0:
+                return list(ids)
+            return [matching_id for matching_id in ids if matching_id not in removed_ids]
+
+        candidate_ids = None
+        for index in range(len(query) - n + 1):
+            ids = self.__postings.get(query[index:index + n])
+            if ids is None:
+                return []
+            if candidate_ids is None or len(ids) < len(candidate_ids):
+                candidate_ids = ids
+        return [candidate_id for candidate_id in candidate_ids
+                if query in str(candidate_id) and candidate_id not in removed_ids]
+
+    def __get_substrings(self, digits):
+        substrings = set()
+        for length in range(1, self.__n + 1):
+            for index in range(len(digits) - length + 1):
+                substrings.add(digits[index:index + length])
+        return substrings
+
+
+class ExactMatchIndex(object):
+    """
+    Multimap from a value of an entity (e.g. its name, or its (title, author) pair) to the IDs of the entities having
+    that value, answering exact lookups in constant time. Values shared by several entities resolve to the lowest ID,
+    so lookups stay deterministic when entities share a value. Each value keeps the set of its IDs and a heap of them,
+    from which removed IDs are only dropped once they reach its top, so that a removal never shifts the IDs of a
+    value shared by many entities. The removals keep a live ID at the top of each heap, so that lookups only read the
+    index and may run at the same time from several threads.
+    """
+
+    def __init__(self):
+        self.__ids_by_value = {}
+        self.__heap_by_value = {}
+
+    def add(self, value, entity_id):
+        """
+        Function to add the value of an entity to the index.
+        :param value: the hashable value of the entity.
+        :param entity_id: integer, the ID of the entity.
+        """
+        ids = self.__ids_by_value.get(value)
+        if ids is None:
+            self.__ids_by_value[value] = {entity_id}
+            self.__heap_by_value[value] = [entity_id]
+        elif entity_id not in ids:
+            ids.add(entity_id)
+            heappush(self.__heap_by_value[value], entity_id)
+
+    def remove(self, value, entity_id):
+        """
+        Function to remove the value of an entity from the index. Unknown values and IDs are ignored.
+        :param value: the hashable value of the entity.
+        :param entity_id: integer, the ID of the entity.
+        """
+        ids = self.__ids_by_value.get(value)
+        if ids is None or entity_id not in ids:
+            return
+        ids.discard(entity_id)
+        if len(ids) == 0:
+            del self.__ids_by_value[value]
+            del self.__heap_by_value[value]
+            return
+        heap = self.__heap_by_value[value]
+        if len(heap) > 2 * len(ids):
+            heap[:] = ids
+            heapify(heap)
+        while heap[0] not in ids:
+            heappop(heap)
+
+    def get_lowest_id(self, value):
+        """
+        Function to return the lowest ID of the entities having the given value.
+        :param value: the hashable value to be looked for.
+        :return: integer, the lowest ID if any entity has the value, otherwise None.
+        """
+        heap = self.__heap_by_value.get(value)
+        if heap is None:
+            return None
+        return heap[0]
+
+    def get_ids(self, value):
+        """
+        Function to return the IDs of all the entities having the given value.
+        :param value: the hashable value to be looked for.
+        :return: list, containing the IDs, in increasing order.
+        """
+        return sorted(self.__ids_by_value.get(value, ()))
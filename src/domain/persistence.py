@@ -0,0 +1,406 @@
+import json
+import os
+import time
+from datetime import date
+
+from src.domain.entity import Book, Client, Rental
+from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+
+LOG_FILE_NAME = "library.log"
+SNAPSHOT_FILE_NAME = "library.snapshot"
+
+
+class WriteAheadLog(object):
+    """
+    Append-only log making the changes of the durable repositories survive restarts. Every change is appended to the
+    log file as a JSON line, numbered by an increasing log sequence number. The file is flushed on every change, while
+    the (slow) fsync is done once every 'sync_every' changes or 'sync_interval' seconds, whichever comes first.
+    Every 'snapshot_every' changes, the full state of the repositories is written to a snapshot file and the log is
+    truncated, so that opening the log only replays the changes made after the latest snapshot.
+    """
+
+    def __init__(self, directory, sync_every=100, sync_interval=1.0, snapshot_every=100_000):
+        self.__directory = directory
+        self.__log_path = os.path.join(directory, LOG_FILE_NAME)
+        self.__snapshot_path = os.path.join(directory, SNAPSHOT_FILE_NAME)
+        self.__sync_every = sync_every
+        self.__sync_interval = sync_interval
+        self.__snapshot_every = snapshot_every
+        self.__repositories = {}
+        self.__log_file = None
+        self.__last_sequence_number = 0
+        self.__changes_since_snapshot = 0
+        self.__changes_since_sync = 0
+        self.__last_sync_time = time.monotonic()
+
+    def register(self, name, repository):
+        """
+        Function to attach a durable repository to the log, under the given name. All the repositories must be
+        registered before the log is opened.
+        :param name: string, the name the changes of the repository are logged under.
+        :param repository: object, the durable repository.
+        """
+        self.__repositories[name] = repository
+
+    def open(self):
+        """
+        Function to restore the registered repositories from the latest snapshot and the changes logged after it, and to
+        open the log for new changes. A change that was only partly written when the application stopped is dropped.
+        """
+        os.makedirs(self.__directory, exist_ok=True)
+        snapshot_sequence_number = self.__load_snapshot()
+        self.__last_sequence_number = snapshot_sequence_number
+        valid_length = self.__replay_log(snapshot_sequence_number)
+        self.__log_file = open(self.__log_path, "a+b")
+        self.__log_file.truncate(valid_length)
+        self.__log_file.seek(valid_length)
+
+    def append(self, name, record, number_of_changes=1):
+        """
+        Function to log a change of a repository. A batch of changes is logged as a single record, so that the snapshot
+        taken when the log grows too long never falls in the middle of the batch.
+        :param name: string, the name of the repository the change belongs to.
+        :param record: dictionary, the JSON serializable description of the change.
+        :param number_of_changes: integer, the number of changes the record holds, counted towards 'sync_every' and
+        'snapshot_every'.
+        """
+        if self.__log_file is None:
+            return
+        self.__last_sequence_number += 1
+        record["sequence_number"] = self.__last_sequence_number
+        record["repository"] = name
+        if number_of_changes != 1:
+            record["number_of_changes"] = number_of_changes
+        self.__log_file.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.__log_file.flush()
+        self.__changes_since_sync += number_of_changes
+        self.__changes_since_snapshot += number_of_changes
+        if self.__changes_since_sync >= self.__sync_every or \
+                time.monotonic() - self.__last_sync_time >= self.__sync_interval:
+            self.sync()
+        if self.__changes_since_snapshot >= self.__snapshot_every:
+            self.snapshot()
+
+    def sync(self):
+        """
+        Function to force the changes logged so far to the disk.
+        """
+        if self.__log_file is None:
+            return
+        self.__log_file.flush()
+        os.fsync(self.__log_file.fileno())
+        self.__changes_since_sync = 0
+        self.__last_sync_time = time.monotonic()
+
+    def snapshot(self):
+        """
+        Function to write the full state of the registered repositories to a new snapshot file and to truncate the
+        log. The snapshot replaces the previous one atomically, so an interrupted snapshot leaves the previous snapshot
+        and the log untouched.
+        """
+        state = {"sequence_number": self.__last_sequence_number}
+        for name, repository in self.__repositories.items():
+            state[name] = repository.dump_state()
+        temporary_path = self.__snapshot_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as snapshot_file:
+            json.dump(state, snapshot_file, separators=(",", ":"))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, self.__snapshot_path)
+        if self.__log_file is not None:
+            self.__log_file.seek(0)
+            self.__log_file.truncate()
+            self.sync()
+        self.__changes_since_snapshot = 0
+
+    def close(self):
+        """
+        Function to force the logged changes to the disk and to close the log.
+        """
+        if self.__log_file is None:
+            return
+        self.sync()
+        self.__log_file.close()
+        self.__log_file = None
+
+    def __load_snapshot(self):
+        if not os.path.exists(self.__snapshot_path):
+            return 0
+        with open(self.__snapshot_path, "r", encoding="utf-8") as snapshot_file:
+            state = json.load(snapshot_file)
+        for name, repository in self.__repositories.items():
+            if name in state:
+                repository.load_state(state[name])
+        return state["sequence_number"]
+
+    def __replay_log(self, snapshot_sequence_number):
+        if not os.path.exists(self.__log_path):
+            return 0
+        valid_length = 0
+        with open(self.__log_path, "rb") as log_file:
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_length += len(line)
+                if record["sequence_number"] <= snapshot_sequence_number:
+                    continue
+                self.__repositories[record["repository"]].apply_change(record)
+                self.__last_sequence_number = record["sequence_number"]
+                self.__changes_since_snapshot += record.get("number_of_changes", 1)
+        return valid_length
+
+
+class DurableBookRepository(BookRepository):
+    """
+    Book repository logging each of its changes to a 'WriteAheadLog'.
+    """
+
+    def __init__(self, write_ahead_log, name="books"):
+        super().__init__()
+        self.__write_ahead_log = write_ahead_log
+        self.__name = name
+        self.__last_book_id = 0
+        write_ahead_log.register(name, self)
+
+    def add_book(self, book):
+        super().add_book(book)
+        self.__log("add", book=[book.id, book.title, book.author])
+
+    def add_books(self, books):
+        books = list(books)
+        super().add_books(books)
+        self.__log("add_many", len(books), books=[[book.id, book.title, book.author] for book in books])
+
+    def insert_book(self, book):
+        super().insert_book(book)
+        self.__log("insert", book=[book.id, book.title, book.author])
+
+    def remove_book_by_index(self, index):
+        book_id = self.get_book_by_index(index).id
+        super().remove_book_by_index(index)
+        self.__log("remove", id=book_id)
+
+    def update_book(self, index, new_book):
+        super().update_book(index, new_book)
+        self.__log("update", book=[new_book.id, new_book.title, new_book.author])
+
+    def get_next_book_id(self):
+        self.increment_last_book_id()
+        return self.__last_book_id
+
+    def increment_last_book_id(self):
+        self.__last_book_id += 1
+
+    def dump_state(self):
+        """
+        Function to return the full state of the repository, to be written to a snapshot.
+        :return: dictionary, the JSON serializable state of the repository.
+        """
+        return {"last_id": self.__last_book_id,
+                "books": [[book.id, book.title, book.author] for book in self.get_all_books()]}
+
+    def load_state(self, state):
+        """
+        Function to restore the repository from the state written to a snapshot.
+        :param state: dictionary, the state returned by 'dump_state'.
+        """
+        for book_id, title, author in state["books"]:
+            super().add_book(Book(book_id, title, author))
+        self.__last_book_id = state["last_id"]
+
+    def apply_change(self, record):
+        """
+        Function to apply again a change read from the log, without logging it.
+        :param record: dictionary, the logged change.
+        """
+        operation = record["operation"]
+        if operation == "add":
+            super().add_book(Book(*record["book"]))
+        elif operation == "insert":
+            super().insert_book(Book(*record["book"]))
+        elif operation == "remove":
+            super().remove_book_by_index(self.get_index_by_id(record["id"]))
+        elif operation == "update":
+            super().update_book(self.get_index_by_id(record["book"][0]), Book(*record["book"]))
+        elif operation == "add_many" and len(record["books"]) > 0:
+            super().add_books(Book(*book) for book in record["books"])
+            self.__last_book_id = max(self.__last_book_id, record["books"][-1][0])
+        if "book" in record:
+            self.__last_book_id = max(self.__last_book_id, record["book"][0])
+
+    def __log(self, operation, number_of_changes=1, **change):
+        change["operation"] = operation
+        self.__write_ahead_log.append(self.__name, change, number_of_changes)
+
+
+class DurableClientRepository(ClientRepository):
+    """
+    Client repository logging each of its changes to a 'WriteAheadLog'.
+    """
+
+    def __init__(self, write_ahead_log, name="clients"):
+        super().__init__()
+        self.__write_ahead_log = write_ahead_log
+        self.__name = name
+        self.__last_client_id = 0
+        write_ahead_log.register(name, self)
+
+    def add_client(self, client):
+        super().add_client(client)
+        self.__log("add", client=[client.id, client.name])
+
+    def add_clients(self, clients):
+        clients = list(clients)
+        super().add_clients(clients)
+        self.__log("add_many", len(clients), clients=[[client.id, client.name] for client in clients])
+
+    def insert_client(self, client):
+        super().insert_client(client)
+        self.__log("insert", client=[client.id, client.name])
+
+    def remove_client_by_index(self, index):
+        client_id = self.get_client_by_index(index).id
+        super().remove_client_by_index(index)
+        self.__log("remove", id=client_id)
+
+    def update_client(self, index, new_client):
+        super().update_client(index, new_client)
+        self.__log("update", client=[new_client.id, new_client.name])
+
+    def get_next_client_id(self):
+        self.increment_last_client_id()
+        return self.__last_client_id
+
+    def increment_last_client_id(self):
+        self.__last_client_id += 1
+
+    def dump_state(self):
+        """
+        Function to return the full state of the repository, to be written to a snapshot.
+        :return: dictionary, the JSON serializable state of the repository.
+        """
+        return {"last_id": self.__last_client_id,
+                "clients": [[client.id, client.name] for client in self.get_all_clients()]}
+
+    def load_state(self, state):
+        """
+        Function to restore the repository from the state written to a snapshot.
+        :param state: dictionary, the state returned by 'dump_state'.
+        """
+        for client_id, name in state["clients"]:
+            super().add_client(Client(client_id, name))
+        self.__last_client_id = state["last_id"]
+
+    def apply_change(self, record):
+        """
+        Function to apply again a change read from the log, without logging it.
+        :param record: dictionary, the logged change.
+        """
+        operation = record["operation"]
+        if operation == "add":
+            super().add_client(Client(*record["client"]))
+        elif operation == "insert":
+            super().insert_client(Client(*record["client"]))
+        elif operation == "remove":
+            super().remove_client_by_index(self.get_index_by_id(record["id"]))
+        elif operation == "update":
+            super().update_client(self.get_index_by_id(record["client"][0]), Client(*record["client"]))
+        elif operation == "add_many" and len(record["clients"]) > 0:
+            super().add_clients(Client(*client) for client in record["clients"])
+            self.__last_client_id = max(self.__last_client_id, record["clients"][-1][0])
+        if "client" in record:
+            self.__last_client_id = max(self.__last_client_id, record["client"][0])
+
+    def __log(self, operation, number_of_changes=1, **change):
+        change["operation"] = operation
+        self.__write_ahead_log.append(self.__name, change, number_of_changes)
+
+
+class DurableRentalRepository(RentalRepository):
+    """
+    Rental repository logging each of its changes to a 'WriteAheadLog'. Dates are logged as their ordinals.
+    """
+
+    def __init__(self, write_ahead_log, name="rentals"):
+        super().__init__()
+        self.__write_ahead_log = write_ahead_log
+        self.__name = name
+        self.__last_rental_id = 0
+        write_ahead_log.register(name, self)
+
+    def add_rental(self, rental):
+        super().add_rental(rental)
+        self.__log("add", rental=self.__serialize_rental(rental))
+
+    def remove_last_rental(self):
+        rental = super().remove_last_rental()
+        self.__log("remove_last")
+        return rental
+
+    def return_rental_by_index(self, index, returned_date=None):
+        super().return_rental_by_index(index, returned_date)
+        rental = self.get_all_rentals()[index]
+        self.__log("return", id=rental.id, returned=rental.returned_date.toordinal())
+
+    def reopen_rental_by_index(self, index):
+        super().reopen_rental_by_index(index)
+        self.__log("reopen", id=self.get_all_rentals()[index].id)
+
+    def get_next_rental_id(self):
+        self.increment_last_rental_id()
+        return self.__last_rental_id
+
+    def increment_last_rental_id(self):
+        self.__last_rental_id += 1
+
+    def dump_state(self):
+        """
+        Function to return the full state of the repository, to be written to a snapshot.
+        :return: dictionary, the JSON serializable state of the repository.
+        """
+        return {"last_id": self.__last_rental_id,
+                "rentals": [self.__serialize_rental(rental) for rental in self.get_all_rentals()]}
+
+    def load_state(self, state):
+        """
+        Function to restore the repository from the state written to a snapshot.
+        :param state: dictionary, the state returned by 'dump_state'.
+        """
+        for serialized_rental in state["rentals"]:
+            super().add_rental(self.__deserialize_rental(serialized_rental))
+        self.__last_rental_id = state["last_id"]
+
+    def apply_change(self, record):
+        """
+        Function to apply again a change read from the log, without logging it.
+        :param record: dictionary, the logged change.
+        """
+        operation = record["operation"]
+        if operation == "add":
+            super().add_rental(self.__deserialize_rental(record["rental"]))
+            self.__last_rental_id = max(self.__last_rental_id, record["rental"][0])
+        elif operation == "remove_last":
+            super().remove_last_rental()
+        elif operation == "return":
+            super().return_rental_by_index(self.get_index_by_id(record["id"]), date.fromordinal(record["returned"]))
+        elif operation == "reopen":
+            super().reopen_rental_by_index(self.get_index_by_id(record["id"]))
+
+    def __log(self, operation, **change):
+        change["operation"] = operation
+        self.__write_ahead_log.append(self.__name, change)
+
+    @staticmethod
+    def __serialize_rental(rental):
+        returned_ordinal = None if rental.returned_date is None else rental.returned_date.toordinal()
+        return [rental.id, rental.book_id, rental.client_id, rental.rented_date.toordinal(), returned_ordinal]
+
+    @staticmethod
+    def __deserialize_rental(serialized_rental):
+        rental_id, book_id, client_id, rented_ordinal, returned_ordinal = serialized_rental
+        returned_date = None if returned_ordinal is None else date.fromordinal(returned_ordinal)
+        return Rental(rental_id, book_id, client_id, date.fromordinal(rented_ordinal), returned_date)
@@ -0,0 +1,628 @@
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+
+from src.domain.entity import Book, Client
+
+HEADER_FORMAT = struct.Struct("<8sQQQQ")
+SLOT_KEY_FORMAT = struct.Struct("<Bq")
+FREE, LIVE, DELETED = 0, 1, 2
+BYTES_PER_CHARACTER = 4
+BOOK_FILE_MAGIC = b"LIBBOOK1"
+CLIENT_FILE_MAGIC = b"LIBCLNT1"
+BOOK_FIELDS = (("title", 30), ("author", 25))
+CLIENT_FIELDS = (("name", 25),)
+INITIAL_CAPACITY = 1024
+
+
+class RecordFile(object):
+    """
+    File of fixed-width binary records, read and written through a memory map, so that several processes reading the
+    same file share the pages of the operating system cache instead of each holding its own objects.
+    The file starts with a header holding the magic bytes of the file, the record size, the number of used slots, the
+    number of live records and the last ID handed out. Each slot holds a state byte (free, live or deleted), the ID of
+    the record and its string fields, each stored as a length byte followed by a field wide enough for the maximum
+    number of characters of the field in UTF-8. Records are kept in increasing order of their IDs and a deleted record
+    keeps its slot, so the slot of an ID is found by offset arithmetic (ID minus the first ID) until the file is
+    compacted, and by a binary search bounded by that offset afterwards.
+    """
+
+    def __init__(self, path, magic, fields, read_only=False):
+        self.__path = path
+        self.__magic = magic
+        self.__fields = fields
+        self.__read_only = read_only
+        self.__record_format = struct.Struct("<Bq" + "".join(f"B{width * BYTES_PER_CHARACTER}s"
+                                                             for _, width in fields))
+        if not os.path.exists(path):
+            if read_only:
+                raise FileNotFoundError(f"Record file {path} does not exist.")
+            with open(path, "wb") as record_file:
+                record_file.write(HEADER_FORMAT.pack(magic, self.__record_format.size, 0, 0, 0))
+                record_file.truncate(HEADER_FORMAT.size + INITIAL_CAPACITY * self.__record_format.size)
+        self.__file = open(path, "rb" if read_only else "r+b")
+        self.__map = None
+        self.__remap()
+        file_magic, record_size, _, _, _ = HEADER_FORMAT.unpack_from(self.__map, 0)
+        if file_magic != magic or record_size != self.__record_format.size:
+            self.close()
+            raise ValueError(f"{path} is not a record file of the expected kind.")
+
+    def __len__(self):
+        return self.__read_header()[2]
+
+    def get_live_count(self):
+        """
+        Function to return the number of live (not deleted) records of the file.
+        :return: integer, the number of live records.
+        """
+        return self.__read_header()[3]
+
+    def get_last_id(self):
+        """
+        Function to return the last ID handed out for the records of the file.
+        :return: integer, the last ID.
+        """
+        return self.__read_header()[4]
+
+    def set_last_id(self, last_id):
+        """
+        Function to store the last ID handed out for the records of the file.
+        :param last_id: integer, the last ID.
+        """
+        self.__write_header(last_id=last_id)
+
+    def read(self, slot):
+        """
+        Function to read the record found in the given slot.
+        :param slot: integer, the slot of the record.
+        :return: tuple, containing the state, the ID and the string fields of the record.
+        """
+        self.__ensure_mapped(len(self))
+        unpacked = self.__record_format.unpack_from(self.__map, self.__get_offset(slot))
+        values = [unpacked[0], unpacked[1]]
+        for field_index in range(len(self.__fields)):
+            length, encoded = unpacked[2 + 2 * field_index], unpacked[3 + 2 * field_index]
+            values.append(encoded[:length].decode("utf-8"))
+        return tuple(values)
+
+    def read_id(self, slot):
+        """
+        Function to read only the state and the ID of the record found in the given slot.
+        :param slot: integer, the slot of the record.
+        :return: tuple, containing the state and the ID of the record.
+        """
+        self.__ensure_mapped(len(self))
+        return SLOT_KEY_FORMAT.unpack_from(self.__map, self.__get_offset(slot))
+
+    def find_slot(self, record_id):
+        """
+        Function to return the slot holding the given ID, whether its record is live or deleted.
+        :param record_id: integer, the ID to be looked for.
+        :return: integer, the slot of the ID if found, otherwise None.
+        """
+        used_slots = len(self)
+        if used_slots == 0:
+            return None
+        self.__ensure_mapped(used_slots)
+        first_id = self.__read_key(0)[1]
+        if record_id < first_id:
+            return None
+        low, high = 0, min(record_id - first_id, used_slots - 1)
+        if self.__read_key(high)[1] == record_id:
+            return high
+        while low <= high:
+            middle = (low + high) // 2
+            middle_id = self.__read_key(middle)[1]
+            if middle_id == record_id:
+                return middle
+            if middle_id < record_id:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def find_live_slot(self, record_id):
+        """
+        Function to return the slot holding the live record having the given ID.
+        :param record_id: integer, the ID to be looked for.
+        :return: integer, the slot of the record if found, otherwise None.
+        """
+        slot = self.find_slot(record_id)
+        if slot is None or self.read_id(slot)[0] != LIVE:
+            return None
+        return slot
+
+    def put(self, record_id, strings):
+        """
+        Function to write a live record, in the slot of its ID if the ID already has one (e.g. a deleted record being
+        put back), appended after the last slot if the ID is the highest one, otherwise in a slot opened in the middle.
+        :param record_id: integer, the ID of the record.
+        :param strings: tuple, containing the string fields of the record.
+        :return: integer, the slot of the record.
+        """
+        self.__check_writable()
+        encoded_record = self.__encode(record_id, strings)
+        _, _, used_slots, live_count, last_id = self.__read_header()
+        if used_slots == 0 or self.read_id(used_slots - 1)[1] < record_id:
+            slot = None
+        else:
+            slot = self.find_slot(record_id)
+        if slot is not None:
+            if self.read_id(slot)[0] == LIVE:
+                live_count -= 1
+        else:
+            slot = used_slots
+            while slot > 0 and self.read_id(slot - 1)[1] > record_id:
+                slot -= 1
+            self.__ensure_capacity(used_slots + 1)
+            if slot < used_slots:
+                offset = self.__get_offset(slot)
+                self.__map.move(offset + self.__record_format.size, offset,
+                                (used_slots - slot) * self.__record_format.size)
+            used_slots += 1
+        self.__map[self.__get_offset(slot):self.__get_offset(slot + 1)] = encoded_record
+        self.__write_header(used_slots=used_slots, live_count=live_count + 1, last_id=max(last_id, record_id))
+        return slot
+
+    def delete(self, slot):
+        """
+        Function to mark the record found in the given slot as deleted. The slot is kept until the file is compacted.
+        :param slot: integer, the slot of the record.
+        """
+        self.__check_writable()
+        if self.read_id(slot)[0] != LIVE:
+            return
+        self.__map[self.__get_offset(slot)] = DELETED
+        self.__write_header(live_count=self.get_live_count() - 1)
+
+    def iterate_live(self, reverse=False):
+        """
+        Function to go over the live records of the file, in increasing (or decreasing) order of their IDs.
+        :param reverse: True/False, whether or not to go in decreasing order of the IDs.
+        :return: generator, yielding (slot, record) tuples, where the record is returned as by 'read'.
+        """
+        slots = range(len(self))
+        for slot in (reversed(slots) if reverse else slots):
+            record = self.read(slot)
+            if record[0] == LIVE:
+                yield slot, record
+
+    def flush(self):
+        """
+        Function to write the changed pages of the memory map to the disk.
+        """
+        if not self.__read_only:
+            self.__map.flush()
+
+    def close(self):
+        """
+        Function to flush and close the memory map and the file.
+        """
+        if self.__map is not None:
+            self.flush()
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+    def __read_header(self):
+        return HEADER_FORMAT.unpack_from(self.__map, 0)
+
+    def __write_header(self, used_slots=None, live_count=None, last_id=None):
+        magic, record_size, old_used_slots, old_live_count, old_last_id = self.__read_header()
+        HEADER_FORMAT.pack_into(self.__map, 0, magic, record_size,
+                                old_used_slots if used_slots is None else used_slots,
+                                old_live_count if live_count is None else live_count,
+                                old_last_id if last_id is None else last_id)
+
+    def __read_key(self, slot):
+        return SLOT_KEY_FORMAT.unpack_from(self.__map, HEADER_FORMAT.size + slot * self.__record_format.size)
+
+    def __get_offset(self, slot):
+        return HEADER_FORMAT.size + slot * self.__record_format.size
+
+    def __encode(self, record_id, strings):
+        values = [LIVE, record_id]
+        for (field_name, width), text in zip(self.__fields, strings):
+            if len(text) > width:
+                raise ValueError(f"The {field_name} must have at most {width} characters.")
+            encoded = text.encode("utf-8")
+            values.extend((len(encoded), encoded))
+        return self.__record_format.pack(*values)
+
+    def __check_writable(self):
+        if self.__read_only:
+            raise PermissionError(f"Record file {self.__path} is opened for reading only.")
+
+    def __ensure_capacity(self, number_of_slots):
+        if self.__get_offset(number_of_slots) <= len(self.__map):
+            return
+        capacity = (len(self.__map) - HEADER_FORMAT.size) // self.__record_format.size
+        while capacity < number_of_slots:
+            capacity *= 2
+        self.__map.flush()
+        self.__file.truncate(self.__get_offset(capacity))
+        self.__remap()
+
+    def __ensure_mapped(self, number_of_slots):
+        if self.__get_offset(number_of_slots) > len(self.__map):
+            self.__remap()
+
+    def __remap(self):
+        if self.__map is not None:
+            self.__map.close()
+        access = mmap.ACCESS_READ if self.__read_only else mmap.ACCESS_WRITE
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=access)
+
+
+class RecordFileView(Sequence):
+    """
+    Read-only view over the live records of a record file, in increasing order of their IDs. While the file holds no
+    deleted records, the positional indexing is a direct slot access; otherwise, it goes over the slots.
+    """
+
+    def __init__(self, record_file, make_entity):
+        self.__record_file = record_file
+        self.__make_entity = make_entity
+
+    def __len__(self):
+        return self.__record_file.get_live_count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        live_count = len(self)
+        if index < 0:
+            index += live_count
+        if index < 0 or index >= live_count:
+            raise IndexError("view index out of range")
+        if live_count == len(self.__record_file):
+            return self.__make_entity(self.__record_file.read(index))
+        for position, (_, record) in enumerate(self.__record_file.iterate_live()):
+            if position == index:
+                return self.__make_entity(record)
+
+    def __iter__(self):
+        for _, record in self.__record_file.iterate_live():
+            yield self.__make_entity(record)
+
+    def __reversed__(self):
+        for _, record in self.__record_file.iterate_live(reverse=True):
+            yield self.__make_entity(record)
+
+    def snapshot(self):
+        """
+        Function to return a copy of the viewed records, unaffected by the later changes of the repository.
+        :return: list, containing the current entities of the view.
+        """
+        return list(self)
+
+
+def compact_record_file(path, magic, fields):
+    """
+    Function to rewrite a record file without its deleted records, into a new file that atomically replaces it. The
+    last ID handed out is kept, so the IDs of the deleted records are never handed out again. No other process may
+    write to the file during the compaction.
+    :param path: string, the path of the record file.
+    :param magic: bytes, the magic bytes of the record file.
+    :param fields: tuple, containing the (field name, maximum number of characters) pairs of the records.
+    :return: integer, the number of deleted records that were dropped.
+    """
+    temporary_path = path + ".compact"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    source = RecordFile(path, magic, fields, read_only=True)
+    target = RecordFile(temporary_path, magic, fields)
+    try:
+        for _, record in source.iterate_live():
+            target.put(record[1], record[2:])
+        target.set_last_id(source.get_last_id())
+        dropped_records = len(source) - source.get_live_count()
+    finally:
+        target.close()
+        source.close()
+    with open(temporary_path, "rb") as compacted_file:
+        os.fsync(compacted_file.fileno())
+    os.replace(temporary_path, path)
+    return dropped_records
+
+
+class MappedBookRepository(object):
+    """
+    Book repository kept in a memory-mapped record file, for read-mostly deployments where several processes share the
+    catalog. It exposes the same functions as 'BookRepository', except that the 'index' taken and returned by the
+    functions is the slot of the book in the file. The books are built only when they are asked for, so the searches
+    go over the records of the file instead of keeping an index in memory.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.__records = RecordFile(path, BOOK_FILE_MAGIC, BOOK_FIELDS, read_only)
+
+    def add_book(self, book):
+        """
+        Function to add a book to the book repository.
+        :param book: object, contains the book object to be added to the repository.
+        """
+        self.__records.put(book.id, (book.title, book.author))
+
+    def add_books(self, books):
+        """
+        Function to add many books to the book repository at once.
+        :param books: iterable, contains the book objects to be added to the repository.
+        """
+        for book in books:
+            self.add_book(book)
+
+    def remove_book_by_index(self, index):
+        """
+        Function to remove a book from the book repository, by marking its record as deleted.
+        :param index: integer, holds the slot of the book to be removed from the repository.
+        """
+        self.__records.delete(index)
+
+    def insert_book(self, book):
+        """
+        Function to put back a book in the book repository, e.g. when undoing its removal, in the slot of its ID.
+        :param book: object, contains the book object to be inserted in the repository.
+        """
+        self.add_book(book)
+
+    def get_index_by_id(self, book_id):
+        """
+        Function to return the slot of the book having the given ID.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: integer, the slot of the book if found, otherwise None.
+        """
+        return self.__records.find_live_slot(book_id)
+
+    def update_book(self, index, new_book):
+        """
+        Function to update the details of a book found in the book repository. The ID of the book does not change.
+        :param index: integer, holds the slot of the book to be updated from the repository.
+        :param new_book: object, contains the updated book object to replace the one found in the slot.
+        """
+        self.__records.put(new_book.id, (new_book.title, new_book.author))
+
+    def get_by_id(self, book_id):
+        """
+        Function to return the book having the given ID.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: the 'book' object if found, otherwise None.
+        """
+        slot = self.__records.find_live_slot(book_id)
+        if slot is None:
+            return None
+        return self.__make_book(self.__records.read(slot))
+
+    def contains_id(self, book_id):
+        """
+        Function to return whether or not a book having the given ID is found in the repository.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: True/False, whether or not the book is found.
+        """
+        return self.__records.find_live_slot(book_id) is not None
+
+    def find_book_by_title_and_author(self, title, author):
+        """
+        Function to return the book having exactly the given title and author. If several books match, the one having
+        the lowest ID is returned.
+        :param title: string, the title of the book.
+        :param author: string, the name of the author of the book.
+        :return: tuple, containing the slot and the 'book' object if found, otherwise None and None.
+        """
+        for slot, record in self.__records.iterate_live():
+            if record[2] == title and record[3] == author:
+                return slot, self.__make_book(record)
+        return None, None
+
+    def find_books_matching_id(self, book_id):
+        """
+        Function to return all the books whose ID contains the digits of the given ID (e.g. 12 matches 12, 112, 1203).
+        :param book_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        digits = str(book_id)
+        return [self.__make_book(record) for _, record in self.__records.iterate_live() if digits in str(record[1])]
+
+    def find_books_matching_title(self, title):
+        """
+        Function to return all the books whose title contains the given text, ignoring case.
+        :param title: string, the text to be looked for in the titles of the books.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        text = title.casefold()
+        return [self.__make_book(record) for _, record in self.__records.iterate_live()
+                if text in record[2].casefold()]
+
+    def find_books_matching_author(self, author):
+        """
+        Function to return all the books whose author name contains the given text, ignoring case.
+        :param author: string, the text to be looked for in the author names of the books.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        text = author.casefold()
+        return [self.__make_book(record) for _, record in self.__records.iterate_live()
+                if text in record[3].casefold()]
+
+    def get_next_book_id(self):
+        """
+        Function to return the next valid ID for a book in the repository.
+        :return: integer, next valid ID for a book.
+        """
+        self.increment_last_book_id()
+        return self.__records.get_last_id()
+
+    def increment_last_book_id(self):
+        """
+        Function to increment the last used book ID in the repository.
+        """
+        self.__records.set_last_id(self.__records.get_last_id() + 1)
+
+    def get_all_books(self):
+        """
+        Function to return a read-only view over all the books found in the repository, without loading them.
+        :return: sequence, containing all the books.
+        """
+        return RecordFileView(self.__records, self.__make_book)
+
+    def close(self):
+        """
+        Function to write the changes to the disk and to close the record file.
+        """
+        self.__records.close()
+
+    @staticmethod
+    def __make_book(record):
+        return Book(record[1], record[2], record[3])
+
+
+class MappedClientRepository(object):
+    """
+    Client repository kept in a memory-mapped record file, for read-mostly deployments where several processes share
+    the clients. It exposes the same functions as 'ClientRepository', except that the 'index' taken and returned by
+    the functions is the slot of the client in the file. The clients are built only when they are asked for, so the
+    searches go over the records of the file instead of keeping an index in memory.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.__records = RecordFile(path, CLIENT_FILE_MAGIC, CLIENT_FIELDS, read_only)
+
+    def add_client(self, client):
+        """
+        Function to add a client to the client repository.
+        :param client: object, contains the client object to be added to the repository.
+        """
+        self.__records.put(client.id, (client.name,))
+
+    def add_clients(self, clients):
+        """
+        Function to add many clients to the client repository at once.
+        :param clients: iterable, contains the client objects to be added to the repository.
+        """
+        for client in clients:
+            self.add_client(client)
+
+    def remove_client_by_index(self, index):
+        """
+        Function to remove a client from the client repository, by marking its record as deleted.
+        :param index: integer, holds the slot of the client to be removed from the repository.
+        """
+        self.__records.delete(index)
+
+    def insert_client(self, client):
+        """
+        Function to put back a client in the client repository, e.g. when undoing its removal, in the slot of its ID.
+        :param client: object, contains the client object to be inserted in the repository.
+        """
+        self.add_client(client)
+
+    def get_index_by_id(self, client_id):
+        """
+        Function to return the slot of the client having the given ID.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: integer, the slot of the client if found, otherwise None.
+        """
+        return self.__records.find_live_slot(client_id)
+
+    def update_client(self, index, new_client):
+        """
+        Function to update the details of a client found in the client repository. The ID of the client does not
+        change.
+        :param index: integer, holds the slot of the client to be updated from the repository.
+        :param new_client: object, contains the updated client object to replace the one found in the slot.
+        """
+        self.__records.put(new_client.id, (new_client.name,))
+
+    def get_by_id(self, client_id):
+        """
+        Function to return the client having the given ID.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: the 'client' object if found, otherwise None.
+        """
+        slot = self.__records.find_live_slot(client_id)
+        if slot is None:
+            return None
+        return self.__make_client(self.__records.read(slot))
+
+    def contains_id(self, client_id):
+        """
+        Function to return whether or not a client having the given ID is found in the repository.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: True/False, whether or not the client is found.
+        """
+        return self.__records.find_live_slot(client_id) is not None
+
+    def find_client_by_name(self, name):
+        """
+        Function to return the client having exactly the given name. If several clients match, the one having the
+        lowest ID is returned.
+        :param name: string, the name of the client.
+        :return: tuple, containing the slot and the 'client' object if found, otherwise None and None.
+        """
+        for slot, record in self.__records.iterate_live():
+            if record[2] == name:
+                return slot, self.__make_client(record)
+        return None, None
+
+    def find_clients_matching_id(self, client_id):
+        """
+        Function to return all the clients whose ID contains the digits of the given ID (e.g. 12 matches 12, 112, 1203).
+        :param client_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching clients, ordered by their ID.
+        """
+        digits = str(client_id)
+        return [self.__make_client(record) for _, record in self.__records.iterate_live() if digits in str(record[1])]
+
+    def find_clients_matching_name(self, name):
+        """
+        Function to return all the clients whose name contains the given text, ignoring case.
+        :param name: string, the text to be looked for in the names of the clients.
+        :return: list, containing the matching clients, ordered by their ID.
+        """
+        text = name.casefold()
+        return [self.__make_client(record) for _, record in self.__records.iterate_live()
+                if text in record[2].casefold()]
+
+    def get_next_client_id(self):
+        """
+        Function to return the next valid ID for a client in the repository.
+        :return: integer, next valid ID for a client.
+        """
+        self.increment_last_client_id()
+        return self.__records.get_last_id()
+
+    def increment_last_client_id(self):
+        """
+        Function to increment the last used client ID in the repository.
+        """
+        self.__records.set_last_id(self.__records.get_last_id() + 1)
+
+    def get_all_clients(self):
+        """
+        Function to return a read-only view over all the clients found in the repository, without loading them.
+        :return: sequence, containing all the clients.
+        """
+        return RecordFileView(self.__records, self.__make_client)
+
+    def close(self):
+        """
+        Function to write the changes to the disk and to close the record file.
+        """
+        self.__records.close()
+
+    @staticmethod
+    def __make_client(record):
+        return Client(record[1], record[2])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("books", "clients"):
+        print("Usage: python -m src.domain.record_file books|clients <record file>")
+        sys.exit(2)
+    if sys.argv[1] == "books":
+        dropped = compact_record_file(sys.argv[2], BOOK_FILE_MAGIC, BOOK_FIELDS)
+    else:
+        dropped = compact_record_file(sys.argv[2], CLIENT_FILE_MAGIC, CLIENT_FIELDS)
+    print(f"Dropped {dropped} deleted records from {sys.argv[2]}.")
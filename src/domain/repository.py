@@ -1,9 +1,24 @@
 from datetime import date
 
+from src.domain.index import ExactMatchIndex, IdSubstringIndex, NGramIndex
+from src.domain.slot_list import SlotList
+from src.domain.view import ListView
+
 
 class BookRepository(object):
-    def __init__(self):
-        self.__books_list = []
+    """
+    Repository of the books, kept in a 'SlotList': removing a book leaves a tombstone in its slot instead of moving the
+    later books, and the tombstones are dropped once they exceed the compaction threshold. The positional index taken
+    and returned by the functions is the slot of the book, which stays valid until the next compaction.
+    """
+
+    def __init__(self, compaction_threshold=0.25):
+        self.__books_list = SlotList(compaction_threshold)
+        self.__books_by_id = {}
+        self.__id_index = IdSubstringIndex()
+        self.__title_index = NGramIndex()
+        self.__author_index = NGramIndex()
+        self.__title_and_author_index = ExactMatchIndex()
         self.__last_book_id = 0
 
     def add_book(self, book):
@@ -12,22 +27,140 @@ class BookRepository(object):
         :param book: object, contains the book object to be appended to the repository.
         """
         self.__books_list.append(book)
+        self.__books_by_id[book.id] = book
+        self.__index_book(book)
+
+    def add_books(self, books):
+        """
+        Function to add many books to the book repository at once, updating the search indexes once for the whole
+        batch. The books must have increasing IDs, higher than the ones already in the repository.
+        :param books: iterable, contains the book objects to be appended to the repository.
+        """
+        books = list(books)
+        self.__books_list.extend(books)
+        self.__books_by_id.update((book.id, book) for book in books)
+        self.__id_index.add_many(book.id for book in books)
+        self.__title_index.add_many((book.id, book.title) for book in books)
+        self.__author_index.add_many((book.id, book.author) for book in books)
+        for book in books:
+            self.__title_and_author_index.add((book.title, book.author), book.id)
 
     def remove_book_by_index(self, index):
         """
-        Function to remove a book from the book repository.
+        Function to remove a book from the book repository, leaving a tombstone in its slot.
         :param index: integer, holds the value of the positional index of the book to be removed from the repository.
         """
-        del self.__books_list[index]
-        return
+        book = self.__books_list.remove(index)
+        del self.__books_by_id[book.id]
+        self.__unindex_book(book)
+
+    def insert_book(self, book):
+        """
+        Function to put back a book in the book repository, e.g. when undoing its removal. The book takes back its slot
+        if the repository was not compacted since; otherwise, it is inserted at the position given by its ID, since
+        the books are kept in increasing order of their IDs.
+        :param book: object, contains the book object to be inserted in the repository.
+        """
+        self.__books_list.insert(book)
+        self.__books_by_id[book.id] = book
+        self.__index_book(book)
+
+    def get_index_by_id(self, book_id):
+        """
+        Function to return the positional index of the book having the given ID, in constant time.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: integer, the positional index of the book if found, otherwise None.
+        """
+        return self.__books_list.get_slot(book_id)
+
+    def get_book_by_index(self, index):
+        """
+        Function to return the book found at the given positional index.
+        :param index: integer, holds the value of the positional index of the book.
+        :return: the 'book' object, or None if the book was removed.
+        """
+        return self.__books_list.get(index)
 
     def update_book(self, index, new_book):
         """
-        Function to update the details of a book found in the book repository.
+        Function to update the details of a book found in the book repository. The ID of the book does not change.
         :param index: integer, holds the value of the positional index of the book to be updated from the repository.
         :param new_book: object, contains the updated book object to replace the one found at index in the repository.
         """
-        self.__books_list[index] = new_book
+        old_book = self.__books_list.get(index)
+        del self.__books_by_id[old_book.id]
+        self.__unindex_book(old_book)
+        self.__books_list.replace(index, new_book)
+        self.__books_by_id[new_book.id] = new_book
+        self.__index_book(new_book)
+
+    def get_by_id(self, book_id):
+        """
+        Function to return the book having the given ID, in constant time.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: the 'book' object if found, otherwise None.
+        """
+        return self.__books_by_id.get(book_id)
+
+    def contains_id(self, book_id):
+        """
+        Function to return whether or not a book having the given ID is found in the repository, in constant time.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: True/False, whether or not the book is found.
+        """
+        return book_id in self.__books_by_id
+
+    def find_book_by_title_and_author(self, title, author):
+        """
+        Function to return the book having exactly the given title and author, through the (title, author) index. If
+        several books match, the one having the lowest ID is returned.
+        :param title: string, the title of the book.
+        :param author: string, the name of the author of the book.
+        :return: tuple, containing the positional index and the 'book' object if found, otherwise None and None.
+        """
+        book_id = self.__title_and_author_index.get_lowest_id((title, author))
+        if book_id is None:
+            return None, None
+        return self.get_index_by_id(book_id), self.__books_by_id[book_id]
+
+    def find_books_matching_id(self, book_id):
+        """
+        Function to return all the books whose ID contains the digits of the given ID (e.g. 12 matches 12, 112, 1203).
+        :param book_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        return [self.__books_by_id[matching_id] for matching_id in self.__id_index.search(book_id)]
+
+    def find_books_matching_title(self, title):
+        """
+        Function to return all the books whose title contains the given text, ignoring case.
+        :param title: string, the text to be looked for in the titles of the books.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        return self.__get_books_by_ids(self.__title_index.search(title))
+
+    def find_books_matching_author(self, author):
+        """
+        Function to return all the books whose author name contains the given text, ignoring case.
+        :param author: string, the text to be looked for in the author names of the books.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        return self.__get_books_by_ids(self.__author_index.search(author))
+
+    def __get_books_by_ids(self, book_ids):
+        return [self.__books_by_id[book_id] for book_id in sorted(book_ids)]
+
+    def __index_book(self, book):
+        self.__id_index.add(book.id)
+        self.__title_index.add(book.id, book.title)
+        self.__author_index.add(book.id, book.author)
+        self.__title_and_author_index.add((book.title, book.author), book.id)
+
+    def __unindex_book(self, book):
+        self.__id_index.remove(book.id)
+        self.__title_index.remove(book.id)
+        self.__author_index.remove(book.id)
+        self.__title_and_author_index.remove((book.title, book.author), book.id)
 
     def get_next_book_id(self):
         """
@@ -43,17 +176,32 @@ class BookRepository(object):
         """
         self.__last_book_id += 1
 
+    def compact(self):
+        """
+        Function to drop the tombstones of the removed books right away, e.g. before a long read-only period.
+        """
+        self.__books_list.compact()
+
     def get_all_books(self):
         """
-        Function to return the full list of books found in the repository.
-        :return: list, containing the full list of books.
+        Function to return a read-only view over the full list of books found in the repository, without copying it.
+        :return: sequence, containing the full list of books.
         """
-        return self.__books_list
+        return self.__books_list.get_view()
 
 
 class ClientRepository(object):
-    def __init__(self):
-        self.__clients = []
+    """
+    Repository of the clients, kept in a 'SlotList' like the books: removing a client leaves a tombstone in its slot,
+    and the positional index taken and returned by the functions is the slot of the client.
+    """
+
+    def __init__(self, compaction_threshold=0.25):
+        self.__clients = SlotList(compaction_threshold)
+        self.__clients_by_id = {}
+        self.__id_index = IdSubstringIndex()
+        self.__name_index = NGramIndex()
+        self.__exact_name_index = ExactMatchIndex()
         self.__last_client_id = 0
 
     def add_client(self, client):
@@ -62,23 +210,128 @@ class ClientRepository(object):
         :param client: object, contains the client object to be appended to the repository.
         """
         self.__clients.append(client)
+        self.__clients_by_id[client.id] = client
+        self.__index_client(client)
+
+    def add_clients(self, clients):
+        """
+        Function to add many clients to the client repository at once, updating the search indexes once for the whole
+        batch. The clients must have increasing IDs, higher than the ones already in the repository.
+        :param clients: iterable, contains the client objects to be appended to the repository.
+        """
+        clients = list(clients)
+        self.__clients.extend(clients)
+        self.__clients_by_id.update((client.id, client) for client in clients)
+        self.__id_index.add_many(client.id for client in clients)
+        self.__name_index.add_many((client.id, client.name) for client in clients)
+        for client in clients:
+            self.__exact_name_index.add(client.name, client.id)
 
     def remove_client_by_index(self, index):
         """
-        Function to remove a client from the client repository.
+        Function to remove a client from the client repository, leaving a tombstone in its slot.
         :param index: integer, holds the value of the positional index of the client to be removed from the repository.
         """
-        del self.__clients[index]
-        return
+        client = self.__clients.remove(index)
+        del self.__clients_by_id[client.id]
+        self.__unindex_client(client)
+
+    def insert_client(self, client):
+        """
+        Function to put back a client in the client repository, e.g. when undoing its removal. The client takes back
+        its slot if the repository was not compacted since; otherwise, it is inserted at the position given by its ID,
+        since the clients are kept in increasing order of their IDs.
+        :param client: object, contains the client object to be inserted in the repository.
+        """
+        self.__clients.insert(client)
+        self.__clients_by_id[client.id] = client
+        self.__index_client(client)
+
+    def get_index_by_id(self, client_id):
+        """
+        Function to return the positional index of the client having the given ID, in constant time.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: integer, the positional index of the client if found, otherwise None.
+        """
+        return self.__clients.get_slot(client_id)
+
+    def get_client_by_index(self, index):
+        """
+        Function to return the client found at the given positional index.
+        :param index: integer, holds the value of the positional index of the client.
+        :return: the 'client' object, or None if the client was removed.
+        """
+        return self.__clients.get(index)
 
     def update_client(self, index, new_client):
         """
-        Function to update the details of a client found in the client repository.
+        Function to update the details of a client found in the client repository. The ID of the client does not
+        change.
         :param index: integer, holds the value of the positional index of the client to be updated from the repository.
         :param new_client: object, contains the updated client object to replace the one found at index in the
         repository.
         """
-        self.__clients[index] = new_client
+        old_client = self.__clients.get(index)
+        del self.__clients_by_id[old_client.id]
+        self.__unindex_client(old_client)
+        self.__clients.replace(index, new_client)
+        self.__clients_by_id[new_client.id] = new_client
+        self.__index_client(new_client)
+
+    def get_by_id(self, client_id):
+        """
+        Function to return the client having the given ID, in constant time.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: the 'client' object if found, otherwise None.
+        """
+        return self.__clients_by_id.get(client_id)
+
+    def contains_id(self, client_id):
+        """
+        Function to return whether or not a client having the given ID is found in the repository, in constant time.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: True/False, whether or not the client is found.
+        """
+        return client_id in self.__clients_by_id
+
+    def find_client_by_name(self, name):
+        """
+        Function to return the client having exactly the given name, through the name index. If several clients match,
+        the one having the lowest ID is returned.
+        :param name: string, the name of the client.
+        :return: tuple, containing the positional index and the 'client' object if found, otherwise None and None.
+        """
+        client_id = self.__exact_name_index.get_lowest_id(name)
+        if client_id is None:
+            return None, None
+        return self.get_index_by_id(client_id), self.__clients_by_id[client_id]
+
+    def find_clients_matching_id(self, client_id):
+        """
+        Function to return all the clients whose ID contains the digits of the given ID (e.g. 12 matches 12, 112, 1203).
+        :param client_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching clients, ordered by their ID.
+        """
+        return [self.__clients_by_id[matching_id] for matching_id in self.__id_index.search(client_id)]
+
+    def find_clients_matching_name(self, name):
+        """
+        Function to return all the clients whose name contains the given text, ignoring case.
+        :param name: string, the text to be looked for in the names of the clients.
+        :return: list, containing the matching clients, ordered by their ID.
+        """
+        client_ids = sorted(self.__name_index.search(name))
+        return [self.__clients_by_id[client_id] for client_id in client_ids]
+
+    def __index_client(self, client):
+        self.__id_index.add(client.id)
+        self.__name_index.add(client.id, client.name)
+        self.__exact_name_index.add(client.name, client.id)
+
+    def __unindex_client(self, client):
+        self.__id_index.remove(client.id)
+        self.__name_index.remove(client.id)
+        self.__exact_name_index.remove(client.name, client.id)
 
     def get_next_client_id(self):
         """
@@ -94,17 +347,28 @@ class ClientRepository(object):
         """
         self.__last_client_id += 1
 
+    def compact(self):
+        """
+        Function to drop the tombstones of the removed clients right away, e.g. before a long read-only period.
+        """
+        self.__clients.compact()
+
     def get_all_clients(self):
         """
-        Function to return the full list of client found in the repository.
-        :return: list, containing the full list of clients.
+        Function to return a read-only view over the full list of clients found in the repository, without copying it.
+        :return: sequence, containing the full list of clients.
         """
-        return self.__clients
+        return self.__clients.get_view()
 
 
 class RentalRepository(object):
     def __init__(self):
         self.__rentals = []
+        self.__rentals_by_id = {}
+        self.__rental_index_by_id = {}
+        self.__active_rentals_by_book_id = {}
+        self.__active_rentals_by_client_id = {}
+        self.__rentals_by_client_id = {}
         self.__last_rental_id = 0
 
     def add_rental(self, rental):
@@ -112,15 +376,115 @@ class RentalRepository(object):
         Function to add a rental to the rental repository.
         :param rental: object, contains the rental object to be appended to the repository.
         """
+        self.__rental_index_by_id[rental.id] = len(self.__rentals)
         self.__rentals.append(rental)
+        self.__rentals_by_id[rental.id] = rental
+        self.__rentals_by_client_id.setdefault(rental.client_id, []).append(rental)
+        if rental.returned_date is None:
+            self.__active_rentals_by_book_id[rental.book_id] = rental
+            self.__active_rentals_by_client_id.setdefault(rental.client_id, {})[rental.id] = rental
+
+    def add_rentals(self, rentals):
+        """
+        Function to add many rentals to the rental repository at once.
+        :param rentals: iterable, contains the rental objects to be appended to the repository.
+        """
+        for rental in rentals:
+            self.add_rental(rental)
+
+    def remove_last_rental(self):
+        """
+        Function to remove the most recently added rental from the rental repository, e.g. when undoing it.
+        :return: the removed 'rental' object.
+        """
+        rental = self.__rentals.pop()
+        del self.__rentals_by_id[rental.id]
+        del self.__rental_index_by_id[rental.id]
+        client_rentals = self.__rentals_by_client_id[rental.client_id]
+        client_rentals.pop()
+        if len(client_rentals) == 0:
+            del self.__rentals_by_client_id[rental.client_id]
+        if rental.returned_date is None:
+            self.__remove_active_rental(rental)
+        return rental
 
-    def return_rental_by_index(self, index):
+    def return_rental_by_index(self, index, returned_date=None):
         """
-        Function to remove a rental from the rental repository.
-        :param index: integer, holds the value of the positional index of the rental to be removed from the repository.
+        Function to mark a rental from the rental repository as returned.
+        :param index: integer, holds the value of the positional index of the rental to be returned.
+        :param returned_date: date, the date of the return; if None, the current date is used.
         """
+        if returned_date is None:
+            returned_date = date.today()
         rental = self.__rentals[index]
-        rental.returned_date = date.today()
+        rental.returned_date = returned_date
+        self.__remove_active_rental(rental)
+
+    def reopen_rental_by_index(self, index):
+        """
+        Function to mark a returned rental from the rental repository as active again, e.g. when undoing its return.
+        :param index: integer, holds the value of the positional index of the rental to be reopened.
+        """
+        rental = self.__rentals[index]
+        rental.returned_date = None
+        self.__active_rentals_by_book_id[rental.book_id] = rental
+        client_active_rentals = self.__active_rentals_by_client_id.get(rental.client_id, {})
+        client_active_rentals[rental.id] = rental
+        self.__active_rentals_by_client_id[rental.client_id] = dict(sorted(client_active_rentals.items()))
+
+    def get_active_rental_by_book_id(self, book_id):
+        """
+        Function to return the active (not yet returned) rental of the book having the given ID, in constant time.
+        :param book_id: integer, ID of the book whose active rental is looked for.
+        :return: the 'rental' object if the book is currently rented, otherwise None.
+        """
+        return self.__active_rentals_by_book_id.get(book_id)
+
+    def get_active_rentals_by_client_id(self, client_id):
+        """
+        Function to return the active (not yet returned) rentals of the client having the given ID, in the order they
+        were made. The cost depends only on the number of active rentals of the client.
+        :param client_id: integer, ID of the client whose active rentals are looked for.
+        :return: list, containing the active rentals of the client.
+        """
+        client_active_rentals = self.__active_rentals_by_client_id.get(client_id)
+        if client_active_rentals is None:
+            return []
+        return list(client_active_rentals.values())
+
+    def get_rentals_by_client_id(self, client_id):
+        """
+        Function to return the full rental history of the client having the given ID, in the order the rentals were
+        made.
+        :param client_id: integer, ID of the client whose rentals are looked for.
+        :return: list, containing all the rentals of the client.
+        """
+        return self.__rentals_by_client_id.get(client_id, [])[:]
+
+    def get_by_id(self, rental_id):
+        """
+        Function to return the rental having the given ID, in constant time.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: the 'rental' object if found, otherwise None.
+        """
+        return self.__rentals_by_id.get(rental_id)
+
+    def contains_id(self, rental_id):
+        """
+        Function to return whether or not a rental having the given ID is found in the repository, in constant time.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: True/False, whether or not the rental is found.
+        """
+        return rental_id in self.__rentals_by_id
+
+    def get_index_by_id(self, rental_id):
+        """
+        Function to return the positional index of the rental having the given ID, in constant time. Rentals are never
+        removed from the repository, so the index of a rental does not change once it is added.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: integer, the positional index of the rental if found, otherwise None.
+        """
+        return self.__rental_index_by_id.get(rental_id)
 
     def get_next_rental_id(self):
         """
@@ -138,7 +502,16 @@ class RentalRepository(object):
 
     def get_all_rentals(self):
         """
-        Function to return the full list of rental found in the repository.
-        :return: list, containing the full list of rentals.
+        Function to return a read-only view over the full list of rentals found in the repository, without copying it.
+        :return: sequence, containing the full list of rentals.
         """
-        return self.__rentals
+        return ListView(self.__rentals)
+
+    def __remove_active_rental(self, rental):
+        if self.__active_rentals_by_book_id.get(rental.book_id) is rental:
+            del self.__active_rentals_by_book_id[rental.book_id]
+        client_active_rentals = self.__active_rentals_by_client_id.get(rental.client_id)
+        if client_active_rentals is not None:
+            client_active_rentals.pop(rental.id, None)
+            if len(client_active_rentals) == 0:
+                del self.__active_rentals_by_client_id[rental.client_id]
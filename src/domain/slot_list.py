@@ -0,0 +1,196 @@
+from bisect import bisect_left
+from collections.abc import Sequence
+
+DEFAULT_COMPACTION_THRESHOLD = 0.25
+
+
+class Tombstone(object):
+    """
+    Marker left in the slot of a removed entity, keeping the ID of the entity so that the slots stay in increasing
+    order of their IDs and the entity can be put back in its slot.
+    """
+    __slots__ = ("id",)
+
+    def __init__(self, entity_id):
+        self.id = entity_id
+
+
+class SlotList(object):
+    """
+    List of entities kept in increasing order of their IDs, in which removing an entity only replaces it with a
+    'Tombstone', so that no later entity moves and the slots given out stay valid. A dictionary maps the ID of each
+    entity, removed or not, to its slot. Once the removed entities exceed the compaction threshold (a fraction of the
+    slots), the tombstones are dropped in a single pass; since a compaction only happens after a number of removals
+    proportional to the size of the list, its cost is spread over those removals.
+    """
+
+    def __init__(self, compaction_threshold=DEFAULT_COMPACTION_THRESHOLD):
+        self.__slots = []
+        self.__slot_by_id = {}
+        self.__number_of_tombstones = 0
+        self.__compaction_threshold = compaction_threshold
+
+    def __len__(self):
+        return len(self.__slots) - self.__number_of_tombstones
+
+    def append(self, entity):
+        """
+        Function to add an entity after the last slot. Its ID must be higher than the IDs of all the slots.
+        :param entity: object, the entity to be added.
+        :return: integer, the slot of the entity.
+        """
+        slot = len(self.__slots)
+        self.__slots.append(entity)
+        self.__slot_by_id[entity.id] = slot
+        return slot
+
+    def extend(self, entities):
+        """
+        Function to add many entities after the last slot. Their IDs must be increasing and higher than the IDs of all
+        the slots.
+        :param entities: list, the entities to be added.
+        """
+        first_slot = len(self.__slots)
+        self.__slots.extend(entities)
+        self.__slot_by_id.update((entity.id, slot) for slot, entity in enumerate(entities, start=first_slot))
+
+    def insert(self, entity):
+        """
+        Function to put back an entity, e.g. when undoing its removal. The entity takes back the slot of its tombstone
+        if it still has one; otherwise, it is inserted at the position given by its ID, which moves the later slots.
+        :param entity: object, the entity to be put back.
+        :return: integer, the slot of the entity.
+        """
+        slot = self.__slot_by_id.get(entity.id)
+        if slot is not None and isinstance(self.__slots[slot], Tombstone):
+            self.__slots[slot] = entity
+            self.__number_of_tombstones -= 1
+            return slot
+        if len(self.__slots) == 0 or self.__slots[-1].id < entity.id:
+            return self.append(entity)
+        slot = bisect_left(self.__slots, entity.id, key=lambda listed_entity: listed_entity.id)
+        self.__slots.insert(slot, entity)
+        for later_slot in range(slot, len(self.__slots)):
+            self.__slot_by_id[self.__slots[later_slot].id] = later_slot
+        return slot
+
+    def remove(self, slot):
+        """
+        Function to remove the entity found in the given slot, leaving a tombstone in its place, and to compact the
+        list if the tombstones exceed the compaction threshold.
+        :param slot: integer, the slot of the entity.
+        :return: the removed entity.
+        """
+        entity = self.__slots[slot]
+        self.__slots[slot] = Tombstone(entity.id)
+        self.__number_of_tombstones += 1
+        if self.__number_of_tombstones > self.__compaction_threshold * len(self.__slots):
+            self.compact()
+        return entity
+
+    def replace(self, slot, entity):
+        """
+        Function to replace the entity found in the given slot with another one having the same ID.
+        :param slot: integer, the slot of the entity.
+        :param entity: object, the new entity.
+        """
+        self.__slots[slot] = entity
+
+    def get(self, slot):
+        """
+        Function to return the entity found in the given slot.
+        :param slot: integer, the slot of the entity.
+        :return: the entity, or None if the entity was removed.
+        """
+        entity = self.__slots[slot]
+        if isinstance(entity, Tombstone):
+            return None
+        return entity
+
+    def get_slot(self, entity_id):
+        """
+        Function to return the slot of the entity having the given ID, in constant time.
+        :param entity_id: integer, the ID of the entity.
+        :return: integer, the slot of the entity if it is in the list, otherwise None.
+        """
+        slot = self.__slot_by_id.get(entity_id)
+        if slot is None or isinstance(self.__slots[slot], Tombstone):
+            return None
+        return slot
+
+    def compact(self):
+        """
+        Function to drop all the tombstones, moving the entities to new slots. The slots given out before a compaction
+        are no longer valid after it.
+        """
+        if self.__number_of_tombstones == 0:
+            return
+        self.__slots = [entity for entity in self.__slots if not isinstance(entity, Tombstone)]
+        self.__slot_by_id = {entity.id: slot for slot, entity in enumerate(self.__slots)}
+        self.__number_of_tombstones = 0
+
+    def get_view(self):
+        """
+        Function to return a read-only view over the entities of the list, skipping the tombstones.
+        :return: the 'SlotListView' object.
+        """
+        return SlotListView(self)
+
+    def _get_slots(self):
+        return self.__slots
+
+    def _has_tombstones(self):
+        return self.__number_of_tombstones > 0
+
+
+class SlotListView(Sequence):
+    """
+    Read-only view over the entities of a 'SlotList', skipping the tombstones, without copying them. The positions of
+    the view count the entities only; while the list holds tombstones, indexing a position goes over the slots before
+    it, so callers needing many positions should iterate instead. The view follows the later changes of the list;
+    callers that need the contents as they are now must ask for a copy with 'snapshot'.
+    """
+    __slots__ = ("__slot_list",)
+
+    def __init__(self, slot_list):
+        self.__slot_list = slot_list
+
+    def __len__(self):
+        return len(self.__slot_list)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        slots = self.__slot_list._get_slots()
+        if not self.__slot_list._has_tombstones():
+            return slots[index]
+        number_of_entities = len(self)
+        if index < 0:
+            index += number_of_entities
+        if index < 0 or index >= number_of_entities:
+            raise IndexError("view index out of range")
+        for position, entity in enumerate(self):
+            if position == index:
+                return entity
+
+    def __iter__(self):
+        slots = self.__slot_list._get_slots()
+        if not self.__slot_list._has_tombstones():
+            return iter(slots)
+        return (entity for entity in slots if not isinstance(entity, Tombstone))
+
+    def __reversed__(self):
+        slots = self.__slot_list._get_slots()
+        if not self.__slot_list._has_tombstones():
+            return reversed(slots)
+        return (entity for entity in reversed(slots) if not isinstance(entity, Tombstone))
+
+    def __contains__(self, item):
+        return not isinstance(item, Tombstone) and item in self.__slot_list._get_slots()
+
+    def snapshot(self):
+        """
+        Function to return a copy of the viewed entities, unaffected by the later changes of the repository.
+        :return: list, containing the current entities of the view.
+        """
+        return list(self)
@@ -0,0 +1,681 @@
+import sqlite3
+from collections.abc import Sequence
+from contextlib import contextmanager
+from datetime import date
+
+from src.domain.entity import Book, Client, Rental
+
+VIEW_CHUNK_SIZE = 1000
+CACHED_STATEMENTS = 256
+
+
+def open_database(path=":memory:"):
+    """
+    Function to open (or create) the SQLite database holding the repositories. The connection works in autocommit
+    mode, so that every change is committed on its own unless it is made inside a 'transaction' block. File databases
+    use write-ahead logging, which keeps the readers from blocking the writer and the commits cheap. The connection
+    gets a 'casefold' SQL function, since 'LIKE' only ignores the case of the ASCII letters.
+    :param path: string, the path of the database file; ":memory:" for a database kept in memory.
+    :return: the 'sqlite3.Connection' object to be shared by the SQLite repositories.
+    """
+    connection = sqlite3.connect(path, isolation_level=None, cached_statements=CACHED_STATEMENTS)
+    connection.create_function("casefold", 1, fold_case, deterministic=True)
+    if path != ":memory:":
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+    return connection
+
+
+def fold_case(text):
+    """
+    Function to casefold a text the way the in-memory search indexes do, registered as the 'casefold' SQL function.
+    :param text: string, the text to be casefolded; None for a NULL value.
+    :return: string, the casefolded text; None for a NULL value.
+    """
+    if text is None:
+        return None
+    return text.casefold()
+
+
+@contextmanager
+def transaction(connection):
+    """
+    Function to make all the changes of the 'with' block in a single transaction, committed at its end, or rolled back
+    if the block raises an error. Nested blocks belong to the outermost one.
+    :param connection: object, the 'sqlite3.Connection' object of the repositories.
+    """
+    if connection.in_transaction:
+        yield
+        return
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def has_trigram_tokenizer(connection):
+    """
+    Function to check whether the SQLite library was built with FTS5 and its trigram tokenizer (SQLite 3.34 or newer).
+    :param connection: object, the 'sqlite3.Connection' object to be checked.
+    :return: True/False, whether or not trigram full-text tables can be created.
+    """
+    try:
+        connection.execute("CREATE VIRTUAL TABLE temp.trigram_check USING fts5(text, tokenize = 'trigram')")
+    except sqlite3.OperationalError:
+        return False
+    connection.execute("DROP TABLE temp.trigram_check")
+    return True
+
+
+def create_full_text_table(connection, table, columns):
+    """
+    Function to create the trigram full-text table of a repository table, holding the text of the IDs and the
+    casefolded text of the given columns, and to fill it from the rows already stored. The full-text table of the
+    databases created before the texts were casefolded is dropped.
+    :param connection: object, the 'sqlite3.Connection' object of the repositories.
+    :param table: string, the name of the repository table.
+    :param columns: list, containing the names of the text columns to be searched.
+    """
+    full_text_table = f"{table}_folded_text"
+    if connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (full_text_table,)).fetchone() is not None:
+        return
+    column_names = ", ".join(columns)
+    folded_columns = ", ".join(f"casefold({column})" for column in columns)
+    connection.execute(f"CREATE VIRTUAL TABLE {full_text_table} "
+                       f"USING fts5(id_text, {column_names}, tokenize = 'trigram')")
+    connection.execute(f"INSERT INTO {full_text_table} (rowid, id_text, {column_names}) "
+                       f"SELECT id, CAST(id AS TEXT), {folded_columns} FROM {table}")
+    connection.execute(f"DROP TABLE IF EXISTS {table}_text")
+
+
+def escape_like_pattern(text):
+    """
+    Function to build the LIKE pattern matching the texts containing the given text, escaping its wildcards.
+    :param text: string, the text to be looked for.
+    :return: string, the LIKE pattern, to be used with "ESCAPE '\\'".
+    """
+    escaped_text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return "%" + escaped_text + "%"
+
+
+def create_removed_ids_table(connection):
+    """
+    Function to create the table remembering, for each repository table, the highest ID of the entities removed from
+    it. A removed entity may have held the highest ID of its table, which 'MAX(id)' no longer sees once the database
+    is opened again, so its ID would be handed out again to a new entity, inheriting its rental history.
+    :param connection: object, the 'sqlite3.Connection' object of the repositories.
+    """
+    connection.execute("CREATE TABLE IF NOT EXISTS removed_ids (name TEXT PRIMARY KEY, last_id INTEGER NOT NULL)")
+
+
+def remember_removed_id(connection, table, removed_id):
+    """
+    Function to remember the ID of an entity removed from a repository table, if it is the highest one removed so far.
+    :param connection: object, the 'sqlite3.Connection' object of the repositories.
+    :param table: string, the name of the repository table.
+    :param removed_id: integer, the ID of the removed entity.
+    """
+    connection.execute("INSERT INTO removed_ids (name, last_id) VALUES (?, ?) "
+                       "ON CONFLICT (name) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)", (table, removed_id))
+
+
+def get_last_id(connection, table):
+    """
+    Function to return the last ID handed out for a repository table: the highest ID of its entities, or of the
+    entities removed from it, so that the IDs keep increasing across the restarts, as they do in memory.
+    :param connection: object, the 'sqlite3.Connection' object of the repositories.
+    :param table: string, the name of the repository table.
+    :return: integer, the last ID handed out; 0 if the table never held any entity.
+    """
+    return connection.execute(f"SELECT MAX(COALESCE((SELECT MAX(id) FROM {table}), 0), "
+                              f"COALESCE((SELECT last_id FROM removed_ids WHERE name = ?), 0))", (table,)).fetchone()[0]
+
+
+class SqliteTableView(Sequence):
+    """
+    Read-only view over a table of a SQLite repository, in increasing order of the IDs. Iterating over the view
+    fetches the rows in chunks, so that a table larger than the memory can be listed; the length and the positional
+    indexing are answered by queries.
+    """
+
+    def __init__(self, connection, table, columns, make_entity):
+        self.__connection = connection
+        self.__table = table
+        self.__columns = columns
+        self.__make_entity = make_entity
+
+    def __len__(self):
+        return self.__connection.execute(f"SELECT COUNT(*) FROM {self.__table}").fetchone()[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        order = "ASC"
+        if index < 0:
+            order = "DESC"
+            index = -index - 1
+        row = self.__connection.execute(f"SELECT {self.__columns} FROM {self.__table} ORDER BY id {order} "
+                                        f"LIMIT 1 OFFSET ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError("view index out of range")
+        return self.__make_entity(row)
+
+    def __iter__(self):
+        return self.__iterate("id > ?", "ASC", 0)
+
+    def __reversed__(self):
+        maximum_id = self.__connection.execute(f"SELECT MAX(id) FROM {self.__table}").fetchone()[0]
+        if maximum_id is None:
+            return iter(())
+        return self.__iterate("id < ?", "DESC", maximum_id + 1)
+
+    def snapshot(self):
+        """
+        Function to return a copy of the viewed table, unaffected by the later changes of the repository.
+        :return: list, containing the current entities of the view.
+        """
+        return list(self)
+
+    def __iterate(self, condition, order, start_id):
+        query = f"SELECT {self.__columns} FROM {self.__table} WHERE {condition} ORDER BY id {order} LIMIT ?"
+        last_id = start_id
+        while True:
+            rows = self.__connection.execute(query, (last_id, VIEW_CHUNK_SIZE)).fetchall()
+            for row in rows:
+                yield self.__make_entity(row)
+            if len(rows) < VIEW_CHUNK_SIZE:
+                return
+            last_id = rows[-1][0]
+
+
+class SqliteBookRepository(object):
+    """
+    Book repository kept in a SQLite table, for catalogs larger than the memory. It exposes the same functions as
+    'BookRepository', except that the books are addressed by their ID instead of a position: the 'index' taken and
+    returned by the functions is the ID of the book. The (title, author) pairs are indexed, and the substring searches
+    go over the casefolded texts, as the in-memory indexes do, through a trigram full-text table when SQLite provides
+    one.
+    """
+
+    def __init__(self, connection):
+        self.__connection = connection
+        self.__full_text = has_trigram_tokenizer(connection)
+        with transaction(connection):
+            connection.execute("CREATE TABLE IF NOT EXISTS books "
+                               "(id INTEGER PRIMARY KEY, title TEXT NOT NULL, author TEXT NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS books_by_title_and_author ON books (title, author, id)")
+            create_removed_ids_table(connection)
+            if self.__full_text:
+                create_full_text_table(connection, "books", ["title", "author"])
+        self.__last_book_id = get_last_id(connection, "books")
+
+    def add_book(self, book):
+        """
+        Function to add a book to the book repository.
+        :param book: object, contains the book object to be added to the repository.
+        """
+        self.add_books([book])
+
+    def add_books(self, books):
+        """
+        Function to add many books to the book repository, in a single transaction.
+        :param books: iterable, contains the book objects to be added to the repository.
+        """
+        rows = [(book.id, book.title, book.author) for book in books]
+        with transaction(self.__connection):
+            self.__connection.executemany("INSERT INTO books (id, title, author) VALUES (?, ?, ?)", rows)
+            if self.__full_text:
+                self.__connection.executemany("INSERT INTO books_folded_text (rowid, id_text, title, author) "
+                                              "VALUES (?1, CAST(?1 AS TEXT), ?2, ?3)",
+                                              [(book_id, title.casefold(), author.casefold())
+                                               for book_id, title, author in rows])
+
+    def remove_book_by_index(self, index):
+        """
+        Function to remove a book from the book repository.
+        :param index: integer, holds the ID of the book to be removed from the repository.
+        """
+        with transaction(self.__connection):
+            self.__connection.execute("DELETE FROM books WHERE id = ?", (index,))
+            remember_removed_id(self.__connection, "books", index)
+            if self.__full_text:
+                self.__connection.execute("DELETE FROM books_folded_text WHERE rowid = ?", (index,))
+
+    def insert_book(self, book):
+        """
+        Function to put back a book in the book repository, e.g. when undoing its removal.
+        :param book: object, contains the book object to be inserted in the repository.
+        """
+        self.add_book(book)
+
+    def get_index_by_id(self, book_id):
+        """
+        Function to return the index of the book having the given ID, which is the ID itself.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: integer, the ID of the book if found, otherwise None.
+        """
+        if not self.contains_id(book_id):
+            return None
+        return book_id
+
+    def update_book(self, index, new_book):
+        """
+        Function to update the details of a book found in the book repository.
+        :param index: integer, holds the ID of the book to be updated from the repository.
+        :param new_book: object, contains the updated book object to replace the one having the ID in the repository.
+        """
+        with transaction(self.__connection):
+            self.remove_book_by_index(index)
+            self.add_book(new_book)
+
+    def get_by_id(self, book_id):
+        """
+        Function to return the book having the given ID, through the primary key.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: the 'book' object if found, otherwise None.
+        """
+        row = self.__connection.execute("SELECT id, title, author FROM books WHERE id = ?", (book_id,)).fetchone()
+        if row is None:
+            return None
+        return Book(*row)
+
+    def contains_id(self, book_id):
+        """
+        Function to return whether or not a book having the given ID is found in the repository.
+        :param book_id: integer, ID of the book to be looked for.
+        :return: True/False, whether or not the book is found.
+        """
+        return self.__connection.execute("SELECT 1 FROM books WHERE id = ?", (book_id,)).fetchone() is not None
+
+    def find_book_by_title_and_author(self, title, author):
+        """
+        Function to return the book having exactly the given title and author, through the (title, author) index. If
+        several books match, the one having the lowest ID is returned.
+        :param title: string, the title of the book.
+        :param author: string, the name of the author of the book.
+        :return: tuple, containing the index and the 'book' object if found, otherwise None and None.
+        """
+        row = self.__connection.execute("SELECT id, title, author FROM books WHERE title = ? AND author = ? "
+                                        "ORDER BY id LIMIT 1", (title, author)).fetchone()
+        if row is None:
+            return None, None
+        return row[0], Book(*row)
+
+    def find_books_matching_id(self, book_id):
+        """
+        Function to return all the books whose ID contains the digits of the given ID (e.g. 12 matches 12, 112, 1203).
+        :param book_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        return self.__find_books_matching("id_text", "CAST(id AS TEXT)", str(book_id))
+
+    def find_books_matching_title(self, title):
+        """
+        Function to return all the books whose title contains the given text, ignoring case.
+        :param title: string, the text to be looked for in the titles of the books.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        return self.__find_books_matching("title", "casefold(title)", title)
+
+    def find_books_matching_author(self, author):
+        """
+        Function to return all the books whose author name contains the given text, ignoring case.
+        :param author: string, the text to be looked for in the author names of the books.
+        :return: list, containing the matching books, ordered by their ID.
+        """
+        return self.__find_books_matching("author", "casefold(author)", author)
+
+    def __find_books_matching(self, text_column, column, text):
+        if self.__full_text:
+            query = f"SELECT id, title, author FROM books WHERE id IN " \
+                    f"(SELECT rowid FROM books_folded_text WHERE {text_column} LIKE ? ESCAPE '\\') ORDER BY id"
+        else:
+            query = f"SELECT id, title, author FROM books WHERE {column} LIKE ? ESCAPE '\\' ORDER BY id"
+        rows = self.__connection.execute(query, (escape_like_pattern(text.casefold()),)).fetchall()
+        return [Book(*row) for row in rows]
+
+    def get_next_book_id(self):
+        """
+        Function to return the next valid ID for a book in the repository.
+        :return: integer, next valid ID for a book.
+        """
+        self.increment_last_book_id()
+        return self.__last_book_id
+
+    def increment_last_book_id(self):
+        """
+        Function to increment the last used book ID in the repository.
+        """
+        self.__last_book_id += 1
+
+    def get_all_books(self):
+        """
+        Function to return a read-only view over all the books found in the repository, without loading them.
+        :return: sequence, containing all the books.
+        """
+        return SqliteTableView(self.__connection, "books", "id, title, author", lambda row: Book(*row))
+
+
+class SqliteClientRepository(object):
+    """
+    Client repository kept in a SQLite table, for client lists larger than the memory. It exposes the same functions as
+    'ClientRepository', except that the clients are addressed by their ID instead of a position: the 'index' taken and
+    returned by the functions is the ID of the client. The names are indexed, and the substring searches go over the
+    casefolded names, as the in-memory indexes do, through a trigram full-text table when SQLite provides one.
+    """
+
+    def __init__(self, connection):
+        self.__connection = connection
+        self.__full_text = has_trigram_tokenizer(connection)
+        with transaction(connection):
+            connection.execute("CREATE TABLE IF NOT EXISTS clients (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS clients_by_name ON clients (name, id)")
+            create_removed_ids_table(connection)
+            if self.__full_text:
+                create_full_text_table(connection, "clients", ["name"])
+        self.__last_client_id = get_last_id(connection, "clients")
+
+    def add_client(self, client):
+        """
+        Function to add a client to the client repository.
+        :param client: object, contains the client object to be added to the repository.
+        """
+        self.add_clients([client])
+
+    def add_clients(self, clients):
+        """
+        Function to add many clients to the client repository, in a single transaction.
+        :param clients: iterable, contains the client objects to be added to the repository.
+        """
+        rows = [(client.id, client.name) for client in clients]
+        with transaction(self.__connection):
+            self.__connection.executemany("INSERT INTO clients (id, name) VALUES (?, ?)", rows)
+            if self.__full_text:
+                self.__connection.executemany("INSERT INTO clients_folded_text (rowid, id_text, name) "
+                                              "VALUES (?1, CAST(?1 AS TEXT), ?2)",
+                                              [(client_id, name.casefold()) for client_id, name in rows])
+
+    def remove_client_by_index(self, index):
+        """
+        Function to remove a client from the client repository.
+        :param index: integer, holds the ID of the client to be removed from the repository.
+        """
+        with transaction(self.__connection):
+            self.__connection.execute("DELETE FROM clients WHERE id = ?", (index,))
+            remember_removed_id(self.__connection, "clients", index)
+            if self.__full_text:
+                self.__connection.execute("DELETE FROM clients_folded_text WHERE rowid = ?", (index,))
+
+    def insert_client(self, client):
+        """
+        Function to put back a client in the client repository, e.g. when undoing its removal.
+        :param client: object, contains the client object to be inserted in the repository.
+        """
+        self.add_client(client)
+
+    def get_index_by_id(self, client_id):
+        """
+        Function to return the index of the client having the given ID, which is the ID itself.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: integer, the ID of the client if found, otherwise None.
+        """
+        if not self.contains_id(client_id):
+            return None
+        return client_id
+
+    def update_client(self, index, new_client):
+        """
+        Function to update the details of a client found in the client repository.
+        :param index: integer, holds the ID of the client to be updated from the repository.
+        :param new_client: object, contains the updated client object to replace the one having the ID in the
+        repository.
+        """
+        with transaction(self.__connection):
+            self.remove_client_by_index(index)
+            self.add_client(new_client)
+
+    def get_by_id(self, client_id):
+        """
+        Function to return the client having the given ID, through the primary key.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: the 'client' object if found, otherwise None.
+        """
+        row = self.__connection.execute("SELECT id, name FROM clients WHERE id = ?", (client_id,)).fetchone()
+        if row is None:
+            return None
+        return Client(*row)
+
+    def contains_id(self, client_id):
+        """
+        Function to return whether or not a client having the given ID is found in the repository.
+        :param client_id: integer, ID of the client to be looked for.
+        :return: True/False, whether or not the client is found.
+        """
+        return self.__connection.execute("SELECT 1 FROM clients WHERE id = ?", (client_id,)).fetchone() is not None
+
+    def find_client_by_name(self, name):
+        """
+        Function to return the client having exactly the given name, through the name index. If several clients match,
+        the one having the lowest ID is returned.
+        :param name: string, the name of the client.
+        :return: tuple, containing the index and the 'client' object if found, otherwise None and None.
+        """
+        row = self.__connection.execute("SELECT id, name FROM clients WHERE name = ? ORDER BY id LIMIT 1",
+                                        (name,)).fetchone()
+        if row is None:
+            return None, None
+        return row[0], Client(*row)
+
+    def find_clients_matching_id(self, client_id):
+        """
+        Function to return all the clients whose ID contains the digits of the given ID (e.g. 12 matches 12, 112, 1203).
+        :param client_id: integer, the (partial) ID to be looked for.
+        :return: list, containing the matching clients, ordered by their ID.
+        """
+        return self.__find_clients_matching("id_text", "CAST(id AS TEXT)", str(client_id))
+
+    def find_clients_matching_name(self, name):
+        """
+        Function to return all the clients whose name contains the given text, ignoring case.
+        :param name: string, the text to be looked for in the names of the clients.
+        :return: list, containing the matching clients, ordered by their ID.
+        """
+        return self.__find_clients_matching("name", "casefold(name)", name)
+
+    def __find_clients_matching(self, text_column, column, text):
+        if self.__full_text:
+            query = f"SELECT id, name FROM clients WHERE id IN " \
+                    f"(SELECT rowid FROM clients_folded_text WHERE {text_column} LIKE ? ESCAPE '\\') ORDER BY id"
+        else:
+            query = f"SELECT id, name FROM clients WHERE {column} LIKE ? ESCAPE '\\' ORDER BY id"
+        rows = self.__connection.execute(query, (escape_like_pattern(text.casefold()),)).fetchall()
+        return [Client(*row) for row in rows]
+
+    def get_next_client_id(self):
+        """
+        Function to return the next valid ID for a client in the repository.
+        :return: integer, next valid ID for a client.
+        """
+        self.increment_last_client_id()
+        return self.__last_client_id
+
+    def increment_last_client_id(self):
+        """
+        Function to increment the last used client ID in the repository.
+        """
+        self.__last_client_id += 1
+
+    def get_all_clients(self):
+        """
+        Function to return a read-only view over all the clients found in the repository, without loading them.
+        :return: sequence, containing all the clients.
+        """
+        return SqliteTableView(self.__connection, "clients", "id, name", lambda row: Client(*row))
+
+
+class SqliteRentalRepository(object):
+    """
+    Rental repository kept in a SQLite table, for rental histories larger than the memory. It exposes the same
+    functions as 'RentalRepository', except that the rentals are addressed by their ID instead of a position: the
+    'index' taken and returned by the functions is the ID of the rental. Dates are stored as their ordinals, and the
+    active rentals are indexed by book and by client through partial indexes, which only hold the active rentals.
+    """
+
+    def __init__(self, connection):
+        self.__connection = connection
+        with transaction(connection):
+            connection.execute("CREATE TABLE IF NOT EXISTS rentals (id INTEGER PRIMARY KEY, book_id INTEGER NOT NULL, "
+                               "client_id INTEGER NOT NULL, rented_date INTEGER NOT NULL, returned_date INTEGER)")
+            connection.execute("CREATE INDEX IF NOT EXISTS rentals_by_client ON rentals (client_id, id)")
+            connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS active_rentals_by_book ON rentals (book_id) "
+                               "WHERE returned_date IS NULL")
+            connection.execute("CREATE INDEX IF NOT EXISTS active_rentals_by_client ON rentals (client_id, id) "
+                               "WHERE returned_date IS NULL")
+            create_removed_ids_table(connection)
+        self.__last_rental_id = get_last_id(connection, "rentals")
+
+    def add_rental(self, rental):
+        """
+        Function to add a rental to the rental repository.
+        :param rental: object, contains the rental object to be added to the repository.
+        """
+        self.add_rentals([rental])
+
+    def add_rentals(self, rentals):
+        """
+        Function to add many rentals to the rental repository, in a single transaction.
+        :param rentals: iterable, contains the rental objects to be added to the repository.
+        """
+        rows = [(rental.id, rental.book_id, rental.client_id, rental.rented_date.toordinal(),
+                 None if rental.returned_date is None else rental.returned_date.toordinal()) for rental in rentals]
+        with transaction(self.__connection):
+            self.__connection.executemany("INSERT INTO rentals (id, book_id, client_id, rented_date, returned_date) "
+                                          "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def remove_last_rental(self):
+        """
+        Function to remove the most recently added rental from the rental repository, e.g. when undoing it.
+        :return: the removed 'rental' object.
+        """
+        with transaction(self.__connection):
+            rental = self.__make_rental(self.__connection.execute(
+                "SELECT id, book_id, client_id, rented_date, returned_date FROM rentals "
+                "ORDER BY id DESC LIMIT 1").fetchone())
+            self.__connection.execute("DELETE FROM rentals WHERE id = ?", (rental.id,))
+            remember_removed_id(self.__connection, "rentals", rental.id)
+        return rental
+
+    def return_rental_by_index(self, index, returned_date=None):
+        """
+        Function to mark a rental from the rental repository as returned.
+        :param index: integer, holds the ID of the rental to be returned.
+        :param returned_date: date, the date of the return; if None, the current date is used.
+        """
+        if returned_date is None:
+            returned_date = date.today()
+        self.__connection.execute("UPDATE rentals SET returned_date = ? WHERE id = ?",
+                                  (returned_date.toordinal(), index))
+
+    def reopen_rental_by_index(self, index):
+        """
+        Function to mark a returned rental from the rental repository as active again, e.g. when undoing its return.
+        :param index: integer, holds the ID of the rental to be reopened.
+        """
+        self.__connection.execute("UPDATE rentals SET returned_date = NULL WHERE id = ?", (index,))
+
+    def get_active_rental_by_book_id(self, book_id):
+        """
+        Function to return the active (not yet returned) rental of the book having the given ID, through the index of
+        the active rentals by book.
+        :param book_id: integer, ID of the book whose active rental is looked for.
+        :return: the 'rental' object if the book is currently rented, otherwise None.
+        """
+        row = self.__connection.execute("SELECT id, book_id, client_id, rented_date, returned_date FROM rentals "
+                                        "WHERE book_id = ? AND returned_date IS NULL", (book_id,)).fetchone()
+        if row is None:
+            return None
+        return self.__make_rental(row)
+
+    def get_active_rentals_by_client_id(self, client_id):
+        """
+        Function to return the active (not yet returned) rentals of the client having the given ID, in the order they
+        were made, through the index of the active rentals by client.
+        :param client_id: integer, ID of the client whose active rentals are looked for.
+        :return: list, containing the active rentals of the client.
+        """
+        rows = self.__connection.execute("SELECT id, book_id, client_id, rented_date, returned_date FROM rentals "
+                                         "WHERE client_id = ? AND returned_date IS NULL ORDER BY id",
+                                         (client_id,)).fetchall()
+        return [self.__make_rental(row) for row in rows]
+
+    def get_rentals_by_client_id(self, client_id):
+        """
+        Function to return the full rental history of the client having the given ID, in the order the rentals were
+        made.
+        :param client_id: integer, ID of the client whose rentals are looked for.
+        :return: list, containing all the rentals of the client.
+        """
+        rows = self.__connection.execute("SELECT id, book_id, client_id, rented_date, returned_date FROM rentals "
+                                         "WHERE client_id = ? ORDER BY id", (client_id,)).fetchall()
+        return [self.__make_rental(row) for row in rows]
+
+    def get_by_id(self, rental_id):
+        """
+        Function to return the rental having the given ID, through the primary key.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: the 'rental' object if found, otherwise None.
+        """
+        row = self.__connection.execute("SELECT id, book_id, client_id, rented_date, returned_date FROM rentals "
+                                        "WHERE id = ?", (rental_id,)).fetchone()
+        if row is None:
+            return None
+        return self.__make_rental(row)
+
+    def contains_id(self, rental_id):
+        """
+        Function to return whether or not a rental having the given ID is found in the repository.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: True/False, whether or not the rental is found.
+        """
+        return self.__connection.execute("SELECT 1 FROM rentals WHERE id = ?", (rental_id,)).fetchone() is not None
+
+    def get_index_by_id(self, rental_id):
+        """
+        Function to return the index of the rental having the given ID, which is the ID itself.
+        :param rental_id: integer, ID of the rental to be looked for.
+        :return: integer, the ID of the rental if found, otherwise None.
+        """
+        if not self.contains_id(rental_id):
+            return None
+        return rental_id
+
+    def get_next_rental_id(self):
+        """
+        Function to return the next valid ID for a rental in the repository.
+        :return: integer, next valid ID for a rental.
+        """
+        self.increment_last_rental_id()
+        return self.__last_rental_id
+
+    def increment_last_rental_id(self):
+        """
+        Function to increment the last used rental ID in the repository.
+        """
+        self.__last_rental_id += 1
+
+    def get_all_rentals(self):
+        """
+        Function to return a read-only view over all the rentals found in the repository, without loading them.
+        :return: sequence, containing all the rentals.
+        """
+        return SqliteTableView(self.__connection, "rentals", "id, book_id, client_id, rented_date, returned_date",
+                               self.__make_rental)
+
+    @staticmethod
+    def __make_rental(row):
+        rental_id, book_id, client_id, rented_ordinal, returned_ordinal = row
+        returned_date = None if returned_ordinal is None else date.fromordinal(returned_ordinal)
+        return Rental(rental_id, book_id, client_id, date.fromordinal(rented_ordinal), returned_date)
@@ -0,0 +1,217 @@
+import heapq
+from bisect import bisect_left, insort
+from datetime import date
+
+
+class RankedCounter(object):
+    """
+    Counter that keeps its keys grouped by count, with the distinct counts in sorted order, so that changing a count
+    costs a bucket move and the top-k keys are read from the highest buckets without sorting all the keys. Keys having
+    the same count are ranked in the order they reached it.
+    """
+
+    def __init__(self):
+        self.__counts = {}
+        self.__keys_by_count = {}
+        self.__sorted_counts = []
+
+    def add(self, key, amount=1):
+        """
+        Function to add the given amount to the count of a key. Keys whose count drops to 0 are dropped.
+        :param key: the key whose count is changed.
+        :param amount: integer, the amount to be added to the count of the key; it may be negative.
+        """
+        old_count = self.__counts.get(key, 0)
+        new_count = old_count + amount
+        if old_count > 0:
+            self.__remove_from_bucket(key, old_count)
+        if new_count > 0:
+            self.__counts[key] = new_count
+            bucket = self.__keys_by_count.get(new_count)
+            if bucket is None:
+                bucket = self.__keys_by_count[new_count] = {}
+                insort(self.__sorted_counts, new_count)
+            bucket[key] = None
+        else:
+            self.__counts.pop(key, None)
+
+    def get(self, key):
+        """
+        Function to return the count of a key.
+        :param key: the key whose count is returned.
+        :return: integer, the count of the key, 0 if the key was never counted.
+        """
+        return self.__counts.get(key, 0)
+
+    def top(self, k=None):
+        """
+        Function to return the keys having the highest counts, in descending order of their counts.
+        :param k: integer, the number of keys to be returned; if None, all the keys are returned.
+        :return: list, containing (key, count) tuples.
+        """
+        ranking = []
+        for count in reversed(self.__sorted_counts):
+            for key in self.__keys_by_count[count]:
+                if k is not None and len(ranking) >= k:
+                    return ranking
+                ranking.append((key, count))
+        return ranking
+
+    def __len__(self):
+        return len(self.__counts)
+
+    def __remove_from_bucket(self, key, count):
+        bucket = self.__keys_by_count[count]
+        del bucket[key]
+        if len(bucket) == 0:
+            del self.__keys_by_count[count]
+            del self.__sorted_counts[bisect_left(self.__sorted_counts, count)]
+
+
+class RentalStatistics(object):
+    """
+    Rental counters per book and per author, and rental day aggregates per client, updated as rentals are made and
+    returned so that the statistics never go over the rental history.
+
+    A rental counts one day for each calendar day from its rented date to its returned date, both included; open
+    rentals count up to today. For each client, the days of the closed rentals are summed up, while the open rentals
+    are kept as their number and the sum of their rented date ordinals, so that their days can be evaluated for any
+    day in constant time.
+    """
+
+    def __init__(self):
+        self.__rentals_by_book_id = RankedCounter()
+        self.__rentals_by_author = RankedCounter()
+        self.__author_by_book_id = {}
+        self.__rental_days_by_client_id = {}
+
+    def record_rental(self, book_id, author, client_id, rented_date):
+        """
+        Function to count a new rental of a book.
+        :param book_id: integer, ID of the rented book.
+        :param author: string, name of the author of the rented book; None if the book is no longer known, e.g. when
+        the statistics are rebuilt from a rental history whose book was removed, in which case no author is counted.
+        :param client_id: integer, ID of the client renting the book.
+        :param rented_date: date, date of the rental.
+        """
+        self.__rentals_by_book_id.add(book_id)
+        if author is not None:
+            if book_id in self.__author_by_book_id:
+                self.update_book_author(book_id, author)
+            else:
+                self.__author_by_book_id[book_id] = author
+            self.__rentals_by_author.add(author)
+
+        rental_days = self.__rental_days_by_client_id.get(client_id)
+        if rental_days is None:
+            rental_days = self.__rental_days_by_client_id[client_id] = [0, 0, 0]
+        rental_days[1] += 1
+        rental_days[2] += rented_date.toordinal()
+
+    def record_return(self, client_id, rented_date, returned_date):
+        """
+        Function to move a returned rental of a client from its open rentals to its closed rental days.
+        :param client_id: integer, ID of the client that returned the book.
+        :param rented_date: date, date of the rental.
+        :param returned_date: date, date of the return.
+        """
+        rental_days = self.__rental_days_by_client_id[client_id]
+        rental_days[0] += (returned_date - rented_date).days + 1
+        rental_days[1] -= 1
+        rental_days[2] -= rented_date.toordinal()
+
+    def cancel_rental(self, book_id, client_id, rented_date):
+        """
+        Function to stop counting an open rental of a book that is removed, e.g. when undoing it.
+        :param book_id: integer, ID of the rented book.
+        :param client_id: integer, ID of the client renting the book.
+        :param rented_date: date, date of the rental.
+        """
+        self.__rentals_by_book_id.add(book_id, -1)
+        author = self.__author_by_book_id.get(book_id)
+        if author is not None:
+            self.__rentals_by_author.add(author, -1)
+        rental_days = self.__rental_days_by_client_id[client_id]
+        rental_days[1] -= 1
+        rental_days[2] -= rented_date.toordinal()
+        if rental_days == [0, 0, 0]:
+            del self.__rental_days_by_client_id[client_id]
+
+    def cancel_return(self, client_id, rented_date, returned_date):
+        """
+        Function to move a rental of a client back from its closed rental days to its open rentals, e.g. when undoing
+        its return.
+        :param client_id: integer, ID of the client that returned the book.
+        :param rented_date: date, date of the rental.
+        :param returned_date: date, date of the cancelled return.
+        """
+        rental_days = self.__rental_days_by_client_id[client_id]
+        rental_days[0] -= (returned_date - rented_date).days + 1
+        rental_days[1] += 1
+        rental_days[2] += rented_date.toordinal()
+
+    def update_book_author(self, book_id, author):
+        """
+        Function to move the rentals already counted for a book to its new author. Books that were never rented are
+        ignored.
+        :param book_id: integer, ID of the book whose author changed.
+        :param author: string, the new name of the author of the book.
+        """
+        old_author = self.__author_by_book_id.get(book_id)
+        if old_author is None or old_author == author:
+            return
+        self.__author_by_book_id[book_id] = author
+        book_rentals = self.__rentals_by_book_id.get(book_id)
+        self.__rentals_by_author.add(old_author, -book_rentals)
+        self.__rentals_by_author.add(author, book_rentals)
+
+    def get_most_rented_books(self, k=None):
+        """
+        Function to return the most rented books, in descending order of their number of rentals.
+        :param k: integer, the number of books to be returned; if None, all the rented books are returned.
+        :return: list, containing (book ID, number of rentals) tuples.
+        """
+        return self.__rentals_by_book_id.top(k)
+
+    def get_most_rented_authors(self, k=None):
+        """
+        Function to return the most rented authors, in descending order of the number of rentals of their books.
+        :param k: integer, the number of authors to be returned; if None, all the rented authors are returned.
+        :return: list, containing (author name, number of rentals) tuples.
+        """
+        return self.__rentals_by_author.top(k)
+
+    def get_client_rental_days(self, client_id, today=None):
+        """
+        Function to return the number of rental days of a client, counting its open rentals up to the given day.
+        :param client_id: integer, ID of the client.
+        :param today: date, the day up to which open rentals are counted; if None, the current date is used.
+        :return: integer, the number of rental days of the client.
+        """
+        if today is None:
+            today = date.today()
+        rental_days = self.__rental_days_by_client_id.get(client_id)
+        if rental_days is None:
+            return 0
+        return self.__evaluate_rental_days(rental_days, today.toordinal() + 1)
+
+    def get_most_active_clients(self, k=None, today=None):
+        """
+        Function to return the most active clients, in descending order of their number of rental days.
+        :param k: integer, the number of clients to be returned; if None, all the clients that rented are returned.
+        :param today: date, the day up to which open rentals are counted; if None, the current date is used.
+        :return: list, containing (client ID, number of rental days) tuples.
+        """
+        if today is None:
+            today = date.today()
+        day_after_ordinal = today.toordinal() + 1
+        clients_and_rental_days = ((client_id, self.__evaluate_rental_days(rental_days, day_after_ordinal))
+                                   for client_id, rental_days in self.__rental_days_by_client_id.items())
+        if k is None:
+            return sorted(clients_and_rental_days, key=lambda client_rental: client_rental[1], reverse=True)
+        return heapq.nlargest(k, clients_and_rental_days, key=lambda client_rental: client_rental[1])
+
+    @staticmethod
+    def __evaluate_rental_days(rental_days, day_after_ordinal):
+        closed_rental_days, open_rentals, open_rented_ordinals = rental_days
+        return closed_rental_days + open_rentals * day_after_ordinal - open_rented_ordinals
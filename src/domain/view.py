@@ -0,0 +1,35 @@
+from collections.abc import Sequence
+
+
+class ListView(Sequence):
+    """
+    Read-only view over a list owned by a repository, giving copy-free iteration, indexing and length without letting
+    callers change the repository behind its back. The view follows the later changes of the list; callers that need
+    the contents as they are now must ask for a copy with 'snapshot'.
+    """
+    __slots__ = ("__items",)
+
+    def __init__(self, items):
+        self.__items = items
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __getitem__(self, index):
+        return self.__items[index]
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __reversed__(self):
+        return reversed(self.__items)
+
+    def __contains__(self, item):
+        return item in self.__items
+
+    def snapshot(self):
+        """
+        Function to return a copy of the viewed list, unaffected by the later changes of the repository.
+        :return: list, containing the current items of the view.
+        """
+        return self.__items[:]
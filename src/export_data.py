@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+from datetime import date
+
+from src.domain.persistence import WriteAheadLog, DurableBookRepository, DurableClientRepository, \
+    DurableRentalRepository
+from src.domain.statistics import RentalStatistics
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.export import ExportService, write_csv, write_jsonl, BOOK_FIELDS, CLIENT_FIELDS, RENTAL_FIELDS, \
+    STATISTICS_FIELDS
+from src.services.service import RentalService, StatisticsService
+
+DATA_DIRECTORY = "data"
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Export the library data or its statistics to CSV or JSONL.")
+    parser.add_argument("kind", choices=["books", "clients", "rentals"] + list(STATISTICS_FIELDS),
+                        help="the data or the statistics leaderboard to be exported")
+    parser.add_argument("--output", default="-", help="the file to write to; '-' for the standard output")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="the format of the output; taken from the extension of the file by default, else CSV")
+    parser.add_argument("--since-rental-id", type=int, default=None,
+                        help="only export the rentals made after the rental having this ID")
+    parser.add_argument("--since-date", type=date.fromisoformat, default=None,
+                        help="only export the rentals made or returned on this date (YYYY-MM-DD) or later")
+    parser.add_argument("--limit", type=int, default=None, help="the number of leaderboard entries to be exported")
+    parser.add_argument("--data-directory", default=DATA_DIRECTORY, help="the directory of the library data")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    file_format = arguments.format
+    if file_format is None:
+        file_format = "jsonl" if arguments.output.lower().endswith((".jsonl", ".json")) else "csv"
+    write_records = write_jsonl if file_format == "jsonl" else write_csv
+
+    write_ahead_log = WriteAheadLog(arguments.data_directory)
+    book_repository = DurableBookRepository(write_ahead_log)
+    client_repository = DurableClientRepository(write_ahead_log)
+    rental_repository = DurableRentalRepository(write_ahead_log)
+    write_ahead_log.open()
+    write_ahead_log.close()
+    rentals = rental_repository.get_all_rentals()
+    last_rental_id = rentals[-1].id if len(rentals) > 0 else 0
+
+    rental_statistics = RentalStatistics()
+    if arguments.kind in STATISTICS_FIELDS:
+        RentalService(book_repository, client_repository, rental_repository, BookValidator(), ClientValidator(),
+                      RentalValidator(), rental_statistics).rebuild_statistics()
+    export_service = ExportService(book_repository, client_repository, rental_repository,
+                                   StatisticsService(rental_statistics))
+    if arguments.kind == "books":
+        records, fields = export_service.export_books(), BOOK_FIELDS
+    elif arguments.kind == "clients":
+        records, fields = export_service.export_clients(), CLIENT_FIELDS
+    elif arguments.kind == "rentals":
+        records = export_service.export_rentals(arguments.since_rental_id, arguments.since_date)
+        fields = RENTAL_FIELDS
+    else:
+        records = export_service.export_statistics(arguments.kind, arguments.limit)
+        fields = STATISTICS_FIELDS[arguments.kind]
+
+    if arguments.output == "-":
+        number_of_records = write_records(records, sys.stdout, fields)
+        destination = "the standard output"
+    else:
+        temporary_path = arguments.output + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8", newline="") as output_file:
+            number_of_records = write_records(records, output_file, fields)
+        os.replace(temporary_path, arguments.output)
+        destination = arguments.output
+    print(f"Exported {number_of_records} records to {destination}; the last rental ID is {last_rental_id}.",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,56 @@
+import argparse
+import sys
+
+from src.domain.persistence import WriteAheadLog, DurableBookRepository, DurableClientRepository, \
+    DurableRentalRepository
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.bulk_import import BulkImportService, read_records, DEFAULT_BATCH_SIZE
+
+DATA_DIRECTORY = "data"
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Import books, clients or rentals into the library data directory.")
+    parser.add_argument("kind", choices=["books", "clients", "rentals"], help="the kind of the imported records")
+    parser.add_argument("path", help="the CSV or JSONL file holding the records")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="the format of the file; taken from its extension by default")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="the number of records validated and added at once")
+    parser.add_argument("--data-directory", default=DATA_DIRECTORY, help="the directory of the library data")
+    return parser.parse_args(arguments)
+
+
+def print_progress(report):
+    print(f"\r{report.rows_read} rows read, {report.rows_imported} imported, {report.rows_rejected} rejected, "
+          f"{report.get_rows_per_second():.0f} rows/s", end="", flush=True)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    write_ahead_log = WriteAheadLog(arguments.data_directory, sync_every=arguments.batch_size,
+                                    snapshot_every=float("inf"))
+    book_repository = DurableBookRepository(write_ahead_log)
+    client_repository = DurableClientRepository(write_ahead_log)
+    rental_repository = DurableRentalRepository(write_ahead_log)
+    write_ahead_log.open()
+    import_service = BulkImportService(book_repository, client_repository, rental_repository,
+                                       BookValidator(), ClientValidator(), RentalValidator())
+    import_records = {"books": import_service.import_books, "clients": import_service.import_clients,
+                      "rentals": import_service.import_rentals}[arguments.kind]
+    try:
+        report = import_records(read_records(arguments.path, arguments.format), arguments.batch_size, print_progress)
+        write_ahead_log.snapshot()
+    finally:
+        write_ahead_log.close()
+    print()
+    print(f"Imported {report.rows_imported} of {report.rows_read} rows in {report.get_elapsed_seconds():.2f} s.")
+    for line_number, reason in report.bad_rows:
+        print(f"   Line {line_number}: {reason}")
+    if report.rows_rejected > len(report.bad_rows):
+        print(f"   ... and {report.rows_rejected - len(report.bad_rows)} more bad rows.")
+    return 0 if report.rows_rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,28 +1,78 @@
-from src.domain.repository import BookRepository, ClientRepository, RentalRepository
+import argparse
+
+from src.domain.persistence import WriteAheadLog, DurableBookRepository, DurableClientRepository, \
+    DurableRentalRepository
+from src.domain.statistics import RentalStatistics
 from src.errors.validators import BookValidator, ClientValidator, RentalValidator
-from src.services.service import BookService, ClientService, RentalService
+from src.services.instrumentation import ServiceInstrumentation
+from src.services.profiling import CommandProfiler, DEFAULT_PROFILE_DIRECTORY, DEFAULT_TOP_ALLOCATIONS
+from src.services.service import BookService, ClientService, RentalService, StatisticsService
 from src.services.tests import populate_book_repository, populate_client_repository, populate_rental_repository
+from src.services.undo import UndoService
 from src.ui.console import Console
 
-book_repository = BookRepository()
-client_repository = ClientRepository()
-rental_repository = RentalRepository()
+DATA_DIRECTORY = "data"
+
+parser = argparse.ArgumentParser(description="Run the library console.")
+parser.add_argument("--metrics", action="store_true",
+                    help="record the latencies of the service operations from the start; they can also be enabled from "
+                         "the console")
+parser.add_argument("--metrics-file", default=None,
+                    help="the file the metrics are written to on exit; in the Prometheus text format if its name ends "
+                         "with '.prom', otherwise in JSON")
+parser.add_argument("--profile", action="store_true",
+                    help="profile each menu command with cProfile from the start; profiling can also be toggled from "
+                         "the console")
+parser.add_argument("--profile-directory", default=DEFAULT_PROFILE_DIRECTORY,
+                    help="the directory the profiles of the commands are written to")
+parser.add_argument("--trace-memory", action="store_true",
+                    help="also report the top allocations of each profiled command, using tracemalloc")
+parser.add_argument("--top-allocations", type=int, default=DEFAULT_TOP_ALLOCATIONS,
+                    help="the number of allocations reported per profiled command")
+arguments = parser.parse_args()
+
+write_ahead_log = WriteAheadLog(DATA_DIRECTORY)
+book_repository = DurableBookRepository(write_ahead_log)
+client_repository = DurableClientRepository(write_ahead_log)
+rental_repository = DurableRentalRepository(write_ahead_log)
+write_ahead_log.open()
 
 book_validator = BookValidator()
 client_validator = ClientValidator()
 rental_validator = RentalValidator()
 
-book_service = BookService(book_repository, book_validator)
-client_service = ClientService(client_repository, client_validator)
-rental_service = RentalService(book_repository, client_service, rental_repository,
-                               book_validator, client_validator, rental_validator)
+rental_statistics = RentalStatistics()
+undo_service = UndoService()
+
+rental_service = RentalService(book_repository, client_repository, rental_repository,
+                               book_validator, client_validator, rental_validator, rental_statistics, undo_service)
+book_service = BookService(book_repository, book_validator, rental_statistics, undo_service, rental_service)
+client_service = ClientService(client_repository, client_validator, undo_service, rental_service)
+statistics_service = StatisticsService(rental_statistics)
+instrumentation = ServiceInstrumentation([book_service, client_service, rental_service, statistics_service])
 
-populate_book_repository(book_service)
-populate_client_repository(client_service)
-populate_rental_repository(rental_service)
+if len(book_repository.get_all_books()) == 0 and len(client_repository.get_all_clients()) == 0:
+    populate_book_repository(book_service)
+    populate_client_repository(client_service)
+    populate_rental_repository(rental_service)
+    undo_service.clear()
+else:
+    rental_service.rebuild_statistics()
 
-ui = Console(book_service, client_service, rental_service)
-ui.run_console()
+if arguments.metrics:
+    instrumentation.enable()
+profiler = CommandProfiler(arguments.profile_directory, arguments.trace_memory, arguments.top_allocations)
+ui = Console(book_service, client_service, rental_service, statistics_service, undo_service, instrumentation,
+             profiler)
+try:
+    ui.run_console(arguments.profile)
+finally:
+    write_ahead_log.close()
+    if arguments.metrics_file is not None:
+        if arguments.metrics_file.endswith(".prom"):
+            instrumentation.write_prometheus(arguments.metrics_file)
+        else:
+            instrumentation.write_json(arguments.metrics_file)
 
 """    gui = GUI(book_service, client_service, rental_service)
     gui.run()"""
@@ -0,0 +1,73 @@
+import argparse
+import sys
+
+from src.domain.persistence import WriteAheadLog, DurableBookRepository, DurableClientRepository, \
+    DurableRentalRepository
+from src.domain.statistics import RentalStatistics
+from src.errors.validators import BookValidator, ClientValidator, RentalValidator
+from src.services.locking import ReadWriteLock
+from src.services.service import BookService, ClientService, RentalService, StatisticsService
+from src.services.tests import populate_book_repository, populate_client_repository, populate_rental_repository
+from src.services.undo import UndoService
+from src.ui.http_api import LibraryHttpApi, LibraryHttpServer
+
+DATA_DIRECTORY = "data"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Serve the library as a JSON API over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="the address the server listens on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="the port the server listens on")
+    parser.add_argument("--data-directory", default=DATA_DIRECTORY, help="the directory of the library data")
+    parser.add_argument("--log-requests", action="store_true", help="print a line for each request answered")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    arguments = parse_arguments(arguments)
+    write_ahead_log = WriteAheadLog(arguments.data_directory)
+    book_repository = DurableBookRepository(write_ahead_log)
+    client_repository = DurableClientRepository(write_ahead_log)
+    rental_repository = DurableRentalRepository(write_ahead_log)
+    write_ahead_log.open()
+
+    book_validator = BookValidator()
+    client_validator = ClientValidator()
+    rental_validator = RentalValidator()
+
+    lock = ReadWriteLock()
+    rental_statistics = RentalStatistics()
+    undo_service = UndoService(lock=lock)
+
+    rental_service = RentalService(book_repository, client_repository, rental_repository, book_validator,
+                                   client_validator, rental_validator, rental_statistics, undo_service, lock)
+    book_service = BookService(book_repository, book_validator, rental_statistics, undo_service, rental_service, lock)
+    client_service = ClientService(client_repository, client_validator, undo_service, rental_service, lock)
+    statistics_service = StatisticsService(rental_statistics, lock)
+
+    if len(book_repository.get_all_books()) == 0 and len(client_repository.get_all_clients()) == 0:
+        populate_book_repository(book_service)
+        populate_client_repository(client_service)
+        populate_rental_repository(rental_service)
+        undo_service.clear()
+    else:
+        rental_service.rebuild_statistics()
+
+    api = LibraryHttpApi(book_service, client_service, rental_service, statistics_service, lock, undo_service)
+    server = LibraryHttpServer((arguments.host, arguments.port), api, arguments.log_requests)
+    print(f"Serving the library on http://{arguments.host}:{server.server_address[1]}/ (Ctrl+C to stop).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with lock.writing():
+            write_ahead_log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
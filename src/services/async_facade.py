@@ -0,0 +1,249 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from src.services.bulk_import import ImportReport, read_records, split_in_batches
+
+DEFAULT_IMPORT_BATCH_SIZE = 1_000
+DEFAULT_EXECUTOR_WORKERS = 4
+
+
+class AsyncLibraryService(object):
+    """
+    Asyncio façade over the book, client, rental and statistics services, letting many front-desk clients share a
+    single library from one event loop.
+
+    The changes are serialized through a single writer task, which takes them from a queue in the order they were
+    requested and applies all the queued ones at once, so no change ever sees another one half applied. Short reads
+    (exact lookups, availability checks) run right away on the event loop, between the changes. Slow operations
+    (substring searches, statistics, pages of the full listings and the parsing of bulk imports) run in a thread pool
+    executor, so they never hold the event loop and the short requests of the other clients go on meanwhile.
+
+    Since the services are not thread-safe, the writer task waits for the slow reads already running in the executor
+    before applying changes, and slow reads do not start while changes are waiting, so a change is delayed by at most
+    the slow reads in progress when it was requested. Bulk imports are applied a batch at a time, as queued changes, so
+    rents and returns requested during an import are applied between its batches.
+    """
+
+    def __init__(self, book_service, client_service, rental_service, statistics_service, bulk_import_service=None,
+                 undo_service=None, executor=None):
+        self._book_service = book_service
+        self._client_service = client_service
+        self._rental_service = rental_service
+        self._statistics_service = statistics_service
+        self._bulk_import_service = bulk_import_service
+        self._undo_service = undo_service
+        self.__executor = executor
+        self.__owns_executor = executor is None
+        self.__write_queue = None
+        self.__writer_task = None
+        self.__gate = None
+        self.__running_reads = 0
+        self.__writer_waiting = False
+
+    async def start(self):
+        """
+        Function to start the writer task (and the executor, unless one was given) on the running event loop.
+        """
+        if self.__owns_executor:
+            self.__executor = ThreadPoolExecutor(DEFAULT_EXECUTOR_WORKERS, thread_name_prefix="library-read")
+        self.__write_queue = asyncio.Queue()
+        self.__gate = asyncio.Condition()
+        self.__writer_task = asyncio.create_task(self.__run_writer())
+
+    async def stop(self):
+        """
+        Function to apply the changes still queued, then to stop the writer task (and the executor, unless one was
+        given).
+        """
+        await self.__write_queue.put(None)
+        await self.__writer_task
+        if self.__owns_executor:
+            self.__executor.shutdown()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exception_type, exception, traceback):
+        await self.stop()
+
+    async def add_book(self, title, author):
+        return await self.__write(self._book_service.add_book, title, author)
+
+    async def update_book(self, old_title, old_author, new_title, new_author):
+        return await self.__write(self._book_service.update_book, old_title, old_author, new_title, new_author)
+
+    async def remove_book_by_title_and_author(self, title, author):
+        return await self.__write(self._book_service.remove_book_by_title_and_author, title, author)
+
+    async def add_client(self, name):
+        return await self.__write(self._client_service.add_client, name)
+
+    async def update_client_by_name(self, old_name, new_name):
+        return await self.__write(self._client_service.update_client_by_name, old_name, new_name)
+
+    async def remove_client_by_name(self, name):
+        return await self.__write(self._client_service.remove_client_by_name, name)
+
+    async def add_rental(self, book_id, client_id):
+        return await self.__write(self._rental_service.add_rental, book_id, client_id)
+
+    async def return_rental_by_id(self, rental_id):
+        return await self.__write(self._rental_service.return_rental_by_id, rental_id)
+
+    async def return_rental_by_book_id(self, book_id):
+        return await self.__write(self._rental_service.return_rental_by_book_id, book_id)
+
+    async def undo(self):
+        return await self.__write(self._undo_service.undo)
+
+    async def redo(self):
+        return await self.__write(self._undo_service.redo)
+
+    async def find_book_by_title_and_author(self, title, author):
+        return self._book_service.find_book_by_title_and_author(title, author)[1]
+
+    async def get_book_by_book_id(self, book_id):
+        return self._book_service.get_book_by_book_id(book_id)
+
+    async def find_client_by_name(self, name):
+        return self._client_service.find_client_by_name(name)[1]
+
+    async def is_book_available_by_book_id(self, book_id):
+        return self._rental_service.is_book_available_by_book_id(book_id)
+
+    async def get_book_rental_status(self, book_id):
+        return self._rental_service.get_book_rental_status(book_id)
+
+    async def get_client_active_rentals(self, client_id):
+        return self._rental_service.get_client_active_rentals(client_id)
+
+    async def find_all_books_matching_id(self, book_id):
+        return await self.__read_in_executor(self._book_service.find_all_books_matching_id, book_id)
+
+    async def find_all_books_matching_title(self, title):
+        return await self.__read_in_executor(self._book_service.find_all_books_matching_title, title)
+
+    async def find_all_books_matching_author(self, author):
+        return await self.__read_in_executor(self._book_service.find_all_books_matching_author, author)
+
+    async def find_all_clients_matching_id(self, client_id):
+        return await self.__read_in_executor(self._client_service.find_all_clients_matching_id, client_id)
+
+    async def find_all_clients_matching_name(self, name):
+        return await self.__read_in_executor(self._client_service.find_all_clients_matching_name, name)
+
+    async def get_most_rented_books(self, limit=None, offset=0):
+        return await self.__read_in_executor(self._statistics_service.get_most_rented_books, limit, offset)
+
+    async def get_most_active_clients(self, limit=None, offset=0):
+        return await self.__read_in_executor(self._statistics_service.get_most_active_clients, limit, offset)
+
+    async def get_most_rented_authors(self, limit=None, offset=0):
+        return await self.__read_in_executor(self._statistics_service.get_most_rented_authors, limit, offset)
+
+    async def list_books(self, offset=0, limit=None):
+        """
+        Function to return a page of the books, in increasing order of their IDs.
+        :param offset: integer, the number of books to be skipped.
+        :param limit: integer, the maximum number of books to be returned; if None, all the remaining books are
+        returned.
+        :return: list, containing the 'book' objects of the page.
+        """
+        books, _ = await self.__read_in_executor(self._book_service.get_books_page, offset, limit)
+        return books
+
+    async def list_clients(self, offset=0, limit=None):
+        """
+        Function to return a page of the clients, in increasing order of their IDs.
+        :param offset: integer, the number of clients to be skipped.
+        :param limit: integer, the maximum number of clients to be returned; if None, all the remaining clients are
+        returned.
+        :return: list, containing the 'client' objects of the page.
+        """
+        clients, _ = await self.__read_in_executor(self._client_service.get_clients_page, offset, limit)
+        return clients
+
+    async def list_rentals(self, offset=0, limit=None):
+        """
+        Function to return a page of the rentals, in the order they were made.
+        :param offset: integer, the number of rentals to be skipped.
+        :param limit: integer, the maximum number of rentals to be returned; if None, all the remaining rentals are
+        returned.
+        :return: list, containing the 'rental' objects of the page.
+        """
+        rentals, _ = await self.__read_in_executor(self._rental_service.get_rentals_page, offset, limit)
+        return rentals
+
+    async def import_books(self, path, file_format=None, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+        return await self.__import(self._bulk_import_service.import_books, path, file_format, batch_size)
+
+    async def import_clients(self, path, file_format=None, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+        return await self.__import(self._bulk_import_service.import_clients, path, file_format, batch_size)
+
+    async def import_rentals(self, path, file_format=None, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+        return await self.__import(self._bulk_import_service.import_rentals, path, file_format, batch_size)
+
+    async def __import(self, import_records, path, file_format, batch_size):
+        """
+        Function to import a file a batch at a time: each batch of records is read in the executor, then validated and
+        added by the writer task, as a single change, which also forgets the steps of the undo service, since the
+        imports are not recorded by it.
+        :return: the 'ImportReport' of the whole import.
+        """
+        report = ImportReport()
+        batches = split_in_batches(read_records(path, file_format), batch_size)
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await loop.run_in_executor(self.__executor, next, batches, None)
+            if batch is None:
+                return report
+            report.add(await self.__write(self.__import_batch, import_records, batch))
+
+    def __import_batch(self, import_records, batch):
+        report = import_records(batch, len(batch))
+        if self._undo_service is not None and report.rows_imported > 0:
+            self._undo_service.clear()
+        return report
+
+    async def __write(self, function, *arguments):
+        future = asyncio.get_running_loop().create_future()
+        await self.__write_queue.put((function, arguments, future))
+        return await future
+
+    async def __read_in_executor(self, function, *arguments):
+        async with self.__gate:
+            await self.__gate.wait_for(lambda: not self.__writer_waiting)
+            self.__running_reads += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.__executor, partial(function, *arguments))
+        finally:
+            async with self.__gate:
+                self.__running_reads -= 1
+                self.__gate.notify_all()
+
+    async def __run_writer(self):
+        while True:
+            jobs = [await self.__write_queue.get()]
+            while not self.__write_queue.empty():
+                jobs.append(self.__write_queue.get_nowait())
+            async with self.__gate:
+                self.__writer_waiting = True
+                await self.__gate.wait_for(lambda: self.__running_reads == 0)
+                for job in jobs:
+                    if job is not None:
+                        self.__apply(*job)
+                self.__writer_waiting = False
+                self.__gate.notify_all()
+            if None in jobs:
+                return
+
+    @staticmethod
+    def __apply(function, arguments, future):
+        if future.cancelled():
+            return
+        try:
+            future.set_result(function(*arguments))
+        except Exception as error:
+            future.set_exception(error)
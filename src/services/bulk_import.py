@@ -0,0 +1,278 @@
+import csv
+import json
+import time
+from datetime import date
+from itertools import islice
+
+from src.domain.entity import Book, Client, Rental
+from src.errors.exceptions import ValidError, RepoError
+
+DEFAULT_BATCH_SIZE = 10_000
+MAXIMUM_REPORTED_BAD_ROWS = 1000
+
+
+def read_records(path, file_format=None):
+    """
+    Function to stream the records of a CSV (with a header row) or JSONL file, one at a time. The format is taken from
+    the extension of the file unless it is given. JSONL lines are decoded only when their record is validated, so that
+    a malformed line is reported as a bad row instead of stopping the import.
+    :param path: string, the path of the file.
+    :param file_format: string, "csv" or "jsonl"; None to take it from the extension of the file.
+    :return: generator, yielding (line number, record) tuples, where the record is a dictionary for CSV files and the
+    text of the line for JSONL files.
+    """
+    if file_format is None:
+        file_format = "jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv"
+    with open(path, "r", encoding="utf-8", newline="") as records_file:
+        if file_format == "csv":
+            reader = csv.DictReader(records_file)
+            for record in reader:
+                yield reader.line_num, record
+        elif file_format == "jsonl":
+            for line_number, line in enumerate(records_file, start=1):
+                if line.strip() != "":
+                    yield line_number, line
+        else:
+            raise ValueError(f"Unknown file format {file_format}.")
+
+
+def split_in_batches(items, batch_size):
+    """
+    Function to split a stream of items into lists of at most the given size, without reading the stream ahead.
+    :param items: iterable, the items to be split.
+    :param batch_size: integer, the maximum number of items of a batch.
+    :return: generator, yielding the batches as lists.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+class ImportReport(object):
+    """
+    Progress of a bulk import: the number of rows read, imported and rejected, the first bad rows with the reason they
+    were rejected, and the time elapsed since the import started.
+    """
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rows_rejected = 0
+        self.bad_rows = []
+        self.__start = time.perf_counter()
+
+    def reject(self, line_number, reason):
+        """
+        Function to count a rejected row, keeping its line number and reason while fewer than
+        'MAXIMUM_REPORTED_BAD_ROWS' bad rows are kept.
+        :param line_number: integer, the line of the row in the file.
+        :param reason: string, the reason the row was rejected.
+        """
+        self.rows_rejected += 1
+        if len(self.bad_rows) < MAXIMUM_REPORTED_BAD_ROWS:
+            self.bad_rows.append((line_number, reason))
+
+    def add(self, report):
+        """
+        Function to add the counts and the bad rows of another report, e.g. of a batch imported on its own, to this
+        report.
+        :param report: object, the 'ImportReport' to be added.
+        """
+        self.rows_read += report.rows_read
+        self.rows_imported += report.rows_imported
+        self.rows_rejected += report.rows_rejected
+        self.bad_rows.extend(report.bad_rows[:MAXIMUM_REPORTED_BAD_ROWS - len(self.bad_rows)])
+
+    def get_elapsed_seconds(self):
+        """
+        Function to return the time elapsed since the import started.
+        :return: float, the elapsed time, in seconds.
+        """
+        return time.perf_counter() - self.__start
+
+    def get_rows_per_second(self):
+        """
+        Function to return the number of rows read per second since the import started.
+        :return: float, the throughput of the import.
+        """
+        elapsed_seconds = self.get_elapsed_seconds()
+        if elapsed_seconds == 0:
+            return 0.0
+        return self.rows_read / elapsed_seconds
+
+
+class BulkImportService(object):
+    """
+    Service importing books, clients and rentals from streams of records, bypassing the one-at-a-time path of the other
+    services. The records are validated a batch at a time, the bad rows are reported without stopping the import and
+    the valid ones are added to the repositories with their bulk functions, so the search indexes are updated once per
+    batch. Imports are not recorded by the undo service, whose steps are forgotten instead: a step recorded before
+    an import would otherwise be undone against the imported entities (e.g. removing the last rental, an imported one).
+    """
+
+    def __init__(self, book_repository, client_repository, rental_repository,
+                 book_validator, client_validator, rental_validator, rental_statistics=None, undo_service=None):
+        self._book_repository = book_repository
+        self._client_repository = client_repository
+        self._rental_repository = rental_repository
+        self._book_validator = book_validator
+        self._client_validator = client_validator
+        self._rental_validator = rental_validator
+        self._rental_statistics = rental_statistics
+        self._undo_service = undo_service
+
+    def import_books(self, records, batch_size=DEFAULT_BATCH_SIZE, on_progress=None):
+        """
+        Function to import books from records having the "title" and "author" fields. The books get the next IDs of
+        the book repository, in the order of the records.
+        :param records: iterable, containing (line number, record) tuples, as streamed by 'read_records'.
+        :param batch_size: integer, the number of records validated and added at once.
+        :param on_progress: function, called with the 'ImportReport' after each batch; None to call nothing.
+        :return: the 'ImportReport' of the import.
+        """
+        return self.__import(records, batch_size, on_progress, self.__make_books, self._book_repository.add_books)
+
+    def import_clients(self, records, batch_size=DEFAULT_BATCH_SIZE, on_progress=None):
+        """
+        Function to import clients from records having the "name" field. The clients get the next IDs of the client
+        repository, in the order of the records.
+        :param records: iterable, containing (line number, record) tuples, as streamed by 'read_records'.
+        :param batch_size: integer, the number of records validated and added at once.
+        :param on_progress: function, called with the 'ImportReport' after each batch; None to call nothing.
+        :return: the 'ImportReport' of the import.
+        """
+        return self.__import(records, batch_size, on_progress, self.__make_clients,
+                             self._client_repository.add_clients)
+
+    def import_rentals(self, records, batch_size=DEFAULT_BATCH_SIZE, on_progress=None):
+        """
+        Function to import rentals from records having the "book_id", "client_id" and "rented_date" fields, and an
+        optional "returned_date" field, with the dates in the YYYY-MM-DD format. The book and the client must exist and
+        a book cannot be rented again before its rental is returned. The rentals get the next IDs of the rental
+        repository, in the order of the records.
+        :param records: iterable, containing (line number, record) tuples, as streamed by 'read_records'.
+        :param batch_size: integer, the number of records validated and added at once.
+        :param on_progress: function, called with the 'ImportReport' after each batch; None to call nothing.
+        :return: the 'ImportReport' of the import.
+        """
+        return self.__import(records, batch_size, on_progress, self.__make_rentals, self.__add_rentals)
+
+    def __import(self, records, batch_size, on_progress, make_entities, add_entities):
+        report = ImportReport()
+        for batch in split_in_batches(records, batch_size):
+            report.rows_read += len(batch)
+            entities = make_entities(batch, report)
+            add_entities(entities)
+            if self._undo_service is not None and len(entities) > 0:
+                self._undo_service.clear()
+            report.rows_imported += len(entities)
+            if on_progress is not None:
+                on_progress(report)
+        return report
+
+    def __make_books(self, batch, report):
+        books = []
+        for line_number, record in batch:
+            try:
+                record = self.__decode(record)
+                book = Book(0, self.__get_text(record, "title"), self.__get_text(record, "author"))
+                self._book_validator.validate_book(book)
+            except (ValidError, KeyError, ValueError, TypeError) as error:
+                report.reject(line_number, self.__describe(error))
+                continue
+            book.id = self._book_repository.get_next_book_id()
+            books.append(book)
+        return books
+
+    def __make_clients(self, batch, report):
+        clients = []
+        for line_number, record in batch:
+            try:
+                record = self.__decode(record)
+                client = Client(0, self.__get_text(record, "name"))
+                self._client_validator.validate_client(client)
+            except (ValidError, KeyError, ValueError, TypeError) as error:
+                report.reject(line_number, self.__describe(error))
+                continue
+            client.id = self._client_repository.get_next_client_id()
+            clients.append(client)
+        return clients
+
+    def __make_rentals(self, batch, report):
+        rentals = []
+        rented_book_ids = set()
+        for line_number, record in batch:
+            try:
+                record = self.__decode(record)
+                rental = self.__make_rental(record)
+                if rental.returned_date is None and (rental.book_id in rented_book_ids or
+                                                     self._rental_repository.get_active_rental_by_book_id(
+                                                         rental.book_id) is not None):
+                    raise RepoError("Book is currently rented. ")
+            except (ValidError, RepoError, KeyError, ValueError, TypeError) as error:
+                report.reject(line_number, self.__describe(error))
+                continue
+            if rental.returned_date is None:
+                rented_book_ids.add(rental.book_id)
+            rental.id = self._rental_repository.get_next_rental_id()
+            rentals.append(rental)
+        return rentals
+
+    def __make_rental(self, record):
+        self._rental_validator.validate_book_and_client_ids(record["book_id"], record["client_id"])
+        book_id = int(record["book_id"])
+        client_id = int(record["client_id"])
+        rented_date = self.__get_date(record, "rented_date")
+        returned_date = None
+        if record.get("returned_date") not in (None, ""):
+            returned_date = self.__get_date(record, "returned_date")
+        rental = Rental(0, book_id, client_id, rented_date, returned_date)
+        self._rental_validator.validate_rental(rental)
+        if not self._book_repository.contains_id(book_id):
+            raise RepoError("Book ID not found. ")
+        if not self._client_repository.contains_id(client_id):
+            raise RepoError("Client ID not found. ")
+        if returned_date is not None and returned_date < rented_date:
+            raise ValidError("Returned date must not be before the rented date. ")
+        return rental
+
+    def __add_rentals(self, rentals):
+        self._rental_repository.add_rentals(rentals)
+        if self._rental_statistics is None:
+            return
+        for rental in rentals:
+            book = self._book_repository.get_by_id(rental.book_id)
+            self._rental_statistics.record_rental(rental.book_id, book.author, rental.client_id, rental.rented_date)
+            if rental.returned_date is not None:
+                self._rental_statistics.record_return(rental.client_id, rental.rented_date, rental.returned_date)
+
+    @staticmethod
+    def __decode(record):
+        if isinstance(record, str):
+            record = json.loads(record)
+        if not isinstance(record, dict):
+            raise ValidError("Record must be an object. ")
+        return record
+
+    @staticmethod
+    def __get_text(record, field):
+        text = record.get(field)
+        if text is None:
+            raise KeyError(field)
+        return str(text)
+
+    @staticmethod
+    def __get_date(record, field):
+        try:
+            return date.fromisoformat(BulkImportService.__get_text(record, field))
+        except ValueError:
+            raise ValidError(f"{field.replace('_', ' ').capitalize()} must have a valid YYYY-MM-DD format. ")
+
+    @staticmethod
+    def __describe(error):
+        if isinstance(error, KeyError):
+            return f"Missing field {error}. "
+        return str(error)
@@ -0,0 +1,131 @@
+import csv
+import json
+from bisect import bisect_right
+
+BOOK_FIELDS = ("id", "title", "author")
+CLIENT_FIELDS = ("id", "name")
+RENTAL_FIELDS = ("id", "book_id", "client_id", "rented_date", "returned_date")
+STATISTICS_FIELDS = {
+    "most-rented-books": ("rank", "book_id", "rentals"),
+    "most-active-clients": ("rank", "client_id", "rental_days"),
+    "most-rented-authors": ("rank", "author", "rentals"),
+}
+
+
+def write_csv(records, stream, fields):
+    """
+    Function to write records to a CSV stream, with a header row, as they are produced.
+    :param records: iterable, containing the records as dictionaries.
+    :param stream: object, the text stream to write to (e.g. an opened file or 'sys.stdout').
+    :param fields: tuple, containing the names of the fields, in the order of the columns.
+    :return: integer, the number of records written.
+    """
+    writer = csv.DictWriter(stream, fields, lineterminator="\n")
+    writer.writeheader()
+    number_of_records = 0
+    for record in records:
+        writer.writerow(record)
+        number_of_records += 1
+    return number_of_records
+
+
+def write_jsonl(records, stream, fields=None):
+    """
+    Function to write records to a JSONL stream, one JSON object per line, as they are produced.
+    :param records: iterable, containing the records as dictionaries.
+    :param stream: object, the text stream to write to (e.g. an opened file or 'sys.stdout').
+    :param fields: tuple, unused; kept so that both writers can be called the same way.
+    :return: integer, the number of records written.
+    """
+    number_of_records = 0
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        stream.write("\n")
+        number_of_records += 1
+    return number_of_records
+
+
+class ExportService(object):
+    """
+    Service turning the repositories and the statistics into streams of records, ready to be written by 'write_csv' or
+    'write_jsonl'. The records are produced one at a time while going over the read-only views of the repositories,
+    so an export never copies a repository.
+    """
+
+    def __init__(self, book_repository, client_repository, rental_repository, statistics_service):
+        self._book_repository = book_repository
+        self._client_repository = client_repository
+        self._rental_repository = rental_repository
+        self._statistics_service = statistics_service
+
+    def export_books(self):
+        """
+        Function to stream all the books, in increasing order of their IDs.
+        :return: generator, yielding the books as dictionaries having the 'BOOK_FIELDS' keys.
+        """
+        for book in self._book_repository.get_all_books():
+            yield {"id": book.id, "title": book.title, "author": book.author}
+
+    def export_clients(self):
+        """
+        Function to stream all the clients, in increasing order of their IDs.
+        :return: generator, yielding the clients as dictionaries having the 'CLIENT_FIELDS' keys.
+        """
+        for client in self._client_repository.get_all_clients():
+            yield {"id": client.id, "name": client.name}
+
+    def export_rentals(self, since_rental_id=None, since_date=None):
+        """
+        Function to stream the rental history, in the order the rentals were made. When a rental ID or a date is given,
+        only the rentals changed since then are streamed: the rentals made after the given rental, and the rentals
+        made or returned on the given date or later. Passing both exports the rentals matching either, so a nightly
+        job giving the last exported rental ID and the date of its previous run gets both the new rentals and the
+        returns of the older ones.
+        Since the rentals are kept in increasing order of their IDs, an export given only a rental ID starts right
+        after that rental, found with a binary search, instead of going over the whole history. Returns can change
+        rentals of any age, so an export given a date still goes over the whole history.
+        :param since_rental_id: integer, the ID of the last rental already exported; None to ignore it.
+        :param since_date: date, the first date of the changes to be exported; None to ignore it.
+        :return: generator, yielding the rentals as dictionaries having the 'RENTAL_FIELDS' keys.
+        """
+        export_all = since_rental_id is None and since_date is None
+        rentals = self._rental_repository.get_all_rentals()
+        start = 0
+        if since_rental_id is not None and since_date is None:
+            start = bisect_right(rentals, since_rental_id, key=self.__get_rental_id)
+            export_all = True
+        for index in range(start, len(rentals)):
+            rental = rentals[index]
+            if not export_all and not self.__is_changed(rental, since_rental_id, since_date):
+                continue
+            yield {"id": rental.id, "book_id": rental.book_id, "client_id": rental.client_id,
+                   "rented_date": rental.rented_date.isoformat(),
+                   "returned_date": None if rental.returned_date is None else rental.returned_date.isoformat()}
+
+    def export_statistics(self, leaderboard, limit=None):
+        """
+        Function to stream a statistics leaderboard, in decreasing order.
+        :param leaderboard: string, one of the 'STATISTICS_FIELDS' keys.
+        :param limit: integer, the number of entries to be streamed; if None, all the entries are streamed.
+        :return: generator, yielding the entries as dictionaries having the keys given by 'STATISTICS_FIELDS'.
+        """
+        get_leaderboard = {"most-rented-books": self._statistics_service.get_most_rented_books,
+                           "most-active-clients": self._statistics_service.get_most_active_clients,
+                           "most-rented-authors": self._statistics_service.get_most_rented_authors}[leaderboard]
+        _, key_field, value_field = STATISTICS_FIELDS[leaderboard]
+        for rank, (key, value) in enumerate(get_leaderboard(limit), start=1):
+            yield {"rank": rank, key_field: key, value_field: value}
+
+    @staticmethod
+    def __get_rental_id(rental):
+        return rental.id
+
+    @staticmethod
+    def __is_changed(rental, since_rental_id, since_date):
+        if since_rental_id is not None and rental.id > since_rental_id:
+            return True
+        if since_date is None:
+            return False
+        if rental.rented_date >= since_date:
+            return True
+        return rental.returned_date is not None and rental.returned_date >= since_date
@@ -0,0 +1,219 @@
+import json
+import os
+import time
+from functools import wraps
+
+SUB_BUCKET_BITS = 3
+PROMETHEUS_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                      0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_METRIC = "library_operation_duration_seconds"
+
+
+class LatencyHistogram(object):
+    """
+    Histogram of the latencies of an operation, in nanoseconds, with log-linear buckets: each power of two is split
+    into 2 ** 'SUB_BUCKET_BITS' buckets of equal width, so a percentile read from the buckets is at most about 12% above
+    the exact one, whatever the latency. Recording a latency costs a few integer operations and a dictionary update,
+    and the memory used only grows with the number of distinct buckets reached, never with the number of calls.
+    """
+
+    def __init__(self):
+        self.__counts = {}
+        self.count = 0
+        self.errors = 0
+        self.total = 0
+        self.maximum = 0
+
+    def clear(self):
+        """
+        Function to forget all the recorded latencies and errors.
+        """
+        self.__counts = {}
+        self.count = 0
+        self.errors = 0
+        self.total = 0
+        self.maximum = 0
+
+    def record(self, latency):
+        """
+        Function to add a latency to the histogram.
+        :param latency: integer, the latency, in nanoseconds.
+        """
+        bits = latency.bit_length()
+        if bits <= SUB_BUCKET_BITS:
+            bucket = latency
+        else:
+            bucket = ((bits - SUB_BUCKET_BITS - 1) << SUB_BUCKET_BITS) + (latency >> (bits - SUB_BUCKET_BITS - 1))
+        self.__counts[bucket] = self.__counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += latency
+        if latency > self.maximum:
+            self.maximum = latency
+
+    def get_percentile(self, percentile):
+        """
+        Function to return the given percentile of the recorded latencies, as the upper bound of the bucket holding it.
+        :param percentile: float, the percentile, between 0 and 100.
+        :return: integer, the latency, in nanoseconds; 0 if no latency was recorded.
+        """
+        if self.count == 0:
+            return 0
+        rank = max(self.count * percentile / 100, 1)
+        seen = 0
+        for bucket in sorted(self.__counts):
+            seen += self.__counts[bucket]
+            if seen >= rank:
+                return min(self.__get_upper_bound(bucket), self.maximum)
+        return self.maximum
+
+    def get_cumulative_counts(self, upper_bounds):
+        """
+        Function to return, for each of the given latencies, the number of recorded latencies whose bucket lies
+        entirely at or below it, as the cumulative buckets of a Prometheus histogram.
+        :param upper_bounds: list, containing the latencies, in nanoseconds, in increasing order.
+        :return: list, containing the counts, in the order of the latencies.
+        """
+        cumulative_counts = []
+        buckets = sorted(self.__counts)
+        position = 0
+        seen = 0
+        for upper_bound in upper_bounds:
+            while position < len(buckets) and self.__get_upper_bound(buckets[position]) <= upper_bound:
+                seen += self.__counts[buckets[position]]
+                position += 1
+            cumulative_counts.append(seen)
+        return cumulative_counts
+
+    @staticmethod
+    def __get_upper_bound(bucket):
+        if bucket < 2 << SUB_BUCKET_BITS:
+            return bucket
+        shift = (bucket >> SUB_BUCKET_BITS) - 1
+        mantissa = (bucket & ((1 << SUB_BUCKET_BITS) - 1)) + (1 << SUB_BUCKET_BITS)
+        return ((mantissa + 1) << shift) - 1
+
+
+class ServiceInstrumentation(object):
+    """
+    Opt-in instrumentation of the public functions of the given services (e.g. 'BookService', 'ClientService' and
+    'RentalService'). While it is enabled, each public function of a service is shadowed, on the service object only,
+    by a wrapper counting its calls and errors and recording its latency in a 'LatencyHistogram'. Disabling it removes
+    the wrappers, so a disabled instrumentation costs nothing on the calls. Calls made by a service to another service
+    (or to itself) through their public functions are recorded as well, nested in the latency of the outer call.
+    """
+
+    def __init__(self, services):
+        self.__services = list(services)
+        self.__histograms = {}
+        self.__wrapped_functions = []
+
+    def enable(self):
+        """
+        Function to start recording the calls of the public functions of the services. Enabling an enabled
+        instrumentation has no effect.
+        """
+        if self.is_enabled():
+            return
+        for service in self.__services:
+            service_name = type(service).__name__
+            for function_name in dir(type(service)):
+                if function_name.startswith("_") or not callable(getattr(type(service), function_name)):
+                    continue
+                operation = f"{service_name}.{function_name}"
+                histogram = self.__histograms.setdefault(operation, LatencyHistogram())
+                setattr(service, function_name, self.__wrap(getattr(service, function_name), histogram))
+                self.__wrapped_functions.append((service, function_name))
+
+    def disable(self):
+        """
+        Function to stop recording the calls, removing the wrappers. The recorded data is kept.
+        """
+        for service, function_name in self.__wrapped_functions:
+            delattr(service, function_name)
+        self.__wrapped_functions = []
+
+    def is_enabled(self):
+        return len(self.__wrapped_functions) > 0
+
+    def reset(self):
+        """
+        Function to forget all the recorded data.
+        """
+        for histogram in self.__histograms.values():
+            histogram.clear()
+
+    def get_report(self):
+        """
+        Function to return the recorded data of the operations called at least once, slowest (by 99th percentile)
+        first.
+        :return: list, containing a dictionary per operation, holding its name, the number of calls and errors, and
+        the mean, 50th, 95th and 99th percentile and maximum latencies, in microseconds.
+        """
+        report = []
+        for operation, histogram in self.__histograms.items():
+            if histogram.count == 0:
+                continue
+            report.append({"operation": operation, "calls": histogram.count, "errors": histogram.errors,
+                           "mean_us": histogram.total / histogram.count / 1000,
+                           "p50_us": histogram.get_percentile(50) / 1000,
+                           "p95_us": histogram.get_percentile(95) / 1000,
+                           "p99_us": histogram.get_percentile(99) / 1000,
+                           "max_us": histogram.maximum / 1000})
+        report.sort(key=lambda entry: entry["p99_us"], reverse=True)
+        return report
+
+    def write_json(self, path):
+        """
+        Function to write the report to a JSON file, replacing the file at once so that readers never see it half
+        written.
+        :param path: string, the path of the file.
+        """
+        self.__write_atomically(path, json.dumps({"enabled": self.is_enabled(), "operations": self.get_report()},
+                                                 indent=2))
+
+    def write_prometheus(self, path):
+        """
+        Function to write the recorded data to a file in the Prometheus text exposition format (e.g. for the textfile
+        collector of the node exporter), as a histogram of the latencies in seconds and a counter of the errors, both
+        labelled by operation. The file is replaced at once.
+        :param path: string, the path of the file.
+        """
+        upper_bounds = [round(seconds * 1_000_000_000) for seconds in PROMETHEUS_BUCKETS]
+        lines = [f"# HELP {PROMETHEUS_METRIC} Latency of the library service operations.",
+                 f"# TYPE {PROMETHEUS_METRIC} histogram"]
+        for operation, histogram in sorted(self.__histograms.items()):
+            label = f'operation="{operation}"'
+            for seconds, count in zip(PROMETHEUS_BUCKETS, histogram.get_cumulative_counts(upper_bounds)):
+                lines.append(f'{PROMETHEUS_METRIC}_bucket{{{label},le="{seconds}"}} {count}')
+            lines.append(f'{PROMETHEUS_METRIC}_bucket{{{label},le="+Inf"}} {histogram.count}')
+            lines.append(f"{PROMETHEUS_METRIC}_sum{{{label}}} {histogram.total / 1_000_000_000}")
+            lines.append(f"{PROMETHEUS_METRIC}_count{{{label}}} {histogram.count}")
+        lines.append("# HELP library_operation_errors_total Calls of the library service operations raising an error.")
+        lines.append("# TYPE library_operation_errors_total counter")
+        for operation, histogram in sorted(self.__histograms.items()):
+            lines.append(f'library_operation_errors_total{{operation="{operation}"}} {histogram.errors}')
+        self.__write_atomically(path, "\n".join(lines) + "\n")
+
+    @staticmethod
+    def __wrap(function, histogram):
+        perf_counter_ns = time.perf_counter_ns
+
+        @wraps(function)
+        def timed_function(*arguments, **keyword_arguments):
+            start = perf_counter_ns()
+            try:
+                return function(*arguments, **keyword_arguments)
+            except Exception:
+                histogram.errors += 1
+                raise
+            finally:
+                histogram.record(perf_counter_ns() - start)
+
+        return timed_function
+
+    @staticmethod
+    def __write_atomically(path, text):
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as output_file:
+            output_file.write(text)
+        os.replace(temporary_path, path)
@@ -0,0 +1,131 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+
+class ReadWriteLock(object):
+    """
+    Lock letting any number of threads read at the same time, or a single thread write. Writers are preferred: once a
+    writer waits, new readers wait behind it, so a steady flow of reads cannot starve the changes.
+    The lock is reentrant for the thread holding it, since the services call each other (e.g. removing a book returns
+    its rental): a writer may write or read again, and a reader may read again. A reader may not start writing, as two
+    readers doing so would wait for each other forever.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__number_of_readers = 0
+        self.__number_of_waiting_writers = 0
+        self.__writer = None
+        self.__write_depth = 0
+        self.__local = threading.local()
+
+    def acquire_read(self):
+        """
+        Function to wait until no thread writes or waits to write, then to start reading.
+        """
+        if self.__writer == threading.get_ident():
+            self.__write_depth += 1
+            return
+        read_depth = getattr(self.__local, "read_depth", 0)
+        if read_depth == 0:
+            with self.__condition:
+                while self.__writer is not None or self.__number_of_waiting_writers > 0:
+                    self.__condition.wait()
+                self.__number_of_readers += 1
+        self.__local.read_depth = read_depth + 1
+
+    def release_read(self):
+        """
+        Function to stop reading.
+        """
+        if self.__writer == threading.get_ident():
+            self.__write_depth -= 1
+            return
+        self.__local.read_depth -= 1
+        if self.__local.read_depth == 0:
+            with self.__condition:
+                self.__number_of_readers -= 1
+                if self.__number_of_readers == 0:
+                    self.__condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Function to wait until no other thread reads or writes, then to start writing.
+        """
+        if self.__writer == threading.get_ident():
+            self.__write_depth += 1
+            return
+        if getattr(self.__local, "read_depth", 0) > 0:
+            raise RuntimeError("A thread reading cannot start writing.")
+        with self.__condition:
+            self.__number_of_waiting_writers += 1
+            while self.__writer is not None or self.__number_of_readers > 0:
+                self.__condition.wait()
+            self.__number_of_waiting_writers -= 1
+            self.__writer = threading.get_ident()
+            self.__write_depth = 1
+
+    def release_write(self):
+        """
+        Function to stop writing.
+        """
+        self.__write_depth -= 1
+        if self.__write_depth == 0:
+            with self.__condition:
+                self.__writer = None
+                self.__condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def reads(function):
+    """
+    Decorator making a function of a service hold the read lock of the service (its '_lock' attribute) while it runs.
+    Services having no lock run the function as it is.
+    """
+    @wraps(function)
+    def locked_function(self, *arguments, **keyword_arguments):
+        lock = self._lock
+        if lock is None:
+            return function(self, *arguments, **keyword_arguments)
+        lock.acquire_read()
+        try:
+            return function(self, *arguments, **keyword_arguments)
+        finally:
+            lock.release_read()
+
+    return locked_function
+
+
+def writes(function):
+    """
+    Decorator making a function of a service hold the write lock of the service (its '_lock' attribute) while it runs,
+    so that its checks and its changes form a single atomic step. Services having no lock run the function as it is.
+    """
+    @wraps(function)
+    def locked_function(self, *arguments, **keyword_arguments):
+        lock = self._lock
+        if lock is None:
+            return function(self, *arguments, **keyword_arguments)
+        lock.acquire_write()
+        try:
+            return function(self, *arguments, **keyword_arguments)
+        finally:
+            lock.release_write()
+
+    return locked_function
@@ -0,0 +1,93 @@
+import cProfile
+import os
+import re
+import tracemalloc
+
+DEFAULT_PROFILE_DIRECTORY = "profiles"
+DEFAULT_TOP_ALLOCATIONS = 10
+TRACEMALLOC_FRAMES = 5
+
+
+class CommandProfiler(object):
+    """
+    Profiler of single user commands. While it is enabled, each command run through 'run' is profiled with cProfile
+    and, if memory tracing is on, surrounded by two tracemalloc snapshots. Every profiled command gets its own files in
+    the output directory, numbered in the order the commands were run and named after the command: the profile, as a
+    pstats file (e.g. for 'python -m pstats' or snakeviz), and the top allocations of the command, as a text report.
+    Since the profile covers the whole command, the time spent waiting for the user's input shows up under 'input'.
+    """
+
+    def __init__(self, output_directory=DEFAULT_PROFILE_DIRECTORY, trace_memory=False,
+                 top_allocations=DEFAULT_TOP_ALLOCATIONS):
+        self.__output_directory = output_directory
+        self.__trace_memory = trace_memory
+        self.__top_allocations = top_allocations
+        self.__enabled = False
+        self.__started_tracemalloc = False
+        self.__number_of_commands = 0
+
+    def enable(self):
+        """
+        Function to start profiling the commands, creating the output directory if needed.
+        """
+        os.makedirs(self.__output_directory, exist_ok=True)
+        if self.__trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.__started_tracemalloc = True
+        self.__enabled = True
+
+    def disable(self):
+        """
+        Function to stop profiling the commands, stopping the memory tracing if it was started by the profiler.
+        """
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+        self.__enabled = False
+
+    def is_enabled(self):
+        return self.__enabled
+
+    def get_output_directory(self):
+        return self.__output_directory
+
+    def run(self, command, get_command_name):
+        """
+        Function to run a command, profiling it if the profiler is enabled. The files of the command are written even
+        if the command raises an error, which is then raised further.
+        :param command: function, the command to be run, taking no arguments.
+        :param get_command_name: function, returning the name of the command once it has run (e.g. the menu options
+        chosen by the user), used to name its files.
+        :return: the value returned by the command.
+        """
+        if not self.__enabled:
+            return command()
+        memory_before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(command)
+        finally:
+            memory_after = None
+            if memory_before is not None and tracemalloc.is_tracing():
+                memory_after = tracemalloc.take_snapshot()
+            self.__write_files(get_command_name(), profile, memory_before, memory_after)
+
+    def __write_files(self, command_name, profile, memory_before, memory_after):
+        self.__number_of_commands += 1
+        slug = re.sub(r"[^a-z0-9]+", "-", command_name.lower()).strip("-") or "command"
+        path = os.path.join(self.__output_directory, f"{self.__number_of_commands:04d}-{slug}")
+        profile.dump_stats(path + ".pstats")
+        if memory_after is None:
+            return
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        differences = memory_after.filter_traces(filters).compare_to(memory_before.filter_traces(filters), "traceback")
+        with open(path + ".allocations.txt", "w", encoding="utf-8") as report_file:
+            report_file.write(f"Command: {command_name}\n")
+            report_file.write(f"Allocated during the command: {sum(entry.size_diff for entry in differences)} bytes "
+                              f"in {sum(entry.count_diff for entry in differences)} blocks\n")
+            report_file.write(f"Top {self.__top_allocations} allocations by size:\n")
+            for rank, entry in enumerate(differences[:self.__top_allocations], start=1):
+                report_file.write(f"\n#{rank}: {entry.size_diff:+} bytes ({entry.size} bytes in total), "
+                                  f"{entry.count_diff:+} blocks\n")
+                for line in entry.traceback.format(most_recent_first=True):
+                    report_file.write(line + "\n")
@@ -1,13 +1,24 @@
+from contextlib import nullcontext
 from datetime import date
+from itertools import islice
 from src.domain.entity import Book, Client, Rental
+from src.domain.statistics import RentalStatistics
 from src.errors.exceptions import ValidError, RepoError
+from src.services.locking import reads, writes
+from src.services.undo import Operation
 
 
 class BookService:
-    def __init__(self, book_repository, book_validator):
+    def __init__(self, book_repository, book_validator, rental_statistics=None, undo_service=None,
+                 rental_service=None, lock=None):
         self._book_repository = book_repository
         self._book_validator = book_validator
+        self._rental_statistics = rental_statistics
+        self._undo_service = undo_service
+        self._rental_service = rental_service
+        self._lock = lock
 
+    @writes
     def add_book(self, title_as_string, author_name_as_string):
         """
         Function to add a book to the book repository with the title and author name given by the parameters. The
@@ -18,22 +29,36 @@ class BookService:
         25 characters.
         :param author_name_as_string: string, holds the name of the author for the book to be added; it should be
         between 1 and 25 characters.
+        :return: integer, the ID of the added book.
         """
         current_book_id = self._book_repository.get_next_book_id()
         current_book = Book(current_book_id, title_as_string, author_name_as_string)
         self._book_validator.validate_book(current_book)
         self._book_repository.add_book(current_book)
+        self.__record(Operation(self.__remove_book_by_id, current_book_id),
+                      Operation(self._book_repository.insert_book, current_book))
+        return current_book_id
 
+    @writes
     def remove_book_by_title_and_author(self, title_as_string, author_name_as_string):
         """
         Function to remove from the book repository the book having the title and author name as the given parameters.
-        If such a book is not found when trying to find it, no book is removed but an error is raised instead.
+        If such a book is not found when trying to find it, no book is removed but an error is raised instead. If the
+        book is currently rented, its rental is returned as part of the same undoable operation.
         :param title_as_string: string, holds the old_title_as_string of the book to be removed.
         :param author_name_as_string: string, holds the name of the old_author_name_as_string of the book to be removed.
         """
-        book_index, _ = self.find_book_by_title_and_author(title_as_string, author_name_as_string)
-        self._book_repository.remove_book_by_index(book_index)
-
+        book_index, book = self.find_book_by_title_and_author(title_as_string, author_name_as_string)
+        if book is None:
+            raise RepoError("Book not found. ")
+        with self.__group():
+            if self._rental_service is not None and not self._rental_service.is_book_available_by_book_id(book.id):
+                self._rental_service.return_rental_by_book_id(book.id)
+            self._book_repository.remove_book_by_index(book_index)
+            self.__record(Operation(self._book_repository.insert_book, book),
+                          Operation(self.__remove_book_by_id, book.id))
+
+    @reads
     def find_book_by_title_and_author(self, title_as_string, author_name_as_string):
         """
         Function to search for a book in the book repository that has the title and author name as the parameters given.
@@ -50,48 +75,33 @@ class BookService:
         self._book_validator.validate_book(book_to_validate)
         del book_to_validate
 
-        books_list = self.get_all_books()
-        for index, book in enumerate(books_list):
-            if book.title == title_as_string and book.author == author_name_as_string:
-                return index, book
-        return None, None
+        return self._book_repository.find_book_by_title_and_author(title_as_string, author_name_as_string)
 
+    @reads
     def find_all_books_matching_id(self, book_id):
         book_to_validate = Book(book_id, "Narnia", "C.S.Lewis")
         self._book_validator.validate_book(book_to_validate)
         del book_to_validate
 
-        books_list = self.get_all_books()
-        list_of_matching_books = []
-        for book in books_list:
-            if str(book_id) in str(book.id):
-                list_of_matching_books.append(book)
-        return list_of_matching_books
+        return self._book_repository.find_books_matching_id(book_id)
 
+    @reads
     def find_all_books_matching_title(self, book_name_as_string):
         book_to_validate = Book(1, book_name_as_string, "Best Author")
         self._book_validator.validate_book(book_to_validate)
         del book_to_validate
 
-        books_list = self.get_all_books()
-        list_of_matching_books = []
-        for book in books_list:
-            if book_name_as_string in book.title.lower():
-                list_of_matching_books.append(book)
-        return list_of_matching_books
+        return self._book_repository.find_books_matching_title(book_name_as_string)
 
+    @reads
     def find_all_books_matching_author(self, book_author_as_string):
         book_to_validate = Book(1, "Best Title", book_author_as_string)
         self._book_validator.validate_book(book_to_validate)
         del book_to_validate
 
-        books_list = self.get_all_books()
-        list_of_matching_books = []
-        for book in books_list:
-            if book_author_as_string in book.author.lower():
-                list_of_matching_books.append(book)
-        return list_of_matching_books
+        return self._book_repository.find_books_matching_author(book_author_as_string)
 
+    @writes
     def update_book(self, old_title_as_string, old_author_name_as_string, new_title_as_string,
                     new_author_name_as_string):
         """
@@ -111,29 +121,67 @@ class BookService:
         book_id = book_to_update.id
         updated_book = Book(book_id, new_title_as_string, new_author_name_as_string)
         self._book_validator.validate_book(updated_book)
-        self._book_repository.update_book(book_index, updated_book)
+        self.__replace_book(updated_book)
+        self.__record(Operation(self.__replace_book, book_to_update), Operation(self.__replace_book, updated_book))
 
+    @reads
     def get_book_by_book_id(self, book_id):
-        books_list = self._book_repository.get_all_books()
-        for book in books_list:
-            if book.id == book_id:
-                return book
-        return None
+        return self._book_repository.get_by_id(book_id)
 
+    @reads
     def get_all_books(self):
         """
-        Function to return all the books found in the book repository, in a list.
-        :return: list, containing all the books found in the book repository.
+        Function to return a read-only view over all the books found in the book repository, without copying them.
+        Callers needing a copy unaffected by later changes must ask the view for a 'snapshot'. When the service has a
+        lock, the snapshot is returned instead, taken while holding it, since other threads may change the books while
+        the caller iterates them.
+        :return: sequence, containing all the books found in the book repository.
+        """
+        books = self._book_repository.get_all_books()
+        if self._lock is None:
+            return books
+        return books.snapshot()
+
+    @reads
+    def get_books_page(self, offset=0, limit=None):
+        """
+        Function to return a page of the books found in the book repository, in increasing order of their IDs. The page
+        is taken while holding the lock, straight from the repository, so the other books are neither copied nor
+        iterated past the page.
+        :param offset: integer, the number of books to be skipped.
+        :param limit: integer, the maximum number of books to be returned; None to return all the remaining ones.
+        :return: tuple, containing the list of the books of the page and the total number of books.
         """
-        books_list = self._book_repository.get_all_books()
-        return books_list[:]
+        books = self._book_repository.get_all_books()
+        return get_page(books, offset, limit), len(books)
+
+    def __remove_book_by_id(self, book_id):
+        self._book_repository.remove_book_by_index(self._book_repository.get_index_by_id(book_id))
+
+    def __replace_book(self, book):
+        self._book_repository.update_book(self._book_repository.get_index_by_id(book.id), book)
+        if self._rental_statistics is not None:
+            self._rental_statistics.update_book_author(book.id, book.author)
+
+    def __record(self, undo_operation, redo_operation):
+        if self._undo_service is not None:
+            self._undo_service.record(undo_operation, redo_operation)
+
+    def __group(self):
+        if self._undo_service is None:
+            return nullcontext()
+        return self._undo_service.group()
 
 
 class ClientService:
-    def __init__(self, client_repository, client_validator):
+    def __init__(self, client_repository, client_validator, undo_service=None, rental_service=None, lock=None):
         self._client_repository = client_repository
         self._client_validator = client_validator
+        self._undo_service = undo_service
+        self._rental_service = rental_service
+        self._lock = lock
 
+    @writes
     def add_client(self, client_name_as_string):
         """
         Function to add a client to the client repository with the name given by the parameter. The function creates a
@@ -142,24 +190,37 @@ class ClientService:
         client repository.
         :param client_name_as_string: string, holds the name for the client to be added; it should be
         between 1 and 25 characters.
+        :return: integer, the ID of the added client.
         """
         client_id = self._client_repository.get_next_client_id()
         client = Client(client_id, client_name_as_string)
         self._client_validator.validate_client(client)
         self._client_repository.add_client(client)
+        self.__record(Operation(self.__remove_client_by_id, client_id),
+                      Operation(self._client_repository.insert_client, client))
+        return client_id
 
+    @writes
     def remove_client_by_name(self, client_name_as_string):
         """
         Function to remove the client from the client repository with the name given by the parameter. The function
         tries to find the positional index of the client in the repository. If no client is found, no client is removed
-        but an error is raised instead. Otherwise, the client is removed from the client repository.
+        but an error is raised instead. Otherwise, the books the client currently rents are returned and the client is
+        removed from the client repository, as a single undoable operation.
         :param client_name_as_string: string, holds the name of the client to be removed from the repository.
         """
-        client_index, _ = self.find_client_by_name(client_name_as_string)
+        client_index, client = self.find_client_by_name(client_name_as_string)
         if client_index is None:
             raise RepoError("Name not found. ")
-        self._client_repository.remove_client_by_index(client_index)
-
+        with self.__group():
+            if self._rental_service is not None:
+                for book_id in self._rental_service.get_client_active_rentals(client.id):
+                    self._rental_service.return_rental_by_book_id(book_id)
+            self._client_repository.remove_client_by_index(client_index)
+            self.__record(Operation(self._client_repository.insert_client, client),
+                          Operation(self.__remove_client_by_id, client.id))
+
+    @reads
     def find_client_by_name(self, client_name_as_string):
         """
         Function to find a client in the client repository that has the name given by the parameter. The function tries
@@ -175,36 +236,25 @@ class ClientService:
         self._client_validator.validate_client(client_to_validate)
         del client_to_validate
 
-        clients_list = self.get_all_clients()
-        for index, client in enumerate(clients_list):
-            if client.name == client_name_as_string:
-                return index, client
-        return None, None
+        return self._client_repository.find_client_by_name(client_name_as_string)
 
+    @reads
     def find_all_clients_matching_name(self, client_name_as_string):
         client_to_validate = Client(1, client_name_as_string)
         self._client_validator.validate_client(client_to_validate)
         del client_to_validate
 
-        clients_list = self.get_all_clients()
-        list_of_matching_clients = []
-        for client in clients_list:
-            if client_name_as_string in client.name.lower():
-                list_of_matching_clients.append(client)
-        return list_of_matching_clients
+        return self._client_repository.find_clients_matching_name(client_name_as_string)
 
+    @reads
     def find_all_clients_matching_id(self, client_id):
         client_to_validate = Client(client_id, "Mark")
         self._client_validator.validate_client(client_to_validate)
         del client_to_validate
 
-        clients_list = self.get_all_clients()
-        list_of_matching_clients = []
-        for client in clients_list:
-            if str(client_id) in str(client.id):
-                list_of_matching_clients.append(client)
-        return list_of_matching_clients
+        return self._client_repository.find_clients_matching_id(client_id)
 
+    @writes
     def update_client_by_name(self, old_name_as_string, new_name_as_string):
         """
         Function to update the details of an already existing client from the client repository. The function tries to
@@ -220,37 +270,85 @@ class ClientService:
         client_id = client.id
         new_client = Client(client_id, new_name_as_string)
         self._client_validator.validate_client(new_client)
-        self._client_repository.update_client_by_name(client_index, new_client)
+        self.__replace_client(new_client)
+        self.__record(Operation(self.__replace_client, client), Operation(self.__replace_client, new_client))
 
+    @reads
+    def get_client_by_client_id(self, client_id):
+        return self._client_repository.get_by_id(client_id)
+
+    @reads
     def get_all_clients(self):
         """
-        Function to return all the clients found in the client repository, in a list.
-        :return: list, containing all the clients found in the client repository.
+        Function to return a read-only view over all the clients found in the client repository, without copying them.
+        Callers needing a copy unaffected by later changes must ask the view for a 'snapshot'. When the service has a
+        lock, the snapshot is returned instead, taken while holding it, since other threads may change the clients
+        while the caller iterates them.
+        :return: sequence, containing all the clients found in the client repository.
+        """
+        clients = self._client_repository.get_all_clients()
+        if self._lock is None:
+            return clients
+        return clients.snapshot()
+
+    @reads
+    def get_clients_page(self, offset=0, limit=None):
         """
-        clients_list = self._client_repository.get_all_clients()
-        return clients_list[:]
+        Function to return a page of the clients found in the client repository, in increasing order of their IDs. The
+        page is taken while holding the lock, straight from the repository, so the other clients are neither copied nor
+        iterated past the page.
+        :param offset: integer, the number of clients to be skipped.
+        :param limit: integer, the maximum number of clients to be returned; None to return all the remaining ones.
+        :return: tuple, containing the list of the clients of the page and the total number of clients.
+        """
+        clients = self._client_repository.get_all_clients()
+        return get_page(clients, offset, limit), len(clients)
+
+    def __remove_client_by_id(self, client_id):
+        self._client_repository.remove_client_by_index(self._client_repository.get_index_by_id(client_id))
+
+    def __replace_client(self, client):
+        self._client_repository.update_client(self._client_repository.get_index_by_id(client.id), client)
+
+    def __record(self, undo_operation, redo_operation):
+        if self._undo_service is not None:
+            self._undo_service.record(undo_operation, redo_operation)
+
+    def __group(self):
+        if self._undo_service is None:
+            return nullcontext()
+        return self._undo_service.group()
 
 
 class RentalService:
     def __init__(self, book_repository, client_repository, rental_repository,
-                 book_validator, client_validator, rental_validator):
+                 book_validator, client_validator, rental_validator, rental_statistics=None, undo_service=None,
+                 lock=None):
         self._book_repository = book_repository
         self._client_repository = client_repository
         self._rental_repository = rental_repository
+        if rental_statistics is None:
+            rental_statistics = RentalStatistics()
+        self._rental_statistics = rental_statistics
+        self._undo_service = undo_service
+        self._lock = lock
 
         self._book_validator = book_validator
         self._client_validator = client_validator
         self._rental_validator = rental_validator
 
+    @writes
     def add_rental(self, book_id, client_id):
         """
         Function to add a rental to the rental repository with the book and client IDs given by the parameters. The
         function creates a new 'Rental' entity which then passes through the 'RentalValidator'. In case any of the
         rental's parameters are incorrect, the rental is not added but an error is raised instead. Otherwise, the
         function checks whether the book is available for rent. If it is not, then no rental is added but an error is
-        raised instead. Otherwise, the rental is added to the rental repository.
+        raised instead. Otherwise, the rental is added to the rental repository. When the service has a lock, the
+        availability check and the rental form a single atomic step.
         :param book_id: integer, holds the ID value of the book that is rented.
         :param client_id: integer, holds the ID value of the client that rents the book.
+        :return: integer, the ID of the added rental.
         """
         self._rental_validator.validate_book_and_client_ids(book_id, client_id)
 
@@ -268,7 +366,9 @@ class RentalService:
                     returned_date = None
                     rental = Rental(rental_id, book_id, client_id, rented_date, returned_date)
                     self._rental_validator.validate_rental(rental)
-                    self._rental_repository.add_rental(rental)
+                    self.__restore_rental(rental)
+                    self.__record(Operation(self.__remove_last_rental), Operation(self.__restore_rental, rental))
+                    return rental_id
                 else:
                     raise RepoError("Book is currently rented. ")
             else:
@@ -276,12 +376,47 @@ class RentalService:
         else:
             raise RepoError("Book ID not found. ")
 
+    @writes
+    def rent_if_available(self, book_id, client_id):
+        """
+        Function to rent a book only if it is available, checking its availability and renting it as a single atomic
+        step, so that of several threads trying to rent the same book, exactly one rents it. The IDs are validated as
+        by 'add_rental', which raises an error for invalid or unknown IDs.
+        :param book_id: integer, holds the ID value of the book to be rented.
+        :param client_id: integer, holds the ID value of the client that rents the book.
+        :return: True/False, whether or not the book was rented.
+        """
+        self._rental_validator.validate_book_and_client_ids(book_id, client_id)
+        if not self.is_book_available_by_book_id(int(book_id)):
+            return False
+        self.add_rental(book_id, client_id)
+        return True
+
+    @writes
+    def return_if_rented(self, book_id):
+        """
+        Function to return the rental of a book only if the book is rented, checking and returning it as a single
+        atomic step, so that of several threads trying to return the same book, exactly one returns it. The ID is
+        validated as by 'return_rental_by_book_id', which raises an error for invalid or unknown IDs.
+        :param book_id: integer, holds the ID value of the book to be returned.
+        :return: True/False, whether or not the book was returned.
+        """
+        self._rental_validator.validate_book_and_client_ids(book_id, 5)
+        if not self.is_book_id_in_repository(int(book_id)):
+            raise RepoError("Book ID not found. ")
+        if self.is_book_available_by_book_id(int(book_id)):
+            return False
+        self.return_rental_by_book_id(book_id)
+        return True
+
+    @writes
     def return_rental_by_id(self, rental_id):
         """
         Function to return a rental by the 'rental_id'. The function verifies if the 'rental_id' is valid. If it is not,
         then no rental is returned but an error is raised instead. Otherwise, the function searches for the rental in
-        the rental repository. If no rental is found, no rental is returned but an error is raised instead. Otherwise,
-        the rental is marked as returned with the current date as the 'returned_date'.
+        the rental repository. If no rental is found, or the rental is already returned, no rental is returned but an
+        error is raised instead. Otherwise, the rental is marked as returned with the current date as the
+        'returned_date'.
         :param rental_id: integer, holds the ID of the rental to be returned.
         """
         try:
@@ -291,8 +426,15 @@ class RentalService:
         rental_index = self.find_rental_index_by_id(rental_id)
         if rental_index is None:
             raise RepoError("Rental ID not found. ")
-        self._rental_repository.return_rental_by_index(rental_index)
-
+        rental = self._rental_repository.get_by_id(rental_id)
+        if rental.returned_date is not None:
+            raise RepoError("Rental is already returned. ")
+        returned_date = date.today()
+        self.__return_rental(rental_id, returned_date)
+        self.__record(Operation(self.__reopen_rental, rental_id),
+                      Operation(self.__return_rental, rental_id, returned_date))
+
+    @writes
     def return_rental_by_book_id(self, book_id):
         """
         Function to return the rental by the 'book_id'. The function verifies if the 'book_id' is valid. If it is not,
@@ -316,6 +458,7 @@ class RentalService:
 
         self.return_rental_by_id(rental_id)
 
+    @reads
     def find_rental_id_by_book_id(self, book_id):
         """
         Function to search for a 'rental_id' being given the 'book_id' of the rental. If the active rental having the
@@ -324,12 +467,12 @@ class RentalService:
         :param book_id: integer, holds the ID value of the rental's 'book_id'.
         :return: If rental is found, it returns the rental's ID. Otherwise, it returns None.
         """
-        rentals_list = self.get_all_rentals()
-        for rental in rentals_list:
-            if rental.book_id == book_id:
-                return rental.id
-        return None
+        active_rental = self._rental_repository.get_active_rental_by_book_id(book_id)
+        if active_rental is None:
+            return None
+        return active_rental.id
 
+    @reads
     def find_rental_index_by_id(self, rental_id):
         """
         Function to search for the index of the rental being given the 'book_id' of it. If the active rental having the
@@ -338,12 +481,9 @@ class RentalService:
         :param rental_id: integer, holds the ID value of the rental.
         :return: If rental is found, it returns the rental's index. Otherwise, it returns None.
         """
-        rentals_list = self.get_all_rentals()
-        for index, rental in enumerate(rentals_list):
-            if rental.id == rental_id:
-                return index
-        return None
+        return self._rental_repository.get_index_by_id(rental_id)
 
+    @reads
     def is_book_available_by_book_id(self, book_id):
         """
         Function to return whether or not a book from the book repository is currently available for rent or not.
@@ -353,12 +493,9 @@ class RentalService:
         :param book_id: integer, holds the ID value of the book to be checked if available in the book repository.
         :return: True/False, whether or not the book having the 'book_id' given by the parameter is available or not.
         """
-        rentals_list = self.get_all_rentals()
-        for rental in rentals_list:
-            if rental.book_id == book_id and rental.returned_date is None:
-                return False
-        return True
+        return self._rental_repository.get_active_rental_by_book_id(book_id) is None
 
+    @reads
     def is_book_id_in_repository(self, book_id):
         """
         Function to return whether or not a book having the 'book_id' as the given parameter is found in the book
@@ -366,12 +503,9 @@ class RentalService:
         :param book_id: integer, holds the ID value of the book to be looked for in the repository.
         :return: True/False, whether or not the book having the 'book_id' given by the parameter is found or not.
         """
-        books_list = self._book_repository.get_all_books()
-        for book in books_list:
-            if book.id == book_id:
-                return True
-        return False
+        return self._book_repository.contains_id(book_id)
 
+    @reads
     def is_client_id_in_repository(self, client_id):
         """
         Function to return whether or not a book having the 'client_id' as the given parameter is found in the book
@@ -379,20 +513,36 @@ class RentalService:
         :param client_id: integer, holds the ID value of the client to be looked for in the repository.
         :return: True/False, whether or not the book having the 'client_id' given by the parameter is found or not.
         """
-        clients_list = self._client_repository.get_all_clients()
-        for client in clients_list:
-            if client.id == client_id:
-                return True
-        return False
+        return self._client_repository.contains_id(client_id)
 
+    @reads
     def get_all_rentals(self):
         """
-        Function to get the full list of rentals found in the rental repository.
-        :return: list, all the rentals found in the rental repository.
+        Function to get a read-only view over the full list of rentals found in the rental repository, without copying
+        it. Callers needing a copy unaffected by later changes must ask the view for a 'snapshot'. When the service has
+        a lock, the snapshot is returned instead, taken while holding it, since other threads may change the rentals
+        while the caller iterates them.
+        :return: sequence, all the rentals found in the rental repository.
         """
-        rentals_list = self._rental_repository.get_all_rentals()
-        return rentals_list[:]
+        rentals = self._rental_repository.get_all_rentals()
+        if self._lock is None:
+            return rentals
+        return rentals.snapshot()
 
+    @reads
+    def get_rentals_page(self, offset=0, limit=None):
+        """
+        Function to return a page of the rentals found in the rental repository, in the order they were made. The page
+        is taken while holding the lock, straight from the repository, so the other rentals are neither copied nor
+        iterated past the page.
+        :param offset: integer, the number of rentals to be skipped.
+        :param limit: integer, the maximum number of rentals to be returned; None to return all the remaining ones.
+        :return: tuple, containing the list of the rentals of the page and the total number of rentals.
+        """
+        rentals = self._rental_repository.get_all_rentals()
+        return get_page(rentals, offset, limit), len(rentals)
+
+    @reads
     def get_client_active_rentals(self, client_id):
         """
         Function to get the full list of active rentals found in the rental repository appointed to the client holding
@@ -400,13 +550,20 @@ class RentalService:
         :param client_id: integer, holds the ID value of the client whose active rentals will be searched for.
         :return: list, all the active rentals found in the rental repository appointed to the given client.
         """
-        rentals_list = self._rental_repository.get_all_rentals()
-        client_active_rentals_list = []
-        for rental in rentals_list:
-            if rental.client_id == client_id and rental.returned_date is None:
-                client_active_rentals_list.append(rental.book_id)
-        return client_active_rentals_list[:]
+        client_active_rentals = self._rental_repository.get_active_rentals_by_client_id(client_id)
+        return [rental.book_id for rental in client_active_rentals]
+
+    @reads
+    def get_active_rentals_for_clients(self, client_ids):
+        """
+        Function to get, in a single pass, the IDs of the books currently rented by each of the clients having the
+        given IDs.
+        :param client_ids: iterable, holds the ID values of the clients whose active rentals will be searched for.
+        :return: dictionary, mapping each client ID to the list of IDs of the books the client currently rents.
+        """
+        return {client_id: self.get_client_active_rentals(client_id) for client_id in client_ids}
 
+    @reads
     def get_book_rental_status(self, book_id):
         """
         Function to return the ID of the client that currently rents the book having the 'book_id' as the given
@@ -416,11 +573,116 @@ class RentalService:
         rentals repository.
         :return: the ID of the client that currently rents the book, otherwise None
         """
-        rentals_list = self._rental_repository.get_all_rentals()
-        for rental in rentals_list:
-            if rental.book_id == book_id and rental.returned_date is None:
-                return rental.client_id
-        return None
+        active_rental = self._rental_repository.get_active_rental_by_book_id(book_id)
+        if active_rental is None:
+            return None
+        return active_rental.client_id
+
+    @writes
+    def rebuild_statistics(self):
+        """
+        Function to count again all the rentals found in the rental repository, e.g. after the repositories are
+        restored from the disk. The rentals of books that were removed are counted without their author.
+        """
+        for rental in self._rental_repository.get_all_rentals():
+            book = self._book_repository.get_by_id(rental.book_id)
+            author = None if book is None else book.author
+            self._rental_statistics.record_rental(rental.book_id, author, rental.client_id, rental.rented_date)
+            if rental.returned_date is not None:
+                self._rental_statistics.record_return(rental.client_id, rental.rented_date, rental.returned_date)
+
+    def __restore_rental(self, rental):
+        self._rental_repository.add_rental(rental)
+        book = self._book_repository.get_by_id(rental.book_id)
+        self._rental_statistics.record_rental(rental.book_id, book.author, rental.client_id, rental.rented_date)
+
+    def __remove_last_rental(self):
+        rental = self._rental_repository.remove_last_rental()
+        self._rental_statistics.cancel_rental(rental.book_id, rental.client_id, rental.rented_date)
+
+    def __return_rental(self, rental_id, returned_date):
+        rental_index = self._rental_repository.get_index_by_id(rental_id)
+        self._rental_repository.return_rental_by_index(rental_index, returned_date)
+        rental = self._rental_repository.get_by_id(rental_id)
+        self._rental_statistics.record_return(rental.client_id, rental.rented_date, rental.returned_date)
+
+    def __reopen_rental(self, rental_id):
+        rental = self._rental_repository.get_by_id(rental_id)
+        returned_date = rental.returned_date
+        self._rental_repository.reopen_rental_by_index(self._rental_repository.get_index_by_id(rental_id))
+        self._rental_statistics.cancel_return(rental.client_id, rental.rented_date, returned_date)
+
+    def __record(self, undo_operation, redo_operation):
+        if self._undo_service is not None:
+            self._undo_service.record(undo_operation, redo_operation)
+
+
+class StatisticsService:
+    def __init__(self, rental_statistics, lock=None):
+        self._rental_statistics = rental_statistics
+        self._lock = lock
+
+    @reads
+    def get_most_rented_books(self, limit=None, offset=0):
+        """
+        Function to return a page of the most rented books, in descending order of their number of rentals. Only the
+        first 'offset' + 'limit' books of the ranking are selected, without sorting the rest of them.
+        :param limit: integer, the maximum number of books to be returned; if None, all the remaining books are
+        returned.
+        :param offset: integer, the number of top ranked books to be skipped.
+        :return: list, containing (book ID, number of rentals) tuples.
+        """
+        return self.__get_page(self._rental_statistics.get_most_rented_books, limit, offset)
+
+    @reads
+    def get_most_active_clients(self, limit=None, offset=0):
+        """
+        Function to return a page of the most active clients, in descending order of their number of rental days,
+        counting the active rentals up to today. Only the first 'offset' + 'limit' clients of the ranking are selected
+        (with a partial selection), without sorting the rest of them.
+        :param limit: integer, the maximum number of clients to be returned; if None, all the remaining clients are
+        returned.
+        :param offset: integer, the number of top ranked clients to be skipped.
+        :return: list, containing (client ID, number of rental days) tuples.
+        """
+        return self.__get_page(self._rental_statistics.get_most_active_clients, limit, offset)
+
+    @reads
+    def get_most_rented_authors(self, limit=None, offset=0):
+        """
+        Function to return a page of the most rented authors, in descending order of the number of rentals of their
+        books. Only the first 'offset' + 'limit' authors of the ranking are selected, without sorting the rest of them.
+        :param limit: integer, the maximum number of authors to be returned; if None, all the remaining authors are
+        returned.
+        :param offset: integer, the number of top ranked authors to be skipped.
+        :return: list, containing (author name, number of rentals) tuples.
+        """
+        return self.__get_page(self._rental_statistics.get_most_rented_authors, limit, offset)
+
+    @staticmethod
+    def __get_page(get_ranking, limit, offset):
+        error_string = ""
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            error_string += "Limit must have a natural number value. "
+        if not isinstance(offset, int) or offset < 0:
+            error_string += "Offset must have a natural number value. "
+        if len(error_string) > 0:
+            raise ValidError(error_string)
+
+        if limit is None:
+            return get_ranking()[offset:]
+        return get_ranking(offset + limit)[offset:]
+
+
+def get_page(items, offset, limit):
+    """
+    Function to return the items of a page of the given sequence, going over the items before it without copying them.
+    :param items: sequence, containing the items to be paged.
+    :param offset: integer, the number of items to be skipped.
+    :param limit: integer, the maximum number of items to be returned; None to return all the remaining ones.
+    :return: list, containing the items of the page.
+    """
+    return list(islice(items, offset, None if limit is None else offset + limit))
 
 
 def exit_application():
@@ -0,0 +1,121 @@
+from collections import deque
+from contextlib import contextmanager
+
+from src.errors.exceptions import RepoError
+from src.services.locking import writes
+
+
+class Operation(object):
+    """
+    Repository level change, kept as the function making it and its arguments, so that recording it never copies any
+    list of the repositories.
+    """
+    __slots__ = ("function", "arguments")
+
+    def __init__(self, function, *arguments):
+        self.function = function
+        self.arguments = arguments
+
+    def execute(self):
+        """
+        Function to make the change of the operation.
+        """
+        self.function(*self.arguments)
+
+
+class UndoService(object):
+    """
+    Log of the changes made through the services, each kept as an (undo operation, redo operation) pair. The pairs
+    recorded by a single user command form a step, which is undone or redone as a whole, so cascading changes (e.g. a
+    client removal returning the client's books) take a single undo.
+    The log can be capped by 'maximum_operations', the maximum number of operation pairs it keeps: when the cap is
+    exceeded, the oldest steps are forgotten. By default, the log is unlimited.
+    When the services share a 'ReadWriteLock', it must be given to the undo service as well, so that undoing and
+    redoing are atomic towards the other threads.
+    """
+
+    def __init__(self, maximum_operations=None, lock=None):
+        self.__undo_steps = deque()
+        self.__redo_steps = []
+        self.__maximum_operations = maximum_operations
+        self.__number_of_operations = 0
+        self.__open_step = None
+        self._lock = lock
+
+    def record(self, undo_operation, redo_operation):
+        """
+        Function to record a change that was just made. Unless a group of changes is open, the change forms a step of
+        its own. Recording a change discards the steps that could have been redone.
+        :param undo_operation: object, the 'Operation' reverting the change.
+        :param redo_operation: object, the 'Operation' making the change again.
+        """
+        if self.__open_step is not None:
+            self.__open_step.append((undo_operation, redo_operation))
+            return
+        self.__push_undo_step([(undo_operation, redo_operation)])
+
+    @contextmanager
+    def group(self):
+        """
+        Function to group all the changes recorded inside the 'with' block into a single step. Nested groups belong to
+        the outermost one. If the block raises an error, the changes already recorded in it are reverted and the error
+        is raised further.
+        """
+        if self.__open_step is not None:
+            yield
+            return
+        self.__open_step = []
+        try:
+            yield
+        except Exception:
+            step, self.__open_step = self.__open_step, None
+            for undo_operation, _ in reversed(step):
+                undo_operation.execute()
+            raise
+        step, self.__open_step = self.__open_step, None
+        if len(step) > 0:
+            self.__push_undo_step(step)
+
+    @writes
+    def undo(self):
+        """
+        Function to revert the last step that was not undone. If there is no such step, an error is raised instead.
+        """
+        if len(self.__undo_steps) == 0:
+            raise RepoError("No more operations to undo. ")
+        step = self.__undo_steps.pop()
+        for undo_operation, _ in reversed(step):
+            undo_operation.execute()
+        self.__redo_steps.append(step)
+
+    @writes
+    def redo(self):
+        """
+        Function to make again the last undone step. If there is no such step, an error is raised instead.
+        """
+        if len(self.__redo_steps) == 0:
+            raise RepoError("No more operations to redo. ")
+        step = self.__redo_steps.pop()
+        for _, redo_operation in step:
+            redo_operation.execute()
+        self.__undo_steps.append(step)
+
+    @writes
+    def clear(self):
+        """
+        Function to forget all the recorded steps, e.g. after the procedurally generated items are added at startup.
+        """
+        self.__undo_steps.clear()
+        self.__redo_steps.clear()
+        self.__number_of_operations = 0
+
+    def __push_undo_step(self, step):
+        for redo_step in self.__redo_steps:
+            self.__number_of_operations -= len(redo_step)
+        self.__redo_steps.clear()
+        self.__undo_steps.append(step)
+        self.__number_of_operations += len(step)
+        if self.__maximum_operations is None:
+            return
+        while self.__number_of_operations > self.__maximum_operations and len(self.__undo_steps) > 1:
+            self.__number_of_operations -= len(self.__undo_steps.popleft())
@@ -1,22 +1,109 @@
-import datetime
-
 from src.errors.exceptions import ValidError, RepoError
+from src.services.profiling import CommandProfiler
 from src.services.service import exit_application
+from src.ui.colors import print_error, print_green, print_red, print_successful
 
 
 class Console:
-    def __init__(self, book_service, client_service, rental_service):
+    def __init__(self, book_service, client_service, rental_service, statistics_service, undo_service,
+                 instrumentation=None, profiler=None):
         self._book_service = book_service
         self._client_service = client_service
         self._rental_service = rental_service
+        self._statistics_service = statistics_service
+        self._undo_service = undo_service
+        self._instrumentation = instrumentation
+        if profiler is None:
+            profiler = CommandProfiler()
+        self._profiler = profiler
+        self.__command_path = []
         self._main_menu_commands = {
             1: {"description": "Manage entities", "function_name": self.__ui_get_clients_or_books_for_manage_command},
             2: {"description": "Manage rentals", "function_name": self.__ui_get_rental_option},
             3: {"description": "List entities", "function_name": self.__ui_get_option_for_list_command},
             4: {"description": "Search entities", "function_name": self.__ui_get_option_for_search_command},
             5: {"description": "Create statistics", "function_name": self.__ui_get_option_for_search_option},
-            0: {"description": "Exit application", "function_name": exit_application}
+            6: {"description": "Undo", "function_name": self.__ui_undo},
+            7: {"description": "Redo", "function_name": self.__ui_redo}
+        }
+        if instrumentation is not None:
+            self._main_menu_commands[8] = {"description": "Performance metrics",
+                                           "function_name": self.__ui_get_option_for_metrics_command}
+        self._main_menu_commands[9] = {"description": "Toggle command profiling",
+                                       "function_name": self.__ui_toggle_profiling}
+        self._main_menu_commands[0] = {"description": "Exit application", "function_name": exit_application}
+
+    def __ui_undo(self):
+        self._undo_service.undo()
+        print_successful("Operation successfully undone.", "\n")
+
+    def __ui_redo(self):
+        self._undo_service.redo()
+        print_successful("Operation successfully redone.", "\n")
+
+    def __ui_toggle_profiling(self):
+        if self._profiler.is_enabled():
+            self._profiler.disable()
+            print_successful("Command profiling disabled.", "\n")
+        else:
+            self._profiler.enable()
+            print_successful(f"Command profiling enabled; the profiles are written to "
+                             f"'{self._profiler.get_output_directory()}'.", "\n")
+
+    def __ui_get_option_for_metrics_command(self):
+        state = "Disable" if self._instrumentation.is_enabled() else "Enable"
+        metrics_commands = {
+            1: {"description": "Show operation latencies", "function_name": self.__ui_print_metrics},
+            2: {"description": f"{state} metrics collection", "function_name": self.__ui_toggle_metrics},
+            3: {"description": "Reset metrics", "function_name": self.__ui_reset_metrics},
+            4: {"description": "Write metrics to a JSON file", "function_name": self.__ui_write_metrics_json},
+            5: {"description": "Write metrics to a Prometheus text file",
+                "function_name": self.__ui_write_metrics_prometheus},
+            0: {"description": "Back to main menu", "function_name": self.__ui_get_back_to_main_menu}
         }
+        print("      METRICS ")
+        self.__ui_print_menu_commands_of(metrics_commands)
+        self.__ui_get_command_from(metrics_commands)
+
+    def __ui_print_metrics(self):
+        report = self._instrumentation.get_report()
+        if len(report) == 0:
+            print_red("No operations recorded.", "\n")
+            return
+        print(f"{'Operation':<45} {'Calls':>8} {'Errors':>7} {'p50 (us)':>10} {'p95 (us)':>10} {'p99 (us)':>10} "
+              f"{'Max (us)':>10}")
+        for entry in report:
+            print(f"{entry['operation']:<45} {entry['calls']:>8} {entry['errors']:>7} {entry['p50_us']:>10.1f} "
+                  f"{entry['p95_us']:>10.1f} {entry['p99_us']:>10.1f} {entry['max_us']:>10.1f}")
+
+    def __ui_toggle_metrics(self):
+        if self._instrumentation.is_enabled():
+            self._instrumentation.disable()
+            print_successful("Metrics collection disabled.", "\n")
+        else:
+            self._instrumentation.enable()
+            print_successful("Metrics collection enabled.", "\n")
+
+    def __ui_reset_metrics(self):
+        self._instrumentation.reset()
+        print_successful("Metrics successfully reset.", "\n")
+
+    def __ui_write_metrics_json(self):
+        self.__ui_write_metrics(self._instrumentation.write_json)
+
+    def __ui_write_metrics_prometheus(self):
+        self.__ui_write_metrics(self._instrumentation.write_prometheus)
+
+    @staticmethod
+    def __ui_write_metrics(write_metrics):
+        path = input("   File path: ").strip()
+        if len(path) == 0:
+            raise ValidError("File path must not be empty. ")
+        try:
+            write_metrics(path)
+        except OSError as os_error:
+            raise ValidError(f"Metrics could not be written: {os_error.strerror}. ")
+        print_successful("Metrics successfully written.", "\n")
 
     def __ui_get_option_for_search_option(self):
         statistics_commands = {
@@ -30,61 +117,29 @@ class Console:
         self.__ui_get_command_from(statistics_commands)
 
     def __ui_get_most_active_clients(self):
-        rentals_list = self._rental_service.get_all_rentals()
-        list_of_clients_and_rental_days = []
-        for rental in rentals_list:
-            is_in_list = False
-            for client in list_of_clients_and_rental_days:
-                if client["ID"] == rental.client_id:
-                    is_in_list = True
-                    rented_date = rental.rented_date
-                    returned_date = rental.returned_date
-                    if returned_date is None:
-                        returned_date = datetime.date.today()
-                    rental_time_elapsed = returned_date - rented_date
-                    client["Rental days"] += int(rental_time_elapsed.days) + 1
-                    break
-            if not is_in_list:
-                list_of_clients_and_rental_days.append({"ID": rental.client_id, "Rental days": 1})
-        list_of_clients_and_rental_days = sorted(list_of_clients_and_rental_days, key=lambda client_rental: client_rental["Rental days"], reverse=True)
-        for client in list_of_clients_and_rental_days:
-            print(client["ID"], client["Rental days"])
+        limit = self.__ui_read_statistics_limit()
+        for client_id, rental_days in self._statistics_service.get_most_active_clients(limit):
+            print(client_id, rental_days)
 
     def __ui_get_most_rented_books(self):
-        rentals_list = self._rental_service.get_all_rentals()
-        list_of_books_and_rentals_amount = []
-        for rental in rentals_list:
-            is_in_list = False
-            for book in list_of_books_and_rentals_amount:
-                if book["ID"] == rental.book_id:
-                    is_in_list = True
-                    book["Rental amount"] += 1
-                    break
-            if not is_in_list:
-                list_of_books_and_rentals_amount.append({"ID": rental.book_id, "Rental amount": 1})
-        list_of_books_and_rentals_amount = sorted(list_of_books_and_rentals_amount,
-                                                  key=lambda book_rental: book_rental["Rental amount"], reverse=True)
-        for book in list_of_books_and_rentals_amount:
-            print(book["ID"], book["Rental amount"])
+        limit = self.__ui_read_statistics_limit()
+        for book_id, rental_amount in self._statistics_service.get_most_rented_books(limit):
+            print(book_id, rental_amount)
 
     def __ui_get_most_rented_authors(self):
-        rentals_list = self._rental_service.get_all_rentals()
-        list_of_authors_and_rentals_amount = []
-        for rental in rentals_list:
-            rented_book = self._book_service.get_book_by_book_id(rental.book_id)
-            rented_author = rented_book.author
-            is_in_list = False
-            for author in list_of_authors_and_rentals_amount:
-                if author["name"] == rented_author:
-                    is_in_list = True
-                    author["Rental amount"] += 1
-                    break
-            if not is_in_list:
-                list_of_authors_and_rentals_amount.append({"name": rented_author, "Rental amount": 1})
-        list_of_authors_and_rentals_amount = sorted(list_of_authors_and_rentals_amount,
-                                                  key=lambda author_rental: author_rental["Rental amount"], reverse=True)
-        for author in list_of_authors_and_rentals_amount:
-            print(author["name"], author["Rental amount"])
+        limit = self.__ui_read_statistics_limit()
+        for author, rental_amount in self._statistics_service.get_most_rented_authors(limit):
+            print(author, rental_amount)
+
+    @staticmethod
+    def __ui_read_statistics_limit():
+        limit = input("   Number of results (empty for all): ").strip()
+        if len(limit) == 0:
+            return None
+        try:
+            return int(limit)
+        except ValueError:
+            raise ValueError("Number of results must have a natural integer value.")
 
     def __ui_get_clients_or_books_for_manage_command(self):
         manage_commands = {
@@ -150,9 +205,7 @@ class Console:
         if number_of_matching_clients == 0:
             raise RepoError(f"No clients found by ID: {client_id}")
 
-        for client in list_of_matching_clients:
-            client_current_rentals = self._rental_service.get_client_active_rentals(client.id)
-            print(f"{client.id} - {client.name}: {client_current_rentals}")
+        self.__ui_print_clients(list_of_matching_clients)
 
     def __ui_search_client_by_name(self):
         client_name = input("Client name=")
@@ -162,9 +215,7 @@ class Console:
         if number_of_matching_clients == 0:
             raise RepoError(f"No clients found by name: {client_name}")
 
-        for client in list_of_matching_clients:
-            client_current_rentals = self._rental_service.get_client_active_rentals(client.id)
-            print(f"{client.id} - {client.name}: {client_current_rentals}")
+        self.__ui_print_clients(list_of_matching_clients)
 
     def __ui_search_book_by_id(self):
         book_id = input("Book ID=")
@@ -254,9 +305,13 @@ class Console:
 
     def __ui_list_clients(self):
         clients_list = self._client_service.get_all_clients()
+        self.__ui_print_clients(clients_list)
+
+    def __ui_print_clients(self, clients_list):
+        active_rentals_by_client_id = self._rental_service.get_active_rentals_for_clients(
+            client.id for client in clients_list)
         for client in clients_list:
-            client_current_rentals = self._rental_service.get_client_active_rentals(client.id)
-            print(f"{client.id} - {client.name}: {client_current_rentals}")
+            print(f"{client.id} - {client.name}: {active_rentals_by_client_id[client.id]}")
 
     def __ui_get_book_option(self):
         book_commands = {
@@ -332,12 +387,12 @@ class Console:
         for key in current_menu:
             print(key, current_menu[key]["description"])
 
-    @staticmethod
-    def __ui_get_command_from(current_menu):
+    def __ui_get_command_from(self, current_menu):
         input_from_console = int(input(">"))
         try:
             command_key = int(input_from_console)
             if command_key in current_menu:
+                self.__command_path.append(current_menu[command_key]["description"])
                 command = current_menu[command_key]["function_name"]
                 command()
             else:
@@ -348,12 +403,21 @@ class Console:
     def __ui_get_back_to_main_menu(self):
         pass
 
-    def run_console(self):
+    def run_console(self, profile=False):
+        """
+        Function to run the main menu loop of the console.
+        :param profile: True/False, whether or not each menu command is profiled from the start; profiling can also be
+        toggled from the main menu.
+        """
+        if profile and not self._profiler.is_enabled():
+            self._profiler.enable()
         while True:
             print("    MAIN MENU")
             self.__ui_print_menu_commands_of(self._main_menu_commands)
+            self.__command_path = []
             try:
-                self.__ui_get_command_from(self._main_menu_commands)
+                self._profiler.run(lambda: self.__ui_get_command_from(self._main_menu_commands),
+                                   lambda: " > ".join(self.__command_path))
             except ValueError as value_error:
                 print_error(value_error, "\n")
             except TypeError as type_error:
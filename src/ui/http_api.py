@@ -0,0 +1,495 @@
+import json
+import time
+from contextlib import nullcontext
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from src.errors.exceptions import ValidError, RepoError
+from src.services.service import get_page
+
+ID_SEGMENT = "{id}"
+DEFAULT_PAGE_SIZE = 100
+MAXIMUM_PAGE_SIZE = 1_000
+MAXIMUM_BATCH_SIZE = 1_000
+MAXIMUM_BODY_SIZE = 1 << 20
+KEEP_ALIVE_TIMEOUT = 30
+REQUEST_QUEUE_SIZE = 128
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LibraryHttpApi(object):
+    """
+    JSON API over the book, client, rental and statistics services, independent of the HTTP transport: 'handle' takes
+    the method, the target and the body of a request and returns the status, the payload and the ETag of its response.
+
+    Requests run on many threads at once, so the services must share the given 'ReadWriteLock'. Each request holds it
+    as a whole: a GET holds the read lock while it builds its response, anything else holds the write lock, so a batch
+    of rents or returns is applied as a single atomic step (and undone as a single step). Every change made through the
+    API moves the library to a new generation; the ETag of a GET response is that generation (and the day, for the
+    statistics, which count the active rentals up to today), so a client sending it back in 'If-None-Match' gets a 304
+    without the response being built again, until the library changes.
+    """
+
+    def __init__(self, book_service, client_service, rental_service, statistics_service, lock, undo_service=None):
+        self._book_service = book_service
+        self._client_service = client_service
+        self._rental_service = rental_service
+        self._statistics_service = statistics_service
+        self._undo_service = undo_service
+        self._lock = lock
+        self.__epoch = format(time.time_ns(), "x")
+        self.__generation = 0
+        self.__routes = {
+            ("GET", ("books",)): self.__list_books,
+            ("POST", ("books",)): self.__add_book,
+            ("GET", ("books", ID_SEGMENT)): self.__get_book,
+            ("PATCH", ("books", ID_SEGMENT)): self.__update_book,
+            ("DELETE", ("books", ID_SEGMENT)): self.__remove_book,
+            ("GET", ("books", ID_SEGMENT, "rental")): self.__get_book_rental,
+            ("GET", ("clients",)): self.__list_clients,
+            ("POST", ("clients",)): self.__add_client,
+            ("GET", ("clients", ID_SEGMENT)): self.__get_client,
+            ("PATCH", ("clients", ID_SEGMENT)): self.__update_client,
+            ("DELETE", ("clients", ID_SEGMENT)): self.__remove_client,
+            ("GET", ("clients", ID_SEGMENT, "rentals")): self.__get_client_rentals,
+            ("GET", ("rentals",)): self.__list_rentals,
+            ("POST", ("rentals",)): self.__add_rental,
+            ("POST", ("rentals", ID_SEGMENT, "return")): self.__return_rental,
+            ("POST", ("rentals", "rent")): self.__rent_books,
+            ("POST", ("rentals", "return")): self.__return_books,
+            ("GET", ("search", "books")): self.__search_books,
+            ("GET", ("search", "clients")): self.__search_clients,
+            ("GET", ("statistics", "books")): self.__get_most_rented_books,
+            ("GET", ("statistics", "clients")): self.__get_most_active_clients,
+            ("GET", ("statistics", "authors")): self.__get_most_rented_authors,
+            ("POST", ("undo",)): self.__undo,
+            ("POST", ("redo",)): self.__redo
+        }
+        self.__paths = {path for _, path in self.__routes}
+
+    def handle(self, method, target, body=b"", if_none_match=None):
+        """
+        Function to answer a request.
+        :param method: string, the HTTP method of the request.
+        :param target: string, the path of the request, with its query string.
+        :param body: bytes, the body of the request; a JSON object, or empty.
+        :param if_none_match: string, the 'If-None-Match' header of the request, None if it has none.
+        :return: tuple, containing the HTTP status, the payload (None if the response has no body) and the ETag (None
+        if the response has none).
+        """
+        url = urlsplit(target)
+        segments = [segment for segment in url.path.split("/") if segment != ""]
+        path = tuple(ID_SEGMENT if segment.isdecimal() else segment for segment in segments)
+        route = self.__routes.get((method, path))
+        try:
+            if route is None:
+                if path in self.__paths:
+                    raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed.")
+                raise HttpError(HTTPStatus.NOT_FOUND, "Resource not found.")
+            ids = [int(segment) for segment in segments if segment.isdecimal()]
+            query = dict(parse_qsl(url.query))
+            if method == "GET":
+                with self._lock.reading():
+                    etag = self.__get_etag(path)
+                    if if_none_match is not None and self.__matches(etag, if_none_match):
+                        return HTTPStatus.NOT_MODIFIED, None, etag
+                    status, payload = route(ids, query)
+                    return status, payload, etag
+            fields = self.__parse_body(body)
+            with self._lock.writing():
+                try:
+                    status, payload = route(ids, fields)
+                finally:
+                    self.__generation += 1
+            return status, payload, None
+        except HttpError as error:
+            return error.status, {"error": str(error)}, None
+        except ValidError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error).strip()}, None
+        except RepoError as error:
+            return HTTPStatus.CONFLICT, {"error": str(error).strip()}, None
+
+    def __list_books(self, ids, query):
+        return HTTPStatus.OK, self.__get_listing_page(self._book_service.get_books_page, query, self.__serialize_book)
+
+    def __add_book(self, ids, fields):
+        book_id = self._book_service.add_book(self.__get_text(fields, "title"), self.__get_text(fields, "author"))
+        return HTTPStatus.CREATED, {"id": book_id}
+
+    def __get_book(self, ids, query):
+        return HTTPStatus.OK, self.__serialize_book(self.__get_existing_book(ids[0]))
+
+    def __update_book(self, ids, fields):
+        book = self.__get_addressable_book(ids[0])
+        self._book_service.update_book(book.title, book.author, self.__get_text(fields, "title", book.title),
+                                       self.__get_text(fields, "author", book.author))
+        return HTTPStatus.OK, self.__serialize_book(self._book_service.get_book_by_book_id(book.id))
+
+    def __remove_book(self, ids, fields):
+        book = self.__get_addressable_book(ids[0])
+        self._book_service.remove_book_by_title_and_author(book.title, book.author)
+        return HTTPStatus.OK, {"id": book.id}
+
+    def __get_book_rental(self, ids, query):
+        book = self.__get_existing_book(ids[0])
+        return HTTPStatus.OK, {"book_id": book.id, "client_id": self._rental_service.get_book_rental_status(book.id)}
+
+    def __list_clients(self, ids, query):
+        return HTTPStatus.OK, self.__get_listing_page(self._client_service.get_clients_page, query,
+                                                      self.__serialize_client)
+
+    def __add_client(self, ids, fields):
+        return HTTPStatus.CREATED, {"id": self._client_service.add_client(self.__get_text(fields, "name"))}
+
+    def __get_client(self, ids, query):
+        return HTTPStatus.OK, self.__serialize_client(self.__get_existing_client(ids[0]))
+
+    def __update_client(self, ids, fields):
+        client = self.__get_addressable_client(ids[0])
+        self._client_service.update_client_by_name(client.name, self.__get_text(fields, "name", client.name))
+        return HTTPStatus.OK, self.__serialize_client(self._client_service.get_client_by_client_id(client.id))
+
+    def __remove_client(self, ids, fields):
+        client = self.__get_addressable_client(ids[0])
+        self._client_service.remove_client_by_name(client.name)
+        return HTTPStatus.OK, {"id": client.id}
+
+    def __get_client_rentals(self, ids, query):
+        client = self.__get_existing_client(ids[0])
+        return HTTPStatus.OK, {"client_id": client.id,
+                               "book_ids": self._rental_service.get_client_active_rentals(client.id)}
+
+    def __list_rentals(self, ids, query):
+        return HTTPStatus.OK, self.__get_listing_page(self._rental_service.get_rentals_page, query,
+                                                      self.__serialize_rental)
+
+    def __add_rental(self, ids, fields):
+        rental_id = self._rental_service.add_rental(self.__get_id(fields, "book_id"),
+                                                    self.__get_id(fields, "client_id"))
+        return HTTPStatus.CREATED, {"id": rental_id}
+
+    def __return_rental(self, ids, fields):
+        self._rental_service.return_rental_by_id(ids[0])
+        return HTTPStatus.OK, {"id": ids[0]}
+
+    def __rent_books(self, ids, fields):
+        """
+        Function to rent each of the books of the batch that is available, in the given order. A book that is rented
+        already is reported as not rented; malformed entries and invalid or unknown IDs are reported as errors of their
+        own entry, without stopping the batch.
+        """
+        rentals = self.__get_batch(fields, "rentals")
+        results = []
+        with self.__group():
+            for rental in rentals:
+                book_id = rental.get("book_id") if isinstance(rental, dict) else None
+                try:
+                    if not isinstance(rental, dict):
+                        raise ValidError("Rental must be a JSON object. ")
+                    rented = self._rental_service.rent_if_available(self.__get_id(rental, "book_id"),
+                                                                    self.__get_id(rental, "client_id"))
+                    results.append({"book_id": book_id, "rented": rented})
+                except (ValidError, RepoError) as error:
+                    results.append({"book_id": book_id, "error": str(error).strip()})
+        return HTTPStatus.OK, {"results": results}
+
+    def __return_books(self, ids, fields):
+        """
+        Function to return each of the books of the batch that is rented, in the given order. A book that is not rented
+        is reported as not returned; malformed entries and invalid or unknown IDs are reported as errors of their own
+        entry, without stopping the batch.
+        """
+        book_ids = self.__get_batch(fields, "book_ids")
+        results = []
+        with self.__group():
+            for book_id in book_ids:
+                try:
+                    returned = self._rental_service.return_if_rented(self.__check_id(book_id, "book_id"))
+                    results.append({"book_id": book_id, "returned": returned})
+                except (ValidError, RepoError) as error:
+                    results.append({"book_id": book_id, "error": str(error).strip()})
+        return HTTPStatus.OK, {"results": results}
+
+    def __search_books(self, ids, query):
+        if "id" in query:
+            books = self._book_service.find_all_books_matching_id(query["id"])
+        elif "title" in query:
+            books = self._book_service.find_all_books_matching_title(query["title"])
+        elif "author" in query:
+            books = self._book_service.find_all_books_matching_author(query["author"])
+        else:
+            raise ValidError("Search by 'id', 'title' or 'author'. ")
+        return HTTPStatus.OK, self.__get_page(books, query, self.__serialize_book)
+
+    def __search_clients(self, ids, query):
+        if "id" in query:
+            clients = self._client_service.find_all_clients_matching_id(query["id"])
+        elif "name" in query:
+            clients = self._client_service.find_all_clients_matching_name(query["name"])
+        else:
+            raise ValidError("Search by 'id' or 'name'. ")
+        return HTTPStatus.OK, self.__get_page(clients, query, self.__serialize_client)
+
+    def __get_most_rented_books(self, ids, query):
+        offset, limit = self.__get_offset_and_limit(query)
+        ranking = self._statistics_service.get_most_rented_books(limit, offset)
+        items = [{"book_id": book_id, "rentals": rentals} for book_id, rentals in ranking]
+        return HTTPStatus.OK, {"items": items, "offset": offset, "limit": limit}
+
+    def __get_most_active_clients(self, ids, query):
+        offset, limit = self.__get_offset_and_limit(query)
+        ranking = self._statistics_service.get_most_active_clients(limit, offset)
+        items = [{"client_id": client_id, "rental_days": rental_days} for client_id, rental_days in ranking]
+        return HTTPStatus.OK, {"items": items, "offset": offset, "limit": limit}
+
+    def __get_most_rented_authors(self, ids, query):
+        offset, limit = self.__get_offset_and_limit(query)
+        ranking = self._statistics_service.get_most_rented_authors(limit, offset)
+        items = [{"author": author, "rentals": rentals} for author, rentals in ranking]
+        return HTTPStatus.OK, {"items": items, "offset": offset, "limit": limit}
+
+    def __undo(self, ids, fields):
+        self.__get_undo_service().undo()
+        return HTTPStatus.OK, {}
+
+    def __redo(self, ids, fields):
+        self.__get_undo_service().redo()
+        return HTTPStatus.OK, {}
+
+    def __get_existing_book(self, book_id):
+        book = self._book_service.get_book_by_book_id(book_id)
+        if book is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Book not found.")
+        return book
+
+    def __get_addressable_book(self, book_id):
+        """
+        Function to return the book having the given ID, making sure the book service, which finds the books by their
+        title and author, finds that very book and not another one having the same title and author.
+        """
+        book = self.__get_existing_book(book_id)
+        if self._book_service.find_book_by_title_and_author(book.title, book.author)[1] is not book:
+            raise RepoError("Another book has the same title and author. ")
+        return book
+
+    def __get_existing_client(self, client_id):
+        client = self._client_service.get_client_by_client_id(client_id)
+        if client is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Client not found.")
+        return client
+
+    def __get_addressable_client(self, client_id):
+        """
+        Function to return the client having the given ID, making sure the client service, which finds the clients by
+        their name, finds that very client and not another one having the same name.
+        """
+        client = self.__get_existing_client(client_id)
+        if self._client_service.find_client_by_name(client.name)[1] is not client:
+            raise RepoError("Another client has the same name. ")
+        return client
+
+    def __get_undo_service(self):
+        if self._undo_service is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Resource not found.")
+        return self._undo_service
+
+    def __group(self):
+        if self._undo_service is None:
+            return nullcontext()
+        return self._undo_service.group()
+
+    def __get_etag(self, path):
+        if path[0] == "statistics":
+            return f'"{self.__epoch}-{self.__generation}-{date.today().toordinal()}"'
+        return f'"{self.__epoch}-{self.__generation}"'
+
+    def __get_page(self, items, query, serialize):
+        """
+        Function to return a page of the given items, selected by the 'offset' and 'limit' of the query, without
+        copying the items around it.
+        :return: dictionary, holding the serialized items of the page, the offset, the limit and the total number of
+        items.
+        """
+        offset, limit = self.__get_offset_and_limit(query)
+        page = [serialize(item) for item in get_page(items, offset, limit)]
+        return {"items": page, "offset": offset, "limit": limit, "total": len(items)}
+
+    def __get_listing_page(self, get_listing_page, query, serialize):
+        """
+        Function to return a page of a full listing, selected by the 'offset' and 'limit' of the query. The page is
+        taken by the service from its repository, so the listing is not copied for every request.
+        :param get_listing_page: function, taking the offset and the limit, and returning the items of the page and
+        the total number of items.
+        :return: dictionary, holding the serialized items of the page, the offset, the limit and the total number of
+        items.
+        """
+        offset, limit = self.__get_offset_and_limit(query)
+        items, total = get_listing_page(offset, limit)
+        return {"items": [serialize(item) for item in items], "offset": offset, "limit": limit, "total": total}
+
+    @staticmethod
+    def __get_offset_and_limit(query):
+        error_string = ""
+        offset = query.get("offset", "0")
+        limit = query.get("limit", str(DEFAULT_PAGE_SIZE))
+        if not offset.isdecimal():
+            error_string += "Offset must have a natural number value. "
+        if not limit.isdecimal() or not 0 < int(limit) <= MAXIMUM_PAGE_SIZE:
+            error_string += f"Limit must have a natural number value, between 1 and {MAXIMUM_PAGE_SIZE}. "
+        if len(error_string) > 0:
+            raise ValidError(error_string)
+        return int(offset), int(limit)
+
+    @staticmethod
+    def __get_batch(fields, name):
+        batch = fields.get(name)
+        if not isinstance(batch, list):
+            raise ValidError(f"Field '{name}' must be a list. ")
+        if len(batch) > MAXIMUM_BATCH_SIZE:
+            raise ValidError(f"A batch can hold at most {MAXIMUM_BATCH_SIZE} entries. ")
+        return batch
+
+    @staticmethod
+    def __get_field(fields, name):
+        if name not in fields:
+            raise ValidError(f"Field '{name}' is missing. ")
+        return fields[name]
+
+    @classmethod
+    def __get_text(cls, fields, name, default=None):
+        """
+        Function to return a text field of a request body, or the default if the field is missing and there is one.
+        """
+        if name not in fields and default is not None:
+            return default
+        text = cls.__get_field(fields, name)
+        if not isinstance(text, str):
+            raise ValidError(f"Field '{name}' must be a string. ")
+        return text
+
+    @classmethod
+    def __get_id(cls, fields, name):
+        return cls.__check_id(cls.__get_field(fields, name), name)
+
+    @staticmethod
+    def __check_id(value, name):
+        """
+        Function to make sure an ID given in a request body is a JSON integer, so that neither a float nor a boolean
+        is quietly taken for an ID.
+        """
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValidError(f"Field '{name}' must be an integer. ")
+        return value
+
+    @staticmethod
+    def __parse_body(body):
+        if len(body) == 0:
+            return {}
+        try:
+            fields = json.loads(body)
+        except ValueError:
+            raise ValidError("The body must be valid JSON. ")
+        if not isinstance(fields, dict):
+            raise ValidError("The body must be a JSON object. ")
+        return fields
+
+    @staticmethod
+    def __matches(etag, if_none_match):
+        if if_none_match.strip() == "*":
+            return True
+        return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+    @staticmethod
+    def __serialize_book(book):
+        return {"id": book.id, "title": book.title, "author": book.author}
+
+    @staticmethod
+    def __serialize_client(client):
+        return {"id": client.id, "name": client.name}
+
+    @staticmethod
+    def __serialize_rental(rental):
+        returned_date = None if rental.returned_date is None else rental.returned_date.isoformat()
+        return {"id": rental.id, "book_id": rental.book_id, "client_id": rental.client_id,
+                "rented_date": rental.rented_date.isoformat(), "returned_date": returned_date}
+
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler of the requests of a 'LibraryHttpServer', answering them through its 'LibraryHttpApi'. The
+    connections are kept alive between requests (every response has a 'Content-Length'), and the responses are sent
+    without waiting for Nagle's algorithm, so a client reusing its connection pays neither a new TCP handshake nor a
+    delayed acknowledgement per request. Idle connections are closed after 'KEEP_ALIVE_TIMEOUT' seconds.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "Library/1.0"
+    disable_nagle_algorithm = True
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    def do_GET(self):
+        self.__respond()
+
+    def do_POST(self):
+        self.__respond()
+
+    def do_PATCH(self):
+        self.__respond()
+
+    def do_DELETE(self):
+        self.__respond()
+
+    def log_request(self, code="-", size="-"):
+        if self.server.log_requests:
+            super().log_request(code, size)
+
+    def __respond(self):
+        if "Transfer-Encoding" in self.headers:
+            self.close_connection = True
+            self.__send(HTTPStatus.LENGTH_REQUIRED, {"error": "The body must be sent with a Content-Length."})
+            return
+        content_length = self.headers.get("Content-Length", "0")
+        if not content_length.isdecimal() or int(content_length) > MAXIMUM_BODY_SIZE:
+            self.close_connection = True
+            self.__send(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": f"The body can have at most {MAXIMUM_BODY_SIZE} "
+                                                                       f"bytes."})
+            return
+        body = self.rfile.read(int(content_length))
+        try:
+            status, payload, etag = self.server.api.handle(self.command, self.path, body,
+                                                           self.headers.get("If-None-Match"))
+        except Exception as error:
+            self.log_error("Request %r failed: %r", self.requestline, error)
+            status, payload, etag = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}, None
+        self.__send(status, payload, etag)
+
+    def __send(self, status, payload, etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        content = b""
+        if payload is not None:
+            content = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class LibraryHttpServer(ThreadingHTTPServer):
+    """
+    HTTP server answering each connection on a thread of its own, through the given 'LibraryHttpApi'.
+    """
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+    def __init__(self, address, api, log_requests=False):
+        super().__init__(address, LibraryRequestHandler)
+        self.api = api
+        self.log_requests = log_requests